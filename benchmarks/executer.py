@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Benchmarks hors ligne du pipeline
+Lance l'API Anthropic simulée (serveur_anthropic.py) et les plateformes simulées
+(serveur_fixtures.py), puis chronomètre les scénarios :
+  - generation : une candidature complète (scraping, analyses, CV, lettre, entretien)
+  - batch      : MoteurBatch sur N URLs d'offres
+  - recherche  : recherche sur les quatre plateformes puis scoring IA des offres
+  - reprise    : reprise (--resume) d'offres aux .tex écrits mais au PDF en échec,
+                 qui ne doit créer aucun nouveau dossier (échec du scénario sinon)
+Les résultats (durées, requêtes servies, statistiques par étape de l'instrumentation)
+sont écrits en JSON dans benchmarks/resultats/<date>_<commit>.json ; --comparer
+affiche l'écart avec un résultat précédent pour repérer les régressions.
+
+Usage:
+    python3 benchmarks/executer.py
+    python3 benchmarks/executer.py --scenarios batch --urls 50 --workers 8
+    python3 benchmarks/executer.py --comparer benchmarks/resultats/<ancien>.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict
+from unittest import mock
+
+BENCHMARKS_DIR = Path(__file__).parent.absolute()
+ROOT_DIR = BENCHMARKS_DIR.parent
+sys.path.insert(0, str(ROOT_DIR / "core"))
+
+from serveur_anthropic import ServeurAnthropic
+from serveur_fixtures import ServeurFixtures
+
+SCENARIOS = ('generation', 'batch', 'recherche', 'reprise')
+
+# Profil d'exemple utilisé comme infos_statique.txt
+PROFIL_EXEMPLE = ROOT_DIR / "infos_statique_exemple_generique.txt"
+
+
+def version_code() -> str:
+    """Commit courant (suffixé de +modifs si l'arbre de travail diffère)"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        modifs = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT_DIR,
+                                capture_output=True, text=True).stdout.strip()
+        return commit + ("+modifs" if modifs else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "inconnu"
+
+
+def configurer(args, dossier_travail: Path, url_plateformes: str):
+    """
+    Surcharge la configuration avant l'import des modules du pipeline
+
+    Les modules font `from config import *` : les valeurs doivent être modifiées
+    dans le module config avant leur premier import.
+    """
+    import config
+    config.OUTPUT_FOLDER = str(dossier_travail / "candidatures")
+    config.RAPPORTS_DOSSIER = str(dossier_travail / "rapports")
+    config.INSTRUMENTATION_ACTIVE = True
+    config.JOURNAL_BATCH_FICHIER = str(dossier_travail / "journal_batch.sqlite")
+    config.MODE_PROFIL = "generique"
+    # Mesurer le pipeline, pas les caches d'un lancement précédent
+    config.CACHE_LLM_ACTIF = False
+    config.CACHE_HTTP_ACTIF = False
+    config.URLS_PLATEFORMES = {nom: url_plateformes for nom in config.URLS_PLATEFORMES}
+    config.AUTO_COMPILE_PDF = args.pdf != 'aucun'
+    if args.pdf != 'aucun':
+        config.MOTEUR_PDF = args.pdf
+    if not args.limiteur:
+        # Les limites du compte ne s'appliquent pas au serveur local
+        config.API_REQUETES_PAR_MINUTE = 1_000_000
+        config.API_TOKENS_PAR_MINUTE = 1_000_000_000
+    # Le serveur local termine les lots aussitôt : inutile d'attendre entre deux consultations
+    config.BATCH_API_INTERVALLE_SECONDES = 0.1
+
+
+@contextlib.contextmanager
+def silence(actif: bool):
+    """Masque les affichages du pipeline (sauf --verbose)"""
+    if not actif:
+        yield
+        return
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def scenario_generation(args, api_key: str, fixtures: ServeurFixtures) -> Dict:
+    """Une candidature complète pour une offre"""
+    import instrumentation
+    from generateur_cv_lettre import GenerateurIA, ParseurInfosStatiques, generer_candidature
+
+    infos = ParseurInfosStatiques.charger()
+    ia = GenerateurIA(api_key)
+    url = f"{fixtures.url}/offres/generation"
+    with instrumentation.offre(url), instrumentation.mesurer('offre'):
+        dossier = generer_candidature(url, infos, ia, verbose=False)
+    return {'succes': dossier is not None}
+
+
+def scenario_batch(args, api_key: str, fixtures: ServeurFixtures) -> Dict:
+    """MoteurBatch sur args.urls offres"""
+    from moteur_batch import MoteurBatch
+
+    urls = [f"{fixtures.url}/offres/batch-{i:03d}" for i in range(args.urls)]
+    moteur = MoteurBatch(api_key, 'infos_statique.txt')
+    debut = time.perf_counter()
+    try:
+        resultats = moteur.executer(urls, workers=args.workers)
+    finally:
+        moteur.fermer()
+    duree = time.perf_counter() - debut
+    reussies = sum(1 for r in resultats if r and r.get('success'))
+    return {'urls': len(urls), 'reussies': reussies,
+            'offres_par_minute': round(reussies * 60 / duree, 2) if duree else 0.0}
+
+
+def scenario_recherche(args, api_key: str, fixtures: ServeurFixtures) -> Dict:
+    """Recherche sur les quatre plateformes puis scoring IA"""
+    import instrumentation
+    from recherche_postes import RechercheurPostes, charger_profil
+
+    rechercheur = RechercheurPostes(charger_profil())
+    debut = time.perf_counter()
+    premiere_offre = None
+    jobs = []
+    with instrumentation.mesurer('recherche'):
+        for job in rechercheur.iterer_plateformes(args.mots_cles, nb_results=args.offres):
+            if premiere_offre is None:
+                premiere_offre = time.perf_counter() - debut
+            jobs.append(job)
+    duree_recherche = time.perf_counter() - debut
+    with instrumentation.mesurer('scoring'):
+        jobs = rechercheur.analyser_pertinence_ia(jobs)
+    return {'offres': len(jobs),
+            'offres_scorees': sum(1 for j in jobs if j.get('justification_ia', "Non évalué") != "Non évalué"),
+            'premiere_offre': round(premiere_offre or 0.0, 3),
+            'duree_recherche': round(duree_recherche, 3),
+            'duree_scoring': round(time.perf_counter() - debut - duree_recherche, 3)}
+
+
+def scenario_reprise(args, api_key: str, fixtures: ServeurFixtures) -> Dict:
+    """
+    Reprise après un échec de compilation : les .tex sont écrits (étape 'tex' du journal)
+    mais l'étape 'pdf' est en échec. La reprise, par MoteurBatch.executer puis par
+    executer_batch_api, doit réutiliser les dossiers existants sans en créer de nouveaux.
+    """
+    import config
+    import journal_batch
+    from moteur_batch import MoteurBatch
+
+    sortie = Path(config.OUTPUT_FOLDER)
+    nb_urls = min(args.urls, 5)
+    resultat = {'urls': 0, 'reprises_reussies': 0, 'dossiers_crees_a_la_reprise': 0}
+    # L'étape 'pdf' conditionne la fin d'une offre même si le benchmark ne compile pas
+    with mock.patch.object(journal_batch, 'AUTO_COMPILE_PDF', True):
+        for methode in ('executer', 'executer_batch_api'):
+            journal = journal_batch.JournalBatch(config.JOURNAL_BATCH_FICHIER)
+            urls = [f"{fixtures.url}/offres/reprise-{methode}-{i:03d}" for i in range(nb_urls)]
+            lancements = []
+            for lancement in range(2):
+                moteur = MoteurBatch(api_key, 'infos_statique.txt', journal=journal)
+                avant = set(sortie.iterdir()) if sortie.is_dir() else set()
+                try:
+                    lancements.append(getattr(moteur, methode)(urls))
+                finally:
+                    moteur.fermer()
+                if lancement == 0:
+                    for url in urls:
+                        journal.echec(url, 'pdf', "Compilation en échec (simulée)")
+                else:
+                    resultat['dossiers_crees_a_la_reprise'] += len(set(sortie.iterdir()) - avant)
+            journal.fermer()
+            resultat['urls'] += len(urls)
+            resultat['reprises_reussies'] += sum(
+                1 for premier, reprise in zip(*lancements)
+                if reprise.get('success') and reprise.get('dossier') == premier.get('dossier'))
+    if resultat['dossiers_crees_a_la_reprise'] or resultat['reprises_reussies'] != resultat['urls']:
+        raise AssertionError(f"reprise incorrecte : {resultat}")
+    return resultat
+
+
+FONCTIONS_SCENARIOS: Dict[str, Callable[..., Dict]] = {
+    'generation': scenario_generation,
+    'batch': scenario_batch,
+    'recherche': scenario_recherche,
+    'reprise': scenario_reprise,
+}
+
+
+def executer_scenario(nom: str, args, api_key: str, anthropic: ServeurAnthropic,
+                      fixtures: ServeurFixtures) -> Dict:
+    """Chronomètre un scénario : durée, requêtes servies et statistiques par étape"""
+    import instrumentation
+
+    rapport = instrumentation.nouveau_rapport()
+    compteurs_api = dict(anthropic.compteurs)
+    compteurs_http = dict(fixtures.compteurs)
+
+    debut = time.perf_counter()
+    erreur = None
+    with silence(not args.verbose):
+        try:
+            resultat = FONCTIONS_SCENARIOS[nom](args, api_key, fixtures)
+        except Exception as e:
+            resultat, erreur = {}, f"{type(e).__name__}: {e}"
+    duree = time.perf_counter() - debut
+
+    return {
+        'duree': round(duree, 3),
+        **resultat,
+        **({'erreur': erreur} if erreur else {}),
+        'api': {cle: anthropic.compteurs[cle] - compteurs_api[cle] for cle in compteurs_api},
+        'plateformes': {cle: fixtures.compteurs[cle] - compteurs_http[cle] for cle in compteurs_http},
+        'etapes': rapport.statistiques(),
+    }
+
+
+def afficher(resultats: Dict):
+    """Résumé des scénarios"""
+    for nom, scenario in resultats['scenarios'].items():
+        print(f"\n▶ {nom} : {scenario['duree']:.2f}s"
+              + (f"  ❌ {scenario['erreur']}" if 'erreur' in scenario else ""))
+        details = {k: v for k, v in scenario.items() if k not in ('duree', 'erreur', 'api', 'plateformes', 'etapes')}
+        if details:
+            print("   " + ", ".join(f"{k}={v}" for k, v in details.items()))
+        # 'requetes' compte tous les messages, streaming compris
+        print(f"   API: {scenario['api']['requetes']} messages (dont {scenario['api']['streaming']} en streaming), "
+              f"{scenario['api']['requetes_lots']} en lots, "
+              f"{scenario['api']['input_tokens']}/{scenario['api']['output_tokens']} tokens in/out ; "
+              f"plateformes: {scenario['plateformes']['requetes']} requêtes")
+        for etape, s in sorted(scenario['etapes'].items(), key=lambda e: -e[1]['duree_totale']):
+            print(f"   {etape:<36} {s['nombre']:>4} p50 {s['duree_p50']:>7.2f}s  p95 {s['duree_p95']:>7.2f}s")
+
+
+def comparer(resultats: Dict, reference: Dict):
+    """Écart des durées (total et p50 par étape) avec un résultat précédent"""
+    def ecart(nouveau: float, ancien: float) -> str:
+        if not ancien:
+            return "   n/a"
+        return f"{(nouveau - ancien) / ancien * 100:+6.1f}%"
+
+    print(f"\n📊 Comparaison avec {reference.get('commit', '?')} ({reference.get('date', '?')})")
+    for nom, scenario in resultats['scenarios'].items():
+        ancien = reference.get('scenarios', {}).get(nom)
+        if not ancien:
+            print(f"   {nom}: absent de la référence")
+            continue
+        print(f"   {nom:<36} {ancien['duree']:>8.2f}s → {scenario['duree']:>8.2f}s  {ecart(scenario['duree'], ancien['duree'])}")
+        for etape, s in sorted(scenario['etapes'].items()):
+            a = ancien.get('etapes', {}).get(etape)
+            if a:
+                print(f"     {etape:<34} p50 {a['duree_p50']:>7.2f}s → {s['duree_p50']:>7.2f}s  "
+                      f"{ecart(s['duree_p50'], a['duree_p50'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks hors ligne du pipeline (API et plateformes simulées)")
+    parser.add_argument('--scenarios', default=",".join(SCENARIOS),
+                        help=f"Scénarios à lancer, séparés par des virgules ({', '.join(SCENARIOS)})")
+    parser.add_argument('--urls', type=int, default=50, help="Nombre d'URLs du scénario batch")
+    parser.add_argument('--workers', type=int, default=None, help="Workers du batch (défaut: BATCH_WORKERS)")
+    parser.add_argument('--offres', type=int, default=25, help="Offres par plateforme du scénario recherche")
+    parser.add_argument('--mots-cles', default="machine learning", help="Mots-clés de la recherche")
+    parser.add_argument('--latence', type=float, default=0.2, help="Délai avant le premier token de l'API (s)")
+    parser.add_argument('--debit', type=float, default=400.0, help="Tokens de sortie par seconde (0 = instantané)")
+    parser.add_argument('--latence-plateformes', type=float, default=0.05, help="Délai des pages des plateformes (s)")
+    parser.add_argument('--pdf', choices=('aucun', 'pdflatex', 'reportlab'), default='aucun',
+                        help="Compilation des PDF (défaut: aucune)")
+    parser.add_argument('--limiteur', action='store_true',
+                        help="Conserver les limites de débit de config.py (levées par défaut)")
+    parser.add_argument('--sortie', default=str(BENCHMARKS_DIR / "resultats"), help="Dossier des résultats JSON")
+    parser.add_argument('--comparer', help="Résultat JSON de référence")
+    parser.add_argument('--verbose', action='store_true', help="Afficher la sortie du pipeline")
+    args = parser.parse_args()
+
+    scenarios = [s.strip() for s in args.scenarios.split(',') if s.strip()]
+    inconnus = [s for s in scenarios if s not in SCENARIOS]
+    if inconnus:
+        parser.error(f"scénario(s) inconnu(s): {', '.join(inconnus)}")
+
+    anthropic = ServeurAnthropic(latence=args.latence, debit=args.debit).demarrer()
+    fixtures = ServeurFixtures(latence=args.latence_plateformes).demarrer()
+    # Le SDK lit l'adresse de l'API dans l'environnement à la création du client
+    api_key = "sk-ant-benchmark"
+    os.environ['ANTHROPIC_BASE_URL'] = anthropic.url
+    os.environ['ANTHROPIC_API_KEY'] = api_key
+
+    dossier_travail = Path(tempfile.mkdtemp(prefix="benchmark_"))
+    shutil.copy(PROFIL_EXEMPLE, dossier_travail / "infos_statique.txt")
+    configurer(args, dossier_travail, fixtures.url)
+    if args.workers is None:
+        import config
+        args.workers = config.BATCH_WORKERS
+
+    repertoire = os.getcwd()
+    os.chdir(dossier_travail)
+    resultats = {
+        'commit': version_code(),
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plateforme': platform.platform(),
+        'parametres': {k: v for k, v in vars(args).items() if k not in ('sortie', 'comparer', 'verbose')},
+        'scenarios': {},
+    }
+    try:
+        for nom in scenarios:
+            print(f"⏱️  {nom}...", flush=True)
+            resultats['scenarios'][nom] = executer_scenario(nom, args, api_key, anthropic, fixtures)
+    finally:
+        os.chdir(repertoire)
+        shutil.rmtree(dossier_travail, ignore_errors=True)
+        anthropic.shutdown()
+        fixtures.shutdown()
+
+    afficher(resultats)
+
+    sortie = Path(args.sortie)
+    sortie.mkdir(parents=True, exist_ok=True)
+    fichier = sortie / f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{resultats['commit']}.json"
+    with open(fichier, 'w', encoding='utf-8') as f:
+        json.dump(resultats, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 Résultats: {fichier}")
+
+    if args.comparer:
+        with open(args.comparer, 'r', encoding='utf-8') as f:
+            comparer(resultats, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark du parseur de infos_statique.txt
+Génère des profils synthétiques de taille croissante (des centaines d'expériences et de
+missions), vérifie que ParseurInfosStatiques produit le même InfosPersonnelles que le
+parseur précédent (sur ces profils, les profils d'exemple du dépôt et un profil
+commenté à l'intérieur des blocs), chronomètre les deux et estime l'exposant de croissance du temps
+de parse (1 = linéaire). Résultats en JSON dans benchmarks/resultats/.
+
+Usage:
+    python3 benchmarks/parseur_infos.py
+    python3 benchmarks/parseur_infos.py --tailles 100,200,400,800,1600 --repetitions 10
+"""
+
+import argparse
+import json
+import math
+import re
+import sys
+import time
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List
+
+BENCHMARKS_DIR = Path(__file__).parent.absolute()
+ROOT_DIR = BENCHMARKS_DIR.parent
+sys.path.insert(0, str(ROOT_DIR / "core"))
+
+from executer import version_code
+from generateur_cv_lettre import InfosPersonnelles, ParseurInfosStatiques
+
+MODES = ('generique', 'specifique')
+
+# Profils d'exemple du dépôt, comparés tels quels au parseur précédent
+EXEMPLES = ('infos_statique_exemple_generique.txt',)
+
+# Croissance tolérée : exposant de la loi temps ~ taille^k ajustée sur les mesures
+EXPOSANT_MAX_LINEAIRE = 1.15
+
+
+class ParseurReference:
+    """Parseur précédent (une recherche par expression régulière et par champ), pour comparaison"""
+
+    @staticmethod
+    def parse_texte(content: str, mode: str) -> InfosPersonnelles:
+        """Contenu du fichier → InfosPersonnelles, en mode de profil `mode`"""
+        # Extraction simple des informations
+        data = {
+            'nom': ParseurReference._extract('nom:', content),
+            'titre': ParseurReference._extract('titre:', content),
+            'localisation': ParseurReference._extract('localisation:', content),
+            'email': ParseurReference._extract('email:', content),
+            'linkedin': ParseurReference._extract('linkedin:', content),
+            'telephone': ParseurReference._extract('telephone:', content),
+            'profil_defaut': ParseurReference._extract_multiline('profil_defaut:', content),
+        }
+
+        # Parser les compétences selon le mode (specifique ou generique)
+        if mode == "specifique":
+            # Mode spécifique : catégories hardcodées
+            data['competences_scientific_ai'] = ParseurReference._extract_multiline('competences_scientific_ai:', content)
+            data['competences_simulation'] = ParseurReference._extract_multiline('competences_simulation:', content)
+            data['competences_generative_ai'] = ParseurReference._extract_multiline('competences_generative_ai:', content)
+            data['competences_informatique'] = ParseurReference._extract_multiline('competences_informatique:', content)
+            data['competences'] = []
+        else:
+            # Mode générique : parse les catégories dynamiquement
+            data['competences'] = ParseurReference._parse_competences_generique(content)
+            data['competences_scientific_ai'] = ""
+            data['competences_simulation'] = ""
+            data['competences_generative_ai'] = ""
+            data['competences_informatique'] = ""
+
+        # Pour simplifier, on parse les sections complexes manuellement
+        # (Dans une version production, utiliser un vrai parser TOML/YAML)
+        data['experiences'] = ParseurReference._parse_experiences(content)
+        data['formations'] = ParseurReference._parse_formations(content)
+        data['certifications'] = ParseurReference._parse_certifications(content)
+        data['projets'] = ParseurReference._parse_projets(content)
+        data['langues'] = ParseurReference._parse_langues(content)
+
+        return InfosPersonnelles(**data)
+
+    @staticmethod
+    def _extract(key: str, content: str) -> str:
+        """Extrait une valeur simple"""
+        match = re.search(f'{key}\\s*(.*)$', content, re.MULTILINE)
+        if match:
+            value = match.group(1).strip()
+            # Ignorer les lignes qui commencent par # (commentaires markdown)
+            if value and not value.startswith('#'):
+                return value
+        return ""
+
+    @staticmethod
+    def _extract_multiline(key: str, content: str) -> str:
+        """Extrait une valeur multiligne"""
+        pattern = f'{key}\\s*\\|\\n((?:  .+\\n?)+)'
+        match = re.search(pattern, content)
+        if match:
+            lines = match.group(1).strip().split('\n')
+            return ' '.join(line.strip() for line in lines)
+        return ""
+
+    @staticmethod
+    def _parse_experiences(content: str) -> List[Dict]:
+        """Parse les expériences"""
+        experiences = []
+        sections = re.findall(r'\[\[experience\]\](.+?)(?=\[\[|# FORMATION)', content, re.DOTALL)
+
+        for section in sections:
+            exp = {
+                'poste': ParseurReference._extract('poste:', section),
+                'entreprise': ParseurReference._extract('entreprise:', section),
+                'periode': ParseurReference._extract('periode:', section),
+                'missions': re.findall(r'  - (.+)', section)
+            }
+            experiences.append(exp)
+
+        return experiences
+
+    @staticmethod
+    def _parse_formations(content: str) -> List[Dict]:
+        """Parse les formations"""
+        formations = []
+        sections = re.findall(r'\[\[formation\]\](.+?)(?=\[\[|# CERTIFICATIONS)', content, re.DOTALL)
+
+        for section in sections:
+            form = {
+                'diplome': ParseurReference._extract('diplome:', section),
+                'etablissement': ParseurReference._extract('etablissement:', section),
+                'periode': ParseurReference._extract('periode:', section),
+                'details': re.findall(r'  - (.+)', section)
+            }
+            formations.append(form)
+
+        return formations
+
+    @staticmethod
+    def _parse_certifications(content: str) -> List[Dict]:
+        """Parse les certifications"""
+        certifications = []
+        sections = re.findall(r'\[\[certification\]\](.+?)(?=\[\[|# PROJETS)', content, re.DOTALL)
+
+        for section in sections:
+            cert = {
+                'titre': ParseurReference._extract('titre:', section),
+                'date': ParseurReference._extract('date:', section)
+            }
+            certifications.append(cert)
+
+        return certifications
+
+    @staticmethod
+    def _parse_projets(content: str) -> List[Dict]:
+        """Parse les projets"""
+        projets = []
+        sections = re.findall(r'\[\[projet\]\](.+?)(?=\[\[|# COMPÉTENCES)', content, re.DOTALL)
+
+        for section in sections:
+            # Extraire titre (avec ou sans espaces autour de :)
+            titre_match = re.search(r'titre\s*:\s*(.+?)(?:\n|$)', section)
+            titre = titre_match.group(1).strip() if titre_match else ""
+
+            # Extraire description multiligne
+            desc_match = re.search(r'description\s*:\s*\n(.+?)(?=compétences et outils|$)', section, re.DOTALL)
+            description = desc_match.group(1).strip() if desc_match else ""
+
+            # Extraire compétences et outils multiligne
+            comp_match = re.search(r'compétences et outils\s*:\s*\n(.+?)(?=\n\n|\[\[|$)', section, re.DOTALL)
+            competences = comp_match.group(1).strip() if comp_match else ""
+
+            proj = {
+                'titre': titre,
+                'description': description,
+                'competences': competences
+            }
+            projets.append(proj)
+
+        return projets
+
+    @staticmethod
+    def _parse_langues(content: str) -> List[Dict]:
+        """Parse les langues"""
+        langues = []
+        sections = re.findall(r'\[\[langue\]\](.+?)(?=\[\[|$)', content, re.DOTALL)
+
+        for section in sections:
+            lang = {
+                'langue': ParseurReference._extract('langue:', section),
+                'niveau': ParseurReference._extract('niveau:', section)
+            }
+            langues.append(lang)
+
+        return langues
+
+    @staticmethod
+    def _parse_competences_generique(content: str) -> List[Dict]:
+        """Parse les compétences en mode générique (pour tout type de profil)"""
+        competences = []
+        # Chercher la section COMPÉTENCES
+        sections = re.findall(r'\[\[competence\]\](.+?)(?=\[\[|# LANGUES|$)', content, re.DOTALL)
+
+        for section in sections:
+            categorie = ParseurReference._extract('categorie:', section)
+            contenu = ParseurReference._extract_multiline('contenu:', section)
+            # Si contenu n'est pas multiligne, essayer extraction simple
+            if not contenu:
+                contenu = ParseurReference._extract('contenu:', section)
+
+            if categorie and contenu:
+                comp = {
+                    'categorie': categorie,
+                    'contenu': contenu
+                }
+                competences.append(comp)
+
+        return competences
+
+
+def profil_synthetique(nb_experiences: int, missions: int = 8, mode: str = "generique") -> str:
+    """Profil au format infos_statique.txt : nb_experiences expériences et, en proportion, les autres blocs"""
+    lignes = [
+        "# INFORMATIONS PERSONNELLES",
+        "nom: Camille Martin",
+        "titre: Ingénieure Logiciel",
+        "localisation: Nantes, France",
+        "email: camille.martin@example.com",
+        "linkedin: https://www.linkedin.com/in/camille-martin",
+        "telephone: +33 6 00 00 00 00",
+        "",
+        "# PROFIL PAR DÉFAUT",
+        "profil_defaut: |",
+        "  Ingénieure logiciel spécialisée dans les systèmes distribués et la donnée.",
+        "  Conception d'architectures robustes, du prototype à la production.",
+        "",
+        "# EXPÉRIENCES PROFESSIONNELLES",
+    ]
+    for i in range(nb_experiences):
+        lignes += ["[[experience]]", f"poste: Ingénieure Logiciel {i}", f"entreprise: Entreprise {i} SAS",
+                   f"periode: Jan. {2000 + i % 25} -- Déc. {2001 + i % 25}", "missions:"]
+        lignes += [f"  - Mission {j} de l'expérience {i} : conception, développement et mise en production"
+                   for j in range(missions)]
+        lignes.append("")
+    lignes.append("# FORMATION")
+    for i in range(max(1, nb_experiences // 4)):
+        lignes += ["[[formation]]", f"diplome: Master {i}", f"etablissement: Université {i}",
+                   f"periode: {1990 + i % 30} -- {1992 + i % 30}", "details:",
+                   f"  - Spécialisation {i} en informatique", f"  - Projet de fin d'études {i}", ""]
+    lignes.append("# CERTIFICATIONS")
+    for i in range(max(1, nb_experiences // 4)):
+        lignes += ["[[certification]]", f"titre: Certification {i}", f"date: {2010 + i % 15}", ""]
+    lignes.append("# PROJETS PHARES")
+    for i in range(max(1, nb_experiences // 2)):
+        lignes += ["[[projet]]", f"titre: Projet {i}", "description:",
+                   f"  Plateforme {i} de traitement de données en temps réel",
+                   f"  avec une interface de supervision {i}",
+                   "compétences et outils:", f"  Python, Kafka, PostgreSQL, Docker ({i})", ""]
+    if mode == "specifique":
+        lignes.append("# COMPÉTENCES")
+        for cle in ('competences_scientific_ai', 'competences_simulation',
+                    'competences_generative_ai', 'competences_informatique'):
+            lignes += [f"{cle}: |", f"  {cle} : outils et méthodes", "  (niveau avancé)", ""]
+    else:
+        lignes.append("# COMPÉTENCES (Format générique)")
+        for i in range(max(1, nb_experiences // 4)):
+            lignes += ["[[competence]]", f"categorie: Catégorie {i}", f"contenu: Outil {i}, Méthode {i}, Langage {i}", ""]
+    lignes.append("# LANGUES")
+    for langue, niveau in (("Français", "langue maternelle"), ("Anglais", "courant (C1)"), ("Espagnol", "intermédiaire (B1)")):
+        lignes += ["[[langue]]", f"langue: {langue}", f"niveau: {niveau}", ""]
+    return "\n".join(lignes)
+
+
+def profil_commente(mode: str = "generique") -> str:
+    """Profil synthétique avec des commentaires et sous-titres `#` à l'intérieur des blocs"""
+    lignes = []
+    for ligne in profil_synthetique(3, missions=6, mode=mode).split("\n"):
+        lignes.append(ligne)
+        if ligne == "missions:":
+            lignes.append("# Missions principales")
+        elif ligne.startswith("  - Mission 2 "):
+            lignes.append("## Sous-titre")
+        elif ligne == "details:":
+            lignes.append("# Détails du diplôme")
+        elif ligne in ("[[certification]]", "[[langue]]", "[[competence]]"):
+            lignes.append("# À compléter")
+    return "\n".join(lignes)
+
+
+def verifier_equivalence() -> List[str]:
+    """Compare les deux parseurs sur les profils d'exemple et le profil commenté (AssertionError sinon)"""
+    profils = {nom: (ROOT_DIR / nom).read_text(encoding='utf-8') for nom in EXEMPLES}
+    profils.update({f"profil commenté ({mode})": profil_commente(mode) for mode in MODES})
+    for nom, texte in profils.items():
+        for mode in MODES:
+            if asdict(parse_nouveau(texte, mode)) != asdict(ParseurReference.parse_texte(texte, mode)):
+                raise AssertionError(f"Résultats différents ({nom}, mode {mode})")
+    return list(profils)
+
+
+def chronometrer(fonction: Callable[[], object], repetitions: int) -> float:
+    """Meilleure durée (secondes) sur `repetitions` exécutions"""
+    meilleure = math.inf
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        fonction()
+        meilleure = min(meilleure, time.perf_counter() - debut)
+    return meilleure
+
+
+def exposant(tailles: List[int], durees: List[float]) -> float:
+    """Pente de log(durée) en fonction de log(taille) (moindres carrés)"""
+    x = [math.log(t) for t in tailles]
+    y = [math.log(d) for d in durees]
+    mx, my = sum(x) / len(x), sum(y) / len(y)
+    return sum((a - mx) * (b - my) for a, b in zip(x, y)) / sum((a - mx) ** 2 for a in x)
+
+
+def parse_nouveau(texte: str, mode: str) -> InfosPersonnelles:
+    """ParseurInfosStatiques dans le mode de profil donné"""
+    return ParseurInfosStatiques.parse_texte(texte, mode)
+
+
+def mesurer(mode: str, tailles: List[int], repetitions: int) -> Dict:
+    """Équivalence et durées des deux parseurs pour chaque taille de profil"""
+    mesures = []
+    for taille in tailles:
+        texte = profil_synthetique(taille, mode=mode)
+        if asdict(parse_nouveau(texte, mode)) != asdict(ParseurReference.parse_texte(texte, mode)):
+            raise AssertionError(f"Résultats différents (mode {mode}, {taille} expériences)")
+        mesures.append({
+            'experiences': taille,
+            'octets': len(texte.encode('utf-8')),
+            'lignes': texte.count("\n") + 1,
+            'duree': chronometrer(lambda: parse_nouveau(texte, mode), repetitions),
+            'duree_reference': chronometrer(lambda: ParseurReference.parse_texte(texte, mode), repetitions),
+        })
+    octets = [m['octets'] for m in mesures]
+    return {
+        'mesures': mesures,
+        'exposant': round(exposant(octets, [m['duree'] for m in mesures]), 3),
+        'exposant_reference': round(exposant(octets, [m['duree_reference'] for m in mesures]), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark du parseur de infos_statique.txt")
+    parser.add_argument('--tailles', default="50,100,200,400,800",
+                        help="Nombres d'expériences des profils synthétiques (séparés par des virgules)")
+    parser.add_argument('--repetitions', type=int, default=5, help="Exécutions par mesure (la meilleure est retenue)")
+    parser.add_argument('--sortie', default=str(BENCHMARKS_DIR / "resultats"), help="Dossier des résultats JSON")
+    args = parser.parse_args()
+
+    tailles = sorted(int(t) for t in args.tailles.split(',') if t.strip())
+    if len(tailles) < 2:
+        parser.error("au moins deux tailles sont nécessaires")
+
+    resultats = {
+        'commit': version_code(),
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'parametres': {'tailles': tailles, 'repetitions': args.repetitions},
+        'modes': {},
+    }
+    profils = verifier_equivalence()
+    print(f"✓ Résultats identiques au parseur précédent : {', '.join(profils)}")
+
+    lineaire = True
+    for mode in MODES:
+        resultat = mesurer(mode, tailles, args.repetitions)
+        resultats['modes'][mode] = resultat
+        print(f"\n▶ Mode {mode} (résultats identiques au parseur précédent)")
+        print(f"   {'expériences':>11} {'Ko':>8} {'parse':>10} {'µs/Ko':>8} {'précédent':>10} {'gain':>6}")
+        for m in resultat['mesures']:
+            ko = m['octets'] / 1024
+            print(f"   {m['experiences']:>11} {ko:>8.0f} {m['duree'] * 1000:>8.2f}ms {m['duree'] * 1e6 / ko:>8.1f} "
+                  f"{m['duree_reference'] * 1000:>8.2f}ms {m['duree_reference'] / m['duree']:>5.1f}x")
+        ok = resultat['exposant'] <= EXPOSANT_MAX_LINEAIRE
+        lineaire = lineaire and ok
+        print(f"   Croissance : taille^{resultat['exposant']} (précédent : taille^{resultat['exposant_reference']}) "
+              + ("✓ linéaire" if ok else "❌ plus que linéaire"))
+
+    sortie = Path(args.sortie)
+    sortie.mkdir(parents=True, exist_ok=True)
+    fichier = sortie / f"parseur_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{resultats['commit']}.json"
+    with open(fichier, 'w', encoding='utf-8') as f:
+        json.dump(resultats, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 Résultats: {fichier}")
+    sys.exit(0 if lineaire else 1)
+
+
+if __name__ == "__main__":
+    main()
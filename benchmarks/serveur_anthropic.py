@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Serveur local imitant l'API Anthropic (Messages, streaming SSE, Message Batches)
+Réponses tirées de fixtures/reponses_claude.json, latence et débit de sortie configurables :
+les benchmarks mesurent le pipeline sans crédits API. Le SDK y est redirigé par
+ANTHROPIC_BASE_URL=http://127.0.0.1:<port>
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+BENCHMARKS_DIR = Path(__file__).parent.absolute()
+FICHIER_REPONSES = BENCHMARKS_DIR / "fixtures" / "reponses_claude.json"
+
+# Taille des fragments de texte envoyés en streaming (en caractères)
+TAILLE_FRAGMENT = 40
+
+
+def estimer_tokens(texte: str) -> int:
+    """Approximation de la tokenisation : 4 caractères par token"""
+    return max(1, len(texte) // 4)
+
+
+def _texte(contenu) -> str:
+    """Texte d'un champ system ou content (chaîne ou liste de blocs)"""
+    if isinstance(contenu, str):
+        return contenu
+    return "".join(bloc.get('text', '') for bloc in contenu or [] if isinstance(bloc, dict))
+
+
+class Reponses:
+    """Choisit la réponse d'une requête d'après les règles du fichier de fixtures"""
+
+    def __init__(self, fichier: Path = FICHIER_REPONSES):
+        with open(fichier, 'r', encoding='utf-8') as f:
+            donnees = json.load(f)
+        self.regles = donnees['regles']
+        self.defaut = donnees['defaut']
+
+    @staticmethod
+    def _allonger(texte: str, tokens: Optional[int]) -> str:
+        if not tokens:
+            return texte
+        repetitions = max(1, -(-tokens * 4 // len(texte)))
+        return (texte * repetitions)[:tokens * 4]
+
+    @staticmethod
+    def _scoring(prompt: str) -> str:
+        evaluations = [{"job_id": int(n), "score": 3 + int(n) * 7 % 8,
+                        "justification": "Compétences proches du profil"}
+                       for n in re.findall(r'JOB (\d+):', prompt)]
+        return json.dumps({"evaluations": evaluations}, ensure_ascii=False)
+
+    def choisir(self, prompt: str) -> Tuple[str, str]:
+        """(nom de la règle, texte de la réponse) pour le message utilisateur"""
+        for regle in self.regles:
+            if regle['contient'] in prompt:
+                if regle.get('type') == 'scoring':
+                    return regle['nom'], self._scoring(prompt)
+                return regle['nom'], self._allonger(regle['reponse'], regle.get('tokens_sortie'))
+        return 'defaut', self._allonger(self.defaut['reponse'], self.defaut.get('tokens_sortie'))
+
+
+class ServeurAnthropic(ThreadingHTTPServer):
+    """
+    Serveur HTTP de l'API simulée
+
+    latence : délai avant le premier token (secondes) ; debit : tokens de sortie
+    produits par seconde (0 = instantané) ; duree_lot : temps de traitement d'un
+    lot de la Batch API. Le cache de prompts est simulé : un préfixe system marqué
+    cache_control est « écrit » à sa première occurrence, « relu » ensuite.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, latence: float = 0.5, debit: float = 100.0,
+                 duree_lot: float = 2.0, reponses: Optional[Reponses] = None):
+        super().__init__(('127.0.0.1', port), GestionnaireAnthropic)
+        self.latence = latence
+        self.debit = debit
+        self.duree_lot = duree_lot
+        self.reponses = reponses or Reponses()
+        self.lock = threading.Lock()
+        self.prefixes_caches = set()
+        self.lots: Dict[str, Dict] = {}
+        self.compteurs = {'requetes': 0, 'streaming': 0, 'lots': 0, 'requetes_lots': 0,
+                          'input_tokens': 0, 'output_tokens': 0}
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def demarrer(self) -> 'ServeurAnthropic':
+        """Sert les requêtes dans un thread de fond"""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def _compter(self, **compteurs: int):
+        with self.lock:
+            for nom, valeur in compteurs.items():
+                self.compteurs[nom] += valeur
+
+    def message(self, parametres: Dict) -> Tuple[Dict, str]:
+        """Message de réponse complet (usage compris) et son texte"""
+        messages = parametres.get('messages', [])
+        prompt = _texte(messages[-1]['content']) if messages else ""
+        _, texte = self.reponses.choisir(prompt)
+        texte = texte[:parametres.get('max_tokens', 4096) * 4]
+
+        # Préfixe mis en cache : blocs system jusqu'au dernier marqué cache_control
+        systeme = parametres.get('system') or []
+        blocs = [systeme] if isinstance(systeme, str) else systeme
+        fin_prefixe = max((i + 1 for i, b in enumerate(blocs) if isinstance(b, dict) and b.get('cache_control')),
+                          default=0)
+        prefixe = _texte(blocs[:fin_prefixe]) if fin_prefixe else ""
+        entree = estimer_tokens(_texte(blocs[fin_prefixe:]) + prompt)
+        creation = lecture = 0
+        if prefixe:
+            cle = hashlib.sha256(prefixe.encode('utf-8')).hexdigest()
+            with self.lock:
+                deja_vu = cle in self.prefixes_caches
+                self.prefixes_caches.add(cle)
+            if deja_vu:
+                lecture = estimer_tokens(prefixe)
+            else:
+                creation = estimer_tokens(prefixe)
+
+        sortie = estimer_tokens(texte)
+        self._compter(input_tokens=entree + creation + lecture, output_tokens=sortie)
+        return {
+            'id': f"msg_{uuid.uuid4().hex[:24]}",
+            'type': 'message',
+            'role': 'assistant',
+            'model': parametres.get('model', 'claude'),
+            'content': [{'type': 'text', 'text': texte}],
+            'stop_reason': 'end_turn',
+            'stop_sequence': None,
+            'usage': {'input_tokens': entree, 'output_tokens': sortie,
+                      'cache_creation_input_tokens': creation, 'cache_read_input_tokens': lecture},
+        }, texte
+
+    def duree_generation(self, texte: str) -> float:
+        return estimer_tokens(texte) / self.debit if self.debit > 0 else 0.0
+
+    def creer_lot(self, requetes: List[Dict]) -> Dict:
+        identifiant = f"msgbatch_{uuid.uuid4().hex[:24]}"
+        lot = {'id': identifiant, 'requetes': requetes, 'cree': time.time(), 'resultats': None}
+        with self.lock:
+            self.lots[identifiant] = lot
+        self._compter(lots=1, requetes_lots=len(requetes))
+        return self.etat_lot(identifiant)
+
+    def etat_lot(self, identifiant: str) -> Optional[Dict]:
+        lot = self.lots.get(identifiant)
+        if lot is None:
+            return None
+        termine = time.time() - lot['cree'] >= self.duree_lot
+        if termine and lot['resultats'] is None:
+            lot['resultats'] = [{'custom_id': r['custom_id'],
+                                 'result': {'type': 'succeeded', 'message': self.message(r['params'])[0]}}
+                                for r in lot['requetes']]
+        n = len(lot['requetes'])
+        horodatage = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(lot['cree']))
+        return {
+            'id': identifiant,
+            'type': 'message_batch',
+            'processing_status': 'ended' if termine else 'in_progress',
+            'request_counts': {'processing': 0 if termine else n, 'succeeded': n if termine else 0,
+                               'errored': 0, 'canceled': 0, 'expired': 0},
+            'created_at': horodatage,
+            'expires_at': horodatage,
+            'ended_at': horodatage if termine else None,
+            'archived_at': None,
+            'cancel_initiated_at': None,
+            'results_url': f"{self.url}/v1/messages/batches/{identifiant}/results" if termine else None,
+        }
+
+
+class GestionnaireAnthropic(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server: ServeurAnthropic
+
+    def log_message(self, *args):
+        pass
+
+    def _json(self, donnees: Dict, statut: int = 200):
+        corps = json.dumps(donnees, ensure_ascii=False).encode('utf-8')
+        self.send_response(statut)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(corps)))
+        self.end_headers()
+        self.wfile.write(corps)
+
+    def _introuvable(self):
+        self.close_connection = True
+        self._json({'type': 'error', 'error': {'type': 'not_found_error', 'message': self.path}}, 404)
+
+    def _lire(self) -> Dict:
+        longueur = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(longueur) or b'{}')
+
+    def do_POST(self):
+        chemin = self.path.split('?')[0]
+        if chemin == '/v1/messages':
+            parametres = self._lire()
+            if parametres.get('stream'):
+                self._streamer(parametres)
+            else:
+                self.server._compter(requetes=1)
+                message, texte = self.server.message(parametres)
+                time.sleep(self.server.latence + self.server.duree_generation(texte))
+                self._json(message)
+        elif chemin == '/v1/messages/batches':
+            self._json(self.server.creer_lot(self._lire()['requests']))
+        else:
+            self._introuvable()
+
+    def do_GET(self):
+        morceaux = self.path.split('?')[0].strip('/').split('/')
+        if morceaux[:3] != ['v1', 'messages', 'batches'] or len(morceaux) < 4:
+            return self._introuvable()
+        etat = self.server.etat_lot(morceaux[3])
+        if etat is None:
+            return self._introuvable()
+        if len(morceaux) == 5 and morceaux[4] == 'results':
+            lignes = "\n".join(json.dumps(r, ensure_ascii=False) for r in self.server.lots[morceaux[3]]['resultats'] or [])
+            corps = lignes.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/x-jsonl')
+            self.send_header('Content-Length', str(len(corps)))
+            self.end_headers()
+            self.wfile.write(corps)
+        else:
+            self._json(etat)
+
+    def _morceau(self, donnees: bytes):
+        """Écrit un morceau en transfert chunked"""
+        self.wfile.write(f"{len(donnees):x}\r\n".encode('ascii') + donnees + b"\r\n")
+        self.wfile.flush()
+
+    def _evenement(self, type_evenement: str, donnees: Dict):
+        self._morceau(f"event: {type_evenement}\ndata: {json.dumps(donnees, ensure_ascii=False)}\n\n".encode('utf-8'))
+
+    def _streamer(self, parametres: Dict):
+        """Réponse SSE : message_start, fragments text_delta au débit configuré, message_stop"""
+        self.server._compter(requetes=1, streaming=1)
+        message, texte = self.server.message(parametres)
+        usage = message['usage']
+        debut = dict(message, content=[], stop_reason=None, usage=dict(usage, output_tokens=1))
+        fragments = [texte[i:i + TAILLE_FRAGMENT] for i in range(0, len(texte), TAILLE_FRAGMENT)] or [""]
+        pause = self.server.duree_generation(texte) / len(fragments)
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        time.sleep(self.server.latence)
+        self._evenement('message_start', {'type': 'message_start', 'message': debut})
+        self._evenement('content_block_start', {'type': 'content_block_start', 'index': 0,
+                                                'content_block': {'type': 'text', 'text': ''}})
+        for fragment in fragments:
+            if pause:
+                time.sleep(pause)
+            self._evenement('content_block_delta', {'type': 'content_block_delta', 'index': 0,
+                                                    'delta': {'type': 'text_delta', 'text': fragment}})
+        self._evenement('content_block_stop', {'type': 'content_block_stop', 'index': 0})
+        self._evenement('message_delta', {'type': 'message_delta',
+                                          'delta': {'stop_reason': 'end_turn', 'stop_sequence': None},
+                                          'usage': {'output_tokens': usage['output_tokens']}})
+        self._evenement('message_stop', {'type': 'message_stop'})
+        self._morceau(b"")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serveur local imitant l'API Anthropic")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latence', type=float, default=0.5, help="Délai avant le premier token (s)")
+    parser.add_argument('--debit', type=float, default=100.0, help="Tokens de sortie par seconde (0 = instantané)")
+    parser.add_argument('--duree-lot', type=float, default=2.0, help="Durée de traitement d'un lot Batch API (s)")
+    args = parser.parse_args()
+
+    serveur = ServeurAnthropic(args.port, args.latence, args.debit, args.duree_lot)
+    print(f"🤖 API Anthropic simulée sur {serveur.url}")
+    print(f"   export ANTHROPIC_BASE_URL={serveur.url}")
+    try:
+        serveur.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Serveur local des pages enregistrées des plateformes (LinkedIn, Indeed, WTTJ, Apec)
+Sert les pages de recherche et l'API GraphQL WTTJ depuis fixtures/, ainsi qu'une page
+d'annonce pour toute URL d'offre : recherche et scraping sans toucher aux vrais sites.
+recherche_postes.py y est redirigé par URLS_PLATEFORMES (même adresse pour les quatre)
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlsplit
+
+BENCHMARKS_DIR = Path(__file__).parent.absolute()
+FIXTURES_DIR = BENCHMARKS_DIR / "fixtures"
+
+# Pages de recherche : chemin → (fixture, paramètre de pagination, offres par page de ce paramètre)
+PAGES_RECHERCHE = {
+    '/jobs/search': ('linkedin_recherche.html', 'start', 25),
+    '/jobs': ('indeed_recherche.html', 'start', 10),
+    '/candidat/recherche-emploi.html/emploi': ('apec_recherche.html', 'page', 1),
+}
+
+# Préfixes des URLs d'offres (toutes servies par la page d'annonce)
+PREFIXES_ANNONCES = ('/offres/', '/jobs/view/', '/viewjob', '/rc/clk', '/fr/companies/',
+                     '/candidat/recherche-emploi.html/emploi/detail-offre/')
+
+PAGE_VIDE = "<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"></head><body><main></main></body></html>\n"
+
+
+class ServeurFixtures(ThreadingHTTPServer):
+    """
+    Serveur HTTP des fixtures
+
+    latence : délai de chaque réponse (secondes) ; pages_max : nombre de pages de
+    résultats par recherche, les suivantes sont vides (fin de pagination).
+    """
+
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, latence: float = 0.05, pages_max: int = 10):
+        super().__init__(('127.0.0.1', port), GestionnaireFixtures)
+        self.latence = latence
+        self.pages_max = pages_max
+        self.lock = threading.Lock()
+        self.fixtures: Dict[str, str] = {}
+        self.compteurs = {'requetes': 0, 'octets': 0}
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def demarrer(self) -> 'ServeurFixtures':
+        """Sert les requêtes dans un thread de fond"""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def fixture(self, nom: str, **valeurs: str) -> str:
+        """Contenu d'une fixture, {{base}} et les autres marqueurs remplacés"""
+        with self.lock:
+            if nom not in self.fixtures:
+                self.fixtures[nom] = (FIXTURES_DIR / nom).read_text(encoding='utf-8')
+            contenu = self.fixtures[nom]
+        for cle, valeur in dict(valeurs, base=self.url).items():
+            contenu = contenu.replace('{{' + cle + '}}', str(valeur))
+        return contenu
+
+    def _compter(self, octets: int):
+        with self.lock:
+            self.compteurs['requetes'] += 1
+            self.compteurs['octets'] += octets
+
+
+class GestionnaireFixtures(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server: ServeurFixtures
+
+    def log_message(self, *args):
+        pass
+
+    def _repondre(self, contenu: Optional[str], type_contenu: str = 'text/html; charset=utf-8'):
+        time.sleep(self.server.latence)
+        if contenu is None:
+            self.close_connection = True
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        corps = contenu.encode('utf-8')
+        self.server._compter(len(corps))
+        self.send_response(200)
+        self.send_header('Content-Type', type_contenu)
+        self.send_header('Content-Length', str(len(corps)))
+        self.end_headers()
+        self.wfile.write(corps)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path in PAGES_RECHERCHE:
+            fixture, parametre, taille = PAGES_RECHERCHE[url.path]
+            valeur = parse_qs(url.query).get(parametre, ['0'])[0]
+            page = int(valeur) // taille if valeur.isdigit() else 0
+            if page >= self.server.pages_max:
+                return self._repondre(PAGE_VIDE)
+            return self._repondre(self.server.fixture(fixture, page=page))
+        if url.path.startswith(PREFIXES_ANNONCES):
+            offre = url.path.rstrip('/').rsplit('/', 1)[-1] or url.query
+            return self._repondre(self.server.fixture('annonce.html', offre=offre))
+        self._repondre(None)
+
+    def do_POST(self):
+        longueur = int(self.headers.get('Content-Length') or 0)
+        corps = self.rfile.read(longueur)
+        if urlsplit(self.path).path != '/api/graphql':
+            return self._repondre(None)
+        # Pagination GraphQL WTTJ : variables.page commence à 1
+        page = int(json.loads(corps or b'{}').get('variables', {}).get('page', 1)) - 1
+        if page >= self.server.pages_max:
+            return self._repondre(json.dumps({'data': {'jobs': {'edges': []}}}), 'application/json')
+        self._repondre(self.server.fixture('wttj_graphql.json', page=page), 'application/json')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serveur local des pages enregistrées des plateformes")
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--latence', type=float, default=0.05, help="Délai de chaque réponse (s)")
+    parser.add_argument('--pages-max', type=int, default=10, help="Pages de résultats par recherche")
+    args = parser.parse_args()
+
+    serveur = ServeurFixtures(args.port, args.latence, args.pages_max)
+    print(f"🌐 Plateformes simulées sur {serveur.url}")
+    print(f"   Offre d'exemple : {serveur.url}/offres/exemple")
+    try:
+        serveur.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
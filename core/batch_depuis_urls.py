@@ -6,10 +6,20 @@ Solution pragmatique pour traiter des offres de n'importe quelle plateforme
 
 import os
 import sys
-import time
-import subprocess
+import argparse
 from pathlib import Path
 
+import cache_llm
+import compilation_latex
+import instrumentation
+from journal_batch import JournalBatch
+from moteur_batch import MoteurBatch
+
+# Importer la configuration centralisée
+from config import *
+
+ROOT_DIR = Path(__file__).parent.absolute().parent
+
 
 def lire_urls(fichier: str) -> list:
     """Lit les URLs depuis un fichier texte"""
@@ -30,29 +40,16 @@ def lire_urls(fichier: str) -> list:
     return urls
 
 
-def generer_pour_url(url: str, index: int, total: int) -> bool:
-    """Génère CV/LM pour une URL"""
-    print(f"\n{'='*80}")
-    print(f"📄 [{index}/{total}] Traitement de l'offre")
-    print(f"🔗 {url}")
-    print(f"{'='*80}\n")
-    
-    try:
-        cmd = ['python3', 'generateur_cv_lettre.py', url]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        
-        if result.returncode == 0:
-            print(f"✅ Génération réussie!")
-            return True
-        else:
-            print(f"❌ Erreur lors de la génération")
-            if result.stderr:
-                print(f"   {result.stderr[:200]}")
-            return False
-    
-    except Exception as e:
-        print(f"❌ Exception: {e}")
-        return False
+def afficher_resultat(resultat: dict, nb_termines: int, total: int):
+    """Affiche le résultat d'une offre dès qu'elle est terminée"""
+    if resultat.get('repris'):
+        print(f"⏭️  [{nb_termines}/{total}] {resultat['url']} (déjà terminée)")
+        print(f"   📂 {resultat['dossier']}")
+    elif resultat['success']:
+        print(f"✅ [{nb_termines}/{total}] {resultat['url']}")
+        print(f"   📂 {resultat['dossier']}")
+    else:
+        print(f"❌ [{nb_termines}/{total}] {resultat['url']}")
 
 
 def main():
@@ -61,13 +58,39 @@ def main():
     print("="*80)
     print()
     
+    parser = argparse.ArgumentParser(description="Génération en batch depuis un fichier d'URLs")
+    parser.add_argument('fichier_urls', nargs='?', default="urls_a_traiter.txt",
+                        help="Fichier contenant une URL par ligne (défaut: urls_a_traiter.txt)")
+    parser.add_argument('--workers', type=int, default=BATCH_WORKERS,
+                        help=f"Nombre d'offres traitées simultanément (défaut: {BATCH_WORKERS})")
+    parser.add_argument('--batch-api', action='store_true',
+                        help="Envoie les appels Claude en lots asynchrones (Message Batches API) : "
+                             "moins cher, pour les longs traitements non interactifs")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Désactive le cache des réponses Claude")
+    parser.add_argument('--refresh', action='store_true',
+                        help="Ignore les réponses en cache et les remplace")
+    parser.add_argument('--force', action='store_true',
+                        help="Recompile les PDF même si le .tex n'a pas changé")
+    parser.add_argument('--resume', action='store_true',
+                        help="Reprend un batch interrompu : seules les étapes non réussies sont refaites")
+    args = parser.parse_args()
+    
+    if args.no_cache:
+        cache_llm.configurer(actif=False)
+    if args.refresh:
+        cache_llm.configurer(rafraichir=True)
+    if args.force:
+        compilation_latex.configurer(forcer=True)
+    
     # Déterminer le fichier d'URLs
-    if len(sys.argv) > 1:
-        fichier_urls = sys.argv[1]
-    else:
-        fichier_urls = "urls_a_traiter.txt"
+    fichier_urls = args.fichier_urls
     
     print(f"📁 Fichier d'URLs: {fichier_urls}")
+    if args.batch_api:
+        print("📦 Mode: Message Batches API (résultats en différé)")
+    else:
+        print(f"👷 Workers: {args.workers}")
     print()
     
     # Lire les URLs
@@ -87,12 +110,23 @@ def main():
     print(f"✅ {len(urls)} URL(s) trouvée(s)")
     print()
     
+    # Journal des étapes : un nouveau batch repart de zéro, --resume reprend où il s'était arrêté
+    journal = JournalBatch(ROOT_DIR / JOURNAL_BATCH_FICHIER)
+    if args.resume:
+        deja_terminees = sum(1 for url in urls if journal.dossier_termine(url))
+        print(f"🔁 Reprise: {deja_terminees}/{len(urls)} offre(s) déjà terminée(s)")
+        print()
+    
     # Confirmation
     print("⚠️  La génération en batch va:")
     print(f"   - Traiter {len(urls)} offres")
     print(f"   - Appeler l'API Claude ~{len(urls) * 4} fois")
-    print(f"   - Prendre environ {len(urls) * 2} minutes")
-    print(f"   - Coûter environ {len(urls) * 0.20}€")
+    if args.batch_api:
+        print(f"   - Prendre de quelques minutes à quelques heures (deux lots successifs)")
+        print(f"   - Coûter environ {len(urls) * 0.10}€ (tarif Batch API réduit de moitié)")
+    else:
+        print(f"   - Prendre environ {len(urls) * 2} minutes")
+        print(f"   - Coûter environ {len(urls) * 0.20}€")
     print()
     
     confirmation = input("Confirmer? (oui/non): ").strip().lower()
@@ -101,17 +135,34 @@ def main():
         print("\n❌ Génération annulée")
         sys.exit(0)
     
-    # Générer pour chaque URL
-    resultats = []
+    # Vérifier la clé API (le générateur tourne dans ce processus)
+    api_key = os.environ.get('ANTHROPIC_API_KEY')
+    if not api_key:
+        print("❌ Erreur: La variable d'environnement ANTHROPIC_API_KEY n'est pas définie")
+        print("   Vérifiez votre fichier .env ou exportez: export ANTHROPIC_API_KEY='votre-clé'")
+        sys.exit(1)
+    
+    if not args.resume:
+        journal.reinitialiser(urls)
+    
+    # Profil, client Claude et session HTTP partagés par toutes les offres
+    moteur = MoteurBatch(api_key, journal=journal)
+    print(f"📥 Informations de {moteur.infos.nom} chargées")
+    
+    # Générer pour chaque URL (le limiteur de débit remplace les pauses fixes)
+    print()
+    if args.batch_api:
+        print(f"🚀 Génération de {len(urls)} offre(s) via la Message Batches API...")
+        print()
+        resultats = moteur.executer_batch_api(urls, on_resultat=afficher_resultat)
+    else:
+        print(f"🚀 Génération de {len(urls)} offre(s) avec {args.workers} worker(s)...")
+        print()
+        resultats = moteur.executer(urls, workers=args.workers, on_resultat=afficher_resultat)
     
-    for i, url in enumerate(urls, 1):
-        success = generer_pour_url(url, i, len(urls))
-        resultats.append({'url': url, 'success': success})
-        
-        # Pause entre les générations
-        if i < len(urls):
-            print(f"\n⏱️  Pause de 3 secondes...")
-            time.sleep(3)
+    moteur.fermer()
+    journal.fermer()
+    rapport = instrumentation.ecrire_rapport('batch')
     
     # Résumé
     print("\n" + "="*80)
@@ -130,8 +181,13 @@ def main():
         for r in resultats:
             if not r['success']:
                 print(f"   - {r['url']}")
+        print("\n💡 Relancez avec --resume pour ne refaire que les étapes échouées")
     
     print()
+    print(f"📊 Tokens: {moteur.ia.claude.resume_usage()}")
+    if rapport:
+        print(f"⏱️  Durées par étape, p50/p95 (rapport: {rapport.relative_to(ROOT_DIR)}):")
+        print(instrumentation.rapport().resume())
     print(f"📂 Tous les dossiers sont dans: ./candidatures/")
     print()
 
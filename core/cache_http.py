@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Cache HTTP persistant des pages d'annonces
+Stocke le contenu et les en-têtes ETag / Last-Modified par URL normalisée,
+sert la copie locale tant qu'elle est fraîche (TTL) puis la revalide
+avec une requête conditionnelle (If-None-Match / If-Modified-Since)
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import requests
+
+import client_http
+
+# Importer la configuration centralisée
+from config import *
+
+ROOT_DIR = Path(__file__).parent.absolute().parent
+
+# Paramètres de suivi connus (en plus des utm_*) qui ne changent pas le contenu de la page ;
+# les autres (ref, page...) peuvent désigner une autre page sur certaines plateformes
+PARAMETRES_SUIVI = {'trk', 'trackingid', 'refid'}
+
+
+def normaliser_url(url: str) -> str:
+    """
+    Forme canonique d'une URL : hôte en minuscules, sans fragment ni paramètres de suivi, query triée
+
+    Le chemin est conservé tel quel (une barre finale peut désigner une autre page).
+    """
+    parties = urlsplit(url.strip())
+    scheme = parties.scheme.lower()
+    hote = parties.hostname.lower() if parties.hostname else ''
+    if parties.port and not ((scheme == 'http' and parties.port == 80) or (scheme == 'https' and parties.port == 443)):
+        hote = f"{hote}:{parties.port}"
+    query = sorted(
+        (cle, valeur) for cle, valeur in parse_qsl(parties.query, keep_blank_values=True)
+        if not (cle.lower().startswith('utm_') or cle.lower() in PARAMETRES_SUIVI)
+    )
+    chemin = parties.path or '/'
+    return urlunsplit((scheme, hote, chemin, urlencode(query), ''))
+
+
+class CacheHTTP:
+    """Cache disque (fichiers répartis par préfixe d'empreinte) des réponses HTTP GET"""
+
+    def __init__(self, dossier: str, ttl: float = CACHE_HTTP_TTL_SECONDES):
+        self.dossier = Path(dossier)
+        self.ttl = ttl
+
+    def _chemins(self, url: str):
+        empreinte = hashlib.sha256(normaliser_url(url).encode('utf-8')).hexdigest()
+        base = self.dossier / empreinte[:2] / empreinte[2:]
+        return base.with_suffix('.json'), base.with_suffix('.body')
+
+    def _lire(self, url: str):
+        chemin_meta, chemin_corps = self._chemins(url)
+        try:
+            with open(chemin_meta, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(chemin_corps, 'rb') as f:
+                return meta, f.read()
+        except (OSError, ValueError):
+            return None, None
+
+    def _ecrire(self, url: str, meta: Dict, corps: Optional[bytes]):
+        """Écriture atomique (fichier temporaire + remplacement)"""
+        chemin_meta, chemin_corps = self._chemins(url)
+        chemin_meta.parent.mkdir(parents=True, exist_ok=True)
+        suffixe = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        if corps is not None:
+            tmp = chemin_corps.with_name(chemin_corps.name + suffixe)
+            with open(tmp, 'wb') as f:
+                f.write(corps)
+            os.replace(tmp, chemin_corps)
+        tmp = chemin_meta.with_name(chemin_meta.name + suffixe)
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp, chemin_meta)
+
+    def telecharger(self, url: str, session: Optional[requests.Session] = None,
+                    headers: Optional[Dict] = None, timeout: float = HTTP_TIMEOUT) -> bytes:
+        """Retourne le contenu de l'URL, depuis le cache si possible"""
+        meta, corps = self._lire(url)
+
+        # Copie fraîche : aucun aller-retour réseau
+        if meta and time.time() - meta.get('date', 0) < self.ttl:
+            return corps
+
+        en_tetes = dict(headers or {})
+        if meta:
+            if meta.get('etag'):
+                en_tetes['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                en_tetes['If-Modified-Since'] = meta['last_modified']
+
+        http = session or client_http.obtenir_session()
+        client_http.attendre_politesse(url)
+        response = client_http.comptabiliser(http.get(url, headers=en_tetes, timeout=timeout))
+
+        if response.status_code == 304 and meta:
+            # Inchangée côté serveur : on prolonge la copie locale sans la retélécharger
+            meta['date'] = time.time()
+            self._ecrire(url, meta, None)
+            return corps
+
+        response.raise_for_status()
+        meta = {
+            'url': normaliser_url(url),
+            'date': time.time(),
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+        }
+        self._ecrire(url, meta, response.content)
+        return response.content
+
+
+_instance: Optional[CacheHTTP] = None
+_instance_lock = threading.Lock()
+
+
+def telecharger(url: str, session: Optional[requests.Session] = None,
+                headers: Optional[Dict] = None, timeout: float = HTTP_TIMEOUT) -> bytes:
+    """GET avec le cache partagé du processus (ou direct si CACHE_HTTP_ACTIF = False)"""
+    global _instance
+    if not CACHE_HTTP_ACTIF:
+        client_http.attendre_politesse(url)
+        response = client_http.comptabiliser(
+            (session or client_http.obtenir_session()).get(url, headers=headers, timeout=timeout))
+        response.raise_for_status()
+        return response.content
+    # Premier appel possible depuis plusieurs threads de téléchargement à la fois
+    with _instance_lock:
+        if _instance is None:
+            _instance = CacheHTTP(ROOT_DIR / CACHE_HTTP_DOSSIER)
+    return _instance.telecharger(url, session=session, headers=headers, timeout=timeout)
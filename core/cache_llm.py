@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Cache disque des réponses de Claude
+Clé = empreinte SHA-256 de (modèle, prompt système, prompt, température, max_tokens) :
+une régénération après une simple correction de template LaTeX ne rappelle pas l'API
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, List, Optional
+
+# Importer la configuration centralisée
+from config import *
+
+ROOT_DIR = Path(__file__).parent.absolute().parent
+
+
+class CacheLLM:
+    """Cache SQLite des réponses, avec éviction par âge et par taille totale"""
+
+    # Fréquence (en nombre d'écritures) du contrôle de la taille du cache
+    EVICTION_TOUTES_LES = 50
+
+    def __init__(self, chemin: str, taille_max_mo: float = CACHE_LLM_TAILLE_MAX_MO,
+                 age_max_jours: float = CACHE_LLM_AGE_MAX_JOURS, rafraichir: bool = False):
+        self.chemin = Path(chemin)
+        self.chemin.parent.mkdir(parents=True, exist_ok=True)
+        self.taille_max = int(taille_max_mo * 1024 * 1024)
+        self.age_max = age_max_jours * 86400
+        # En mode rafraîchissement on n'utilise pas les entrées existantes mais on les remplace
+        self.rafraichir = rafraichir
+        self._ecritures = 0
+        self._lock = threading.Lock()
+        # Connexion partagée entre threads, protégée par le verrou
+        self._conn = sqlite3.connect(str(self.chemin), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS reponses (
+                cle TEXT PRIMARY KEY,
+                reponse TEXT NOT NULL,
+                taille INTEGER NOT NULL,
+                cree REAL NOT NULL,
+                dernier_acces REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+        self.evincer()
+
+    @staticmethod
+    def cle(model: str, system: Any, prompt: Any, temperature: float, max_tokens: int) -> str:
+        """Empreinte stable des paramètres qui déterminent la réponse"""
+        donnees = json.dumps([model, system, prompt, temperature, max_tokens],
+                             ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(donnees.encode('utf-8')).hexdigest()
+
+    def obtenir(self, cle: str) -> Optional[str]:
+        """Retourne la réponse en cache (None si absente, expirée ou en mode rafraîchissement)"""
+        if self.rafraichir:
+            return None
+        maintenant = time.time()
+        with self._lock:
+            ligne = self._conn.execute(
+                "SELECT reponse, cree FROM reponses WHERE cle = ?", (cle,)
+            ).fetchone()
+            if ligne is None:
+                return None
+            if self.age_max and maintenant - ligne[1] > self.age_max:
+                self._conn.execute("DELETE FROM reponses WHERE cle = ?", (cle,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE reponses SET dernier_acces = ? WHERE cle = ?", (maintenant, cle))
+            self._conn.commit()
+        return ligne[0]
+
+    def enregistrer(self, cle: str, reponse: str):
+        """Ajoute ou remplace une réponse"""
+        maintenant = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO reponses (cle, reponse, taille, cree, dernier_acces) VALUES (?, ?, ?, ?, ?)",
+                (cle, reponse, len(reponse.encode('utf-8')), maintenant, maintenant)
+            )
+            self._conn.commit()
+            self._ecritures += 1
+            controler = self._ecritures % self.EVICTION_TOUTES_LES == 0
+        if controler:
+            self.evincer()
+
+    def evincer(self):
+        """Supprime les entrées trop anciennes puis les moins récemment utilisées au-delà de la taille max"""
+        with self._lock:
+            if self.age_max:
+                self._conn.execute("DELETE FROM reponses WHERE cree < ?", (time.time() - self.age_max,))
+            total = self._conn.execute("SELECT COALESCE(SUM(taille), 0) FROM reponses").fetchone()[0]
+            if self.taille_max and total > self.taille_max:
+                a_liberer = total - self.taille_max
+                cles: List[str] = []
+                for cle, taille in self._conn.execute(
+                        "SELECT cle, taille FROM reponses ORDER BY dernier_acces ASC"):
+                    cles.append(cle)
+                    a_liberer -= taille
+                    if a_liberer <= 0:
+                        break
+                self._conn.executemany("DELETE FROM reponses WHERE cle = ?", [(c,) for c in cles])
+            self._conn.commit()
+
+    def vider(self):
+        """Supprime toutes les entrées"""
+        with self._lock:
+            self._conn.execute("DELETE FROM reponses")
+            self._conn.commit()
+
+
+# ==================== INSTANCE PARTAGÉE ====================
+
+_options = {'actif': CACHE_LLM_ACTIF, 'rafraichir': False}
+_instance: Optional[CacheLLM] = None
+_instance_lock = threading.Lock()
+
+
+def configurer(actif: Optional[bool] = None, rafraichir: Optional[bool] = None):
+    """Active/désactive le cache pour le processus (options --no-cache / --refresh)"""
+    global _instance
+    with _instance_lock:
+        if actif is not None:
+            _options['actif'] = actif
+        if rafraichir is not None:
+            _options['rafraichir'] = rafraichir
+        _instance = None
+
+
+def appliquer_options_ligne_commande(argv: List[str]) -> List[str]:
+    """Interprète et retire --no-cache / --refresh d'une liste d'arguments"""
+    if '--no-cache' in argv:
+        configurer(actif=False)
+    if '--refresh' in argv:
+        configurer(rafraichir=True)
+    return [arg for arg in argv if arg not in ('--no-cache', '--refresh')]
+
+
+def obtenir_cache() -> Optional[CacheLLM]:
+    """Retourne le cache partagé du processus (None s'il est désactivé)"""
+    global _instance
+    if not _options['actif']:
+        return None
+    with _instance_lock:
+        if _instance is None:
+            _instance = CacheLLM(ROOT_DIR / CACHE_LLM_FICHIER, rafraichir=_options['rafraichir'])
+        return _instance
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Cache du profil parsé (infos_statique.txt)
+L'objet construit à partir du fichier est sérialisé (pickle) à côté de lui, dans
+.<nom du fichier>.pickle. Il est réutilisé sans relire le fichier tant que sa taille
+et sa date de modification sont inchangées ; sinon le contenu est relu et comparé
+à son empreinte SHA-256 (les scripts de lancement recopient infos_statique.txt à
+chaque exécution, ce qui change seulement la date). Le contexte fourni par
+l'appelant (MODE_PROFIL, version du parseur) fait partie de la clé.
+"""
+
+import contextlib
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Optional, Tuple, TypeVar
+
+T = TypeVar('T')
+
+# Version du format du fichier de cache
+VERSION_FORMAT = 1
+
+
+def chemin_cache(source: Path) -> Path:
+    """Fichier de cache associé à un fichier source"""
+    return source.with_name(f".{source.name}.pickle")
+
+
+def _lire(cache: Path) -> Optional[dict]:
+    """Entrée du cache (None si absente ou illisible)"""
+    try:
+        with open(cache, 'rb') as f:
+            entree = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError, ValueError, TypeError):
+        return None
+    if not isinstance(entree, dict) or entree.get('version') != VERSION_FORMAT:
+        return None
+    return entree
+
+
+def _ecrire(cache: Path, entree: dict):
+    """Écriture atomique (fichier temporaire renommé) ; un échec laisse simplement le cache absent"""
+    temporaire = None
+    try:
+        descripteur, temporaire = tempfile.mkstemp(dir=cache.parent, prefix=cache.name, suffix='.tmp')
+        with os.fdopen(descripteur, 'wb') as f:
+            pickle.dump(entree, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporaire, cache)
+    except OSError:
+        if temporaire:
+            with contextlib.suppress(OSError):
+                os.unlink(temporaire)
+
+
+def charger(source: str, construire: Callable[[str], T], contexte: Tuple[Any, ...] = ()) -> T:
+    """
+    construire(contenu de source), depuis le cache quand il correspond au fichier et au contexte
+
+    Le cache est (ré)écrit après chaque construction, et sa date mise à jour quand seul
+    l'horodatage du fichier a changé.
+    """
+    source = Path(source)
+    cache = chemin_cache(source)
+    etat = source.stat()
+    entree = _lire(cache)
+    if entree is not None and entree['contexte'] != contexte:
+        entree = None
+
+    # Fichier inchangé : pas même besoin de le relire
+    if entree is not None and (entree['mtime_ns'], entree['taille']) == (etat.st_mtime_ns, etat.st_size):
+        return entree['objet']
+
+    with open(source, 'rb') as f:
+        octets = f.read()
+    empreinte = hashlib.sha256(octets).hexdigest()
+
+    if entree is None or entree['empreinte'] != empreinte:
+        entree = {
+            'version': VERSION_FORMAT,
+            'contexte': contexte,
+            'empreinte': empreinte,
+            # Fins de ligne normalisées comme à la lecture en mode texte
+            'objet': construire(octets.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')),
+        }
+    # Contenu identique (fichier recopié ou touché) : seul l'horodatage est actualisé
+    entree.update(mtime_ns=etat.st_mtime_ns, taille=etat.st_size)
+    _ecrire(cache, entree)
+    return entree['objet']
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Client Claude partagé
+Point de passage unique des appels à l'API Anthropic, avec limitation de débit
+(requêtes/minute et tokens/minute) commune à tous les threads et cache disque des réponses
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Union
+from anthropic import Anthropic
+
+import instrumentation
+from cache_llm import CacheLLM, obtenir_cache
+
+# Importer la configuration centralisée
+from config import *
+
+
+class LimiteurDebit:
+    """Double seau à jetons : requêtes par minute et tokens par minute"""
+
+    def __init__(self, requetes_par_minute: int = API_REQUETES_PAR_MINUTE,
+                 tokens_par_minute: int = API_TOKENS_PAR_MINUTE):
+        self.capacite_requetes = float(requetes_par_minute)
+        self.capacite_tokens = float(tokens_par_minute)
+        self.requetes = self.capacite_requetes
+        self.tokens = self.capacite_tokens
+        self._dernier_remplissage = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _remplir(self):
+        """Recharge les seaux au prorata du temps écoulé (appelé sous verrou)"""
+        maintenant = time.monotonic()
+        ecoule = maintenant - self._dernier_remplissage
+        self._dernier_remplissage = maintenant
+        self.requetes = min(self.capacite_requetes, self.requetes + ecoule * self.capacite_requetes / 60)
+        self.tokens = min(self.capacite_tokens, self.tokens + ecoule * self.capacite_tokens / 60)
+
+    def acquerir(self, tokens: int):
+        """Bloque jusqu'à ce qu'une requête de `tokens` tokens (estimés) puisse partir"""
+        # Une requête plus grosse que le seau entier attend simplement qu'il soit plein
+        tokens = min(float(tokens), self.capacite_tokens)
+        while True:
+            with self._lock:
+                self._remplir()
+                if self.requetes >= 1 and self.tokens >= tokens:
+                    self.requetes -= 1
+                    self.tokens -= tokens
+                    return
+                # Temps nécessaire pour que les deux seaux soient suffisamment remplis
+                attente_requetes = max(0.0, 1 - self.requetes) * 60 / self.capacite_requetes
+                attente_tokens = max(0.0, tokens - self.tokens) * 60 / self.capacite_tokens
+            time.sleep(max(attente_requetes, attente_tokens, 0.05))
+
+    def ajuster(self, delta_tokens: int):
+        """Corrige le seau après réponse (delta = tokens réels - tokens estimés)"""
+        with self._lock:
+            self._remplir()
+            self.tokens = min(self.capacite_tokens, self.tokens - delta_tokens)
+
+
+def _texte(contenu: Any) -> str:
+    """Texte d'un prompt, qu'il soit une chaîne ou une liste de blocs {"type": "text", ...}"""
+    if isinstance(contenu, list):
+        return ''.join(bloc.get('text', '') for bloc in contenu)
+    return contenu or ''
+
+
+def estimer_tokens(*textes: Any) -> int:
+    """Estimation grossière du nombre de tokens (~4 caractères par token)"""
+    return sum(len(_texte(t)) for t in textes) // 4 + 1
+
+
+def systeme_avec_contexte(instructions: str, contexte: str) -> List[Dict]:
+    """
+    Prompt système en deux blocs : contexte stable (profil candidat) puis instructions
+    
+    Le contexte vient en premier et porte un point de cache (prompt caching) : tous les
+    appels qui le partagent, quelles que soient leurs instructions, le relisent depuis
+    le cache de l'API au lieu de le refacturer. Sous la taille minimale cachable du
+    modèle, l'API ignore simplement le point de cache.
+    """
+    return [
+        {"type": "text", "text": contexte, "cache_control": {"type": "ephemeral"}},
+        {"type": "text", "text": instructions},
+    ]
+
+
+class ClientClaude:
+    """Enveloppe le client Anthropic : tous les appels passent par le cache puis le limiteur de débit"""
+
+    # Compteurs d'usage cumulés sur le processus
+    COMPTEURS = ('appels', 'reponses_cache_local', 'input_tokens', 'output_tokens',
+                 'cache_creation_input_tokens', 'cache_read_input_tokens')
+
+    def __init__(self, api_key: str, limiteur: Optional[LimiteurDebit] = None):
+        self.client = Anthropic(api_key=api_key)
+        self.limiteur = limiteur or LimiteurDebit()
+        self.usage = dict.fromkeys(self.COMPTEURS, 0)
+        self._usage_lock = threading.Lock()
+
+    def _comptabiliser(self, **compteurs: int):
+        with self._usage_lock:
+            for nom, valeur in compteurs.items():
+                self.usage[nom] += valeur or 0
+
+    def resume_usage(self) -> str:
+        """Bilan des appels : tokens facturés, écrits et relus dans le cache de prompts"""
+        with self._usage_lock:
+            u = dict(self.usage)
+        entree_totale = u['input_tokens'] + u['cache_creation_input_tokens'] + u['cache_read_input_tokens']
+        taux = u['cache_read_input_tokens'] / entree_totale * 100 if entree_totale else 0
+        return (f"{u['appels']} appel(s) API, {u['reponses_cache_local']} réponse(s) du cache local | "
+                f"entrée: {u['input_tokens']} non cachés, {u['cache_creation_input_tokens']} écrits en cache, "
+                f"{u['cache_read_input_tokens']} lus en cache ({taux:.0f}%) | sortie: {u['output_tokens']}")
+
+    def appeler(self, system: Union[str, List[Dict]], prompt: str, max_tokens: int,
+                temperature: float = TEMPERATURE, model: str = CLAUDE_MODEL,
+                rafraichir: bool = False,
+                on_texte: Optional[Callable[[str], None]] = None,
+                valider: Optional[Callable[[str], Any]] = None) -> str:
+        """
+        Envoie un message unique et retourne le texte de la réponse
+        
+        rafraichir=True ignore la réponse en cache et la remplace (réponse précédente inexploitable).
+        Avec on_texte, la réponse est reçue en streaming (messages.stream) et chaque fragment
+        de texte lui est transmis dès son arrivée ; une réponse en cache lui est transmise d'un bloc.
+        valider lit la réponse (exception si elle est inexploitable) : une réponse qu'il refuse
+        est retournée sans être mise en cache, et n'est pas relue depuis le cache.
+        """
+        cache = obtenir_cache()
+        cle = CacheLLM.cle(model, system, prompt, temperature, max_tokens)
+        if cache and not rafraichir:
+            texte = cache.obtenir(cle)
+            if texte is not None and self._valide(texte, valider):
+                self._comptabiliser(reponses_cache_local=1)
+                instrumentation.ajouter(reponses_cache_local=1)
+                if on_texte:
+                    on_texte(texte)
+                return texte
+
+        # On réserve le pire cas (entrée estimée + sortie maximale), puis on rembourse
+        estimation = estimer_tokens(system, prompt) + max_tokens
+        self.limiteur.acquerir(estimation)
+
+        parametres = self._parametres(system, prompt, max_tokens, temperature, model)
+        try:
+            if on_texte:
+                with self.client.messages.stream(**parametres) as flux:
+                    # Pas de retries_taken en streaming : le SDK le transmet dans l'en-tête de la requête
+                    requete = getattr(getattr(flux, 'response', None), 'request', None)
+                    reprises = requete.headers.get('x-stainless-retry-count', '0') if requete is not None else '0'
+                    instrumentation.ajouter(tentatives=int(reprises) if reprises.isdigit() else 0)
+                    for fragment in flux.text_stream:
+                        on_texte(fragment)
+                    response = flux.get_final_message()
+            else:
+                # Réponse brute : donne aussi le nombre de reprises faites par le SDK
+                brute = self.client.messages.with_raw_response.create(**parametres)
+                instrumentation.ajouter(tentatives=getattr(brute, 'retries_taken', 0))
+                response = brute.parse()
+        except Exception:
+            self.limiteur.ajuster(-estimation)
+            raise
+
+        usage = getattr(response, 'usage', None)
+        if usage is not None:
+            # Les tokens relus dans le cache de prompts ne comptent pas dans la limite par minute
+            creation = getattr(usage, 'cache_creation_input_tokens', 0) or 0
+            self.limiteur.ajuster(usage.input_tokens + creation + usage.output_tokens - estimation)
+        self._comptabiliser_reponse(response)
+
+        texte = response.content[0].text
+        if cache and texte and self._valide(texte, valider):
+            cache.enregistrer(cle, texte)
+        return texte
+
+    @staticmethod
+    def _valide(texte: str, valider: Optional[Callable[[str], Any]]) -> bool:
+        """La réponse peut-elle être mise en cache (valider l'accepte, ou pas de valider)"""
+        if valider is None:
+            return True
+        try:
+            valider(texte)
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _parametres(system: Union[str, List[Dict]], prompt: str, max_tokens: int,
+                    temperature: float = TEMPERATURE, model: str = CLAUDE_MODEL) -> Dict:
+        """Paramètres de messages.create (identiques en appel direct et en lot)"""
+        return {
+            'model': model,
+            'max_tokens': max_tokens,
+            'temperature': temperature,
+            'system': system,
+            'messages': [
+                {"role": "user", "content": prompt}
+            ]
+        }
+
+    def _comptabiliser_reponse(self, response):
+        """Ajoute l'usage d'une réponse aux compteurs"""
+        usage = getattr(response, 'usage', None)
+        if usage is not None:
+            creation = getattr(usage, 'cache_creation_input_tokens', 0) or 0
+            lecture = getattr(usage, 'cache_read_input_tokens', 0) or 0
+            self._comptabiliser(appels=1, input_tokens=usage.input_tokens, output_tokens=usage.output_tokens,
+                                cache_creation_input_tokens=creation, cache_read_input_tokens=lecture)
+            instrumentation.ajouter(input_tokens=usage.input_tokens, output_tokens=usage.output_tokens,
+                                    cache_creation_input_tokens=creation, cache_read_input_tokens=lecture)
+        else:
+            self._comptabiliser(appels=1)
+
+    @instrumentation.instrumenter('ia.lot')
+    def appeler_lot(self, requetes: Dict[str, Dict], log=print) -> Dict[str, Optional[str]]:
+        """
+        Envoie des requêtes en un lot asynchrone (Message Batches API) et attend les résultats
+
+        requetes associe un identifiant ([a-zA-Z0-9_-], 64 caractères max) aux arguments
+        d'appeler (system, prompt, max_tokens, valider, ...). Les réponses déjà en cache ne sont pas
+        renvoyées à l'API. Retourne {identifiant: texte}, None pour une requête en échec.
+        Le lot n'est pas soumis au limiteur de débit : la Batch API a ses propres quotas.
+        """
+        cache = obtenir_cache()
+        textes: Dict[str, Optional[str]] = {}
+        a_envoyer: Dict[str, Dict] = {}
+        cles: Dict[str, str] = {}
+        valideurs: Dict[str, Optional[Callable[[str], Any]]] = {}
+
+        for identifiant, requete in requetes.items():
+            requete = dict(requete)
+            valideurs[identifiant] = requete.pop('valider', None)
+            parametres = self._parametres(**requete)
+            cles[identifiant] = CacheLLM.cle(parametres['model'], parametres['system'], requete['prompt'],
+                                             parametres['temperature'], parametres['max_tokens'])
+            texte = cache.obtenir(cles[identifiant]) if cache else None
+            if texte is not None and self._valide(texte, valideurs[identifiant]):
+                self._comptabiliser(reponses_cache_local=1)
+                instrumentation.ajouter(reponses_cache_local=1)
+                textes[identifiant] = texte
+            else:
+                a_envoyer[identifiant] = parametres
+
+        if not a_envoyer:
+            return textes
+
+        lot = self.client.messages.batches.create(
+            requests=[{'custom_id': identifiant, 'params': parametres}
+                      for identifiant, parametres in a_envoyer.items()]
+        )
+        log(f"   📤 Lot {lot.id} : {len(a_envoyer)} requête(s) envoyée(s)"
+            + (f", {len(textes)} servie(s) par le cache" if textes else ""))
+
+        # Un lot prend de quelques minutes à plusieurs heures : interrogation de plus en plus espacée
+        intervalle = BATCH_API_INTERVALLE_SECONDES
+        while lot.processing_status != 'ended':
+            time.sleep(intervalle)
+            intervalle = min(intervalle * 1.5, BATCH_API_INTERVALLE_MAX_SECONDES)
+            lot = self.client.messages.batches.retrieve(lot.id)
+            compteurs = lot.request_counts
+            log(f"   ⏳ Lot {lot.id} : {compteurs.succeeded + compteurs.errored + compteurs.expired}"
+                f"/{len(a_envoyer)} traitée(s)")
+
+        for resultat in self.client.messages.batches.results(lot.id):
+            identifiant = resultat.custom_id
+            if resultat.result.type != 'succeeded':
+                log(f"   ⚠️  Requête {identifiant} : {resultat.result.type}")
+                textes[identifiant] = None
+                continue
+            message = resultat.result.message
+            self._comptabiliser_reponse(message)
+            texte = message.content[0].text
+            textes[identifiant] = texte
+            if cache and texte and self._valide(texte, valideurs[identifiant]):
+                cache.enregistrer(cles[identifiant], texte)
+
+        return textes
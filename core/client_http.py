@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Couche HTTP partagée par tous les scrapers
+Une seule session requests : pools de connexions par hôte (keep-alive),
+reprises automatiques avec backoff exponentiel sur 429/5xx (respect de Retry-After),
+timeouts configurables et délai de politesse par hôte
+"""
+
+import threading
+import time
+from typing import Optional
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import instrumentation
+
+# Importer la configuration centralisée
+from config import *
+
+
+def _creer_adaptateur(taille_pool: int) -> HTTPAdapter:
+    """Adaptateur avec politique de reprise et pool de connexions de la taille donnée"""
+    retry = Retry(
+        total=HTTP_RETRY_TOTAL,
+        backoff_factor=HTTP_RETRY_BACKOFF,
+        status_forcelist=(429, 500, 502, 503, 504),
+        # La requête GraphQL WTTJ est une lecture : on peut la rejouer
+        allowed_methods=frozenset(['GET', 'HEAD', 'POST']),
+        respect_retry_after_header=True,
+        # Après la dernière tentative on rend la réponse : chaque scraper gère son code HTTP
+        raise_on_status=False,
+    )
+    return HTTPAdapter(pool_connections=HTTP_POOL_HOTES, pool_maxsize=taille_pool, max_retries=retry)
+
+
+def creer_session() -> requests.Session:
+    """Crée une session configurée (pools par hôte, reprises, User-Agent)"""
+    session = requests.Session()
+    session.headers['User-Agent'] = USER_AGENT
+
+    adaptateur = _creer_adaptateur(HTTP_POOL_TAILLE)
+    session.mount('https://', adaptateur)
+    session.mount('http://', adaptateur)
+
+    # Hôtes avec une taille de pool spécifique (le préfixe le plus long l'emporte)
+    for hote, taille in HTTP_POOL_TAILLE_PAR_HOTE.items():
+        adaptateur_hote = _creer_adaptateur(taille)
+        session.mount(f'https://{hote}', adaptateur_hote)
+        session.mount(f'http://{hote}', adaptateur_hote)
+
+    return session
+
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def obtenir_session() -> requests.Session:
+    """Retourne la session partagée du processus (créée au premier appel)"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = creer_session()
+        return _session
+
+
+def timeout_pour(url: str) -> float:
+    """Timeout configuré pour l'hôte de l'URL (HTTP_TIMEOUT par défaut)"""
+    hote = (urlsplit(url).hostname or '').lower()
+    return HTTP_TIMEOUTS_PAR_HOTE.get(hote, HTTP_TIMEOUT)
+
+
+# Prochain instant où chaque hôte peut être sollicité (délai de politesse)
+_prochain_creneau = {}
+_politesse_lock = threading.Lock()
+
+
+def attendre_politesse(url: str):
+    """
+    Espace les requêtes vers un même hôte de DELAI_POLITESSE_PAR_HOTE secondes
+
+    Le délai est propre à chaque hôte : des requêtes vers des plateformes
+    différentes (recherche parallèle) ne s'attendent pas entre elles.
+    """
+    hote = (urlsplit(url).hostname or '').lower()
+    delai = DELAI_POLITESSE_PAR_HOTE.get(hote, DELAI_POLITESSE_DEFAUT)
+    if delai <= 0:
+        return
+    with _politesse_lock:
+        maintenant = time.monotonic()
+        creneau = max(maintenant, _prochain_creneau.get(hote, 0.0))
+        _prochain_creneau[hote] = creneau + delai
+    if creneau > maintenant:
+        time.sleep(creneau - maintenant)
+
+
+def comptabiliser(response: requests.Response) -> requests.Response:
+    """Attribue à l'étape en cours les octets reçus et les reprises faites par l'adaptateur"""
+    reprises = getattr(getattr(response, 'raw', None), 'retries', None)
+    instrumentation.ajouter(octets=len(response.content),
+                            tentatives=len(reprises.history) if reprises is not None else 0)
+    return response
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    """GET via la session partagée, avec le timeout de l'hôte si non précisé"""
+    kwargs.setdefault('timeout', timeout_pour(url))
+    attendre_politesse(url)
+    return comptabiliser(obtenir_session().get(url, **kwargs))
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    """POST via la session partagée, avec le timeout de l'hôte si non précisé"""
+    kwargs.setdefault('timeout', timeout_pour(url))
+    attendre_politesse(url)
+    return comptabiliser(obtenir_session().post(url, **kwargs))
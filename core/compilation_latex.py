@@ -0,0 +1,491 @@
+#!/usr/bin/env python3
+"""
+Compilation LaTeX → PDF
+Service de compilation parallèle : un pool de processus (un par cœur) reçoit les documents
+de toutes les candidatures et les rend pendant que la génération continue.
+Le rendu passe par un moteur interchangeable (MOTEUR_PDF) : pdflatex sur les .tex
+générés, ou un moteur Python pur (rendu_pdf) pour les hôtes sans installation TeX.
+Le préambule de chaque template est précompilé une fois en format (.fmt) :
+le chargement des packages n'est plus refait à chaque document.
+Une empreinte de chaque .tex compilé est conservée à côté du PDF : un document
+inchangé n'est pas recompilé (--force pour tout recompiler)
+"""
+
+import hashlib
+import importlib
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import instrumentation
+
+# Importer la configuration centralisée
+from config import *
+
+ROOT_DIR = Path(__file__).parent.absolute().parent
+
+# Chemin complet de pdflatex : configuré, sinon trouvé dans le PATH, sinon emplacement MacTeX
+PDFLATEX_PATH = PDFLATEX_CHEMIN or shutil.which("pdflatex") or "/Library/TeX/texbin/pdflatex"
+
+# Moteurs de rendu disponibles (nom → "module.Classe", importés à la demande)
+MOTEURS_RENDU = {
+    "pdflatex": "compilation_latex.MoteurPdflatex",
+    "reportlab": "rendu_pdf.MoteurReportlab",
+}
+
+# Messages par lesquels LaTeX (ou un package) demande une passe supplémentaire
+MOTIF_RERUN = re.compile(
+    r"Rerun to get|Label\(s\) may have changed|Please \(?re\)?run|\(rerunfilecheck\).*Rerun",
+    re.IGNORECASE
+)
+
+
+@dataclass
+class ResultatCompilation:
+    """Résultat de la compilation d'un fichier .tex"""
+    tex_file: str
+    succes: bool
+    pdf_file: Optional[str]
+    duree: float
+    passes: int = 0
+    format_precompile: bool = False
+    inchange: bool = False
+    moteur: str = "pdflatex"
+    log: str = ""
+
+
+@dataclass
+class DocumentPDF:
+    """
+    Document à rendre en PDF
+
+    tex_file est le .tex généré (le PDF est écrit à côté). type ('cv' ou 'lettre') et
+    donnees (infos personnelles et textes générés) servent aux moteurs qui ne passent
+    pas par LaTeX ; un document sans données est toujours rendu par pdflatex.
+    """
+    tex_file: str
+    type: str = ""
+    donnees: Optional[Dict[str, Any]] = None
+
+
+def _empreinte(chemin: str) -> Optional[str]:
+    """Empreinte du fichier (None s'il n'existe pas)"""
+    try:
+        with open(chemin, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+# Options de la ligne de commande (--force)
+_options = {'forcer': False}
+
+
+def configurer(forcer: Optional[bool] = None):
+    """Change les options de compilation du processus (avant de créer un ServiceCompilation)"""
+    if forcer is not None:
+        _options['forcer'] = forcer
+
+
+def appliquer_options_ligne_commande(argv: List[str]) -> List[str]:
+    """Interprète et retire --force d'une liste d'arguments"""
+    if '--force' in argv:
+        configurer(forcer=True)
+    return [arg for arg in argv if arg != '--force']
+
+
+_version_moteur: Optional[str] = None
+
+
+def _signature_moteur() -> str:
+    """Version de pdflatex (un format n'est valide que pour le moteur qui l'a produit)"""
+    global _version_moteur
+    if _version_moteur is None:
+        try:
+            sortie = subprocess.run([PDFLATEX_PATH, "--version"], capture_output=True, text=True).stdout
+            _version_moteur = sortie.splitlines()[0] if sortie else PDFLATEX_PATH
+        except OSError:
+            _version_moteur = PDFLATEX_PATH
+    return _version_moteur
+
+
+def preparer_format(tex_file: str) -> Optional[str]:
+    """
+    Nom du format précompilé correspondant au préambule de tex_file (None si indisponible)
+
+    Le format est construit au premier besoin avec mylatexformat (pdflatex -ini) et mis
+    en cache dans LATEX_FORMAT_DOSSIER, sous une clé dérivée du préambule et de la
+    version de pdflatex. Un préambule qui ne se laisse pas précompiler est mémorisé
+    (fichier .echec) pour ne pas retenter à chaque document.
+    """
+    with open(tex_file, 'r', encoding='utf-8') as f:
+        contenu = f.read()
+    fin = contenu.find('\\begin{document}')
+    if fin < 0:
+        return None
+    preambule = contenu[:fin]
+
+    cle = hashlib.sha256((_signature_moteur() + preambule).encode('utf-8')).hexdigest()[:16]
+    nom = f"preambule_{cle}"
+    dossier = ROOT_DIR / LATEX_FORMAT_DOSSIER
+    if (dossier / f"{nom}.fmt").exists():
+        return nom
+    if (dossier / f"{nom}.echec").exists():
+        return None
+
+    dossier.mkdir(parents=True, exist_ok=True)
+    # Construction dans un dossier temporaire puis remplacement atomique :
+    # plusieurs processus du pool peuvent construire le même format sans conflit
+    with tempfile.TemporaryDirectory(dir=dossier) as tmp:
+        with open(os.path.join(tmp, f"{nom}.tex"), 'w', encoding='utf-8') as f:
+            f.write(preambule + "\\begin{document}\n\\end{document}\n")
+        result = subprocess.run(
+            [PDFLATEX_PATH, "-ini", "-interaction=nonstopmode", f"-jobname={nom}",
+             "&pdflatex", "mylatexformat.ltx", f"{nom}.tex"],
+            capture_output=True,
+            text=True,
+            cwd=tmp
+        )
+        produit = os.path.join(tmp, f"{nom}.fmt")
+        if result.returncode != 0 or not os.path.exists(produit):
+            (dossier / f"{nom}.echec").write_text(result.stdout[-5000:], encoding='utf-8')
+            return None
+        os.replace(produit, dossier / f"{nom}.fmt")
+    return nom
+
+
+def _fichier_empreinte(tex_file: str) -> str:
+    """Fichier compagnon du PDF qui mémorise l'empreinte de la dernière compilation réussie"""
+    return os.path.splitext(tex_file)[0] + '.pdf.empreinte'
+
+
+def empreinte_compilation(tex_file: str, signature: str) -> str:
+    """
+    Empreinte de tout ce qui détermine le PDF : contenu du .tex (template rendu compris)
+    et signature du moteur de rendu (version, options)
+    """
+    h = hashlib.sha256()
+    with open(tex_file, 'rb') as f:
+        h.update(f.read())
+    h.update(f"\0{signature}".encode('utf-8'))
+    return h.hexdigest()
+
+
+def _a_jour(tex_file: str, empreinte: str) -> bool:
+    """Le PDF existe et provient exactement de ce .tex"""
+    pdf_file = os.path.splitext(tex_file)[0] + '.pdf'
+    try:
+        with open(_fichier_empreinte(tex_file), 'r', encoding='utf-8') as f:
+            return f.read().strip() == empreinte and os.path.exists(pdf_file)
+    except OSError:
+        return False
+
+
+def _memoriser_empreinte(tex_file: str, empreinte: Optional[str]):
+    """Enregistre l'empreinte d'un rendu réussi, l'efface sinon (PDF absent ou partiel)"""
+    if empreinte:
+        with open(_fichier_empreinte(tex_file), 'w', encoding='utf-8') as f:
+            f.write(empreinte)
+    else:
+        try:
+            os.remove(_fichier_empreinte(tex_file))
+        except OSError:
+            pass
+
+
+class MoteurRendu:
+    """
+    Interface d'un moteur de rendu PDF (utilisé dans les processus du pool)
+
+    Les sous-classes implémentent produire() ; rendre() y ajoute le saut des
+    documents inchangés, commun à tous les moteurs.
+    """
+
+    nom = ""
+
+    def disponible(self) -> bool:
+        """Le moteur peut-il fonctionner sur cet hôte"""
+        return True
+
+    def accepte(self, document: DocumentPDF) -> bool:
+        """Le moteur sait-il rendre ce document"""
+        return self.disponible()
+
+    def signature(self) -> str:
+        """Identifie le moteur et ses options (changer de moteur invalide les PDF existants)"""
+        return self.nom
+
+    def produire(self, document: DocumentPDF) -> ResultatCompilation:
+        raise NotImplementedError
+
+    def rendre(self, document: DocumentPDF, forcer: bool = False) -> ResultatCompilation:
+        """Rend le document, sauf si le PDF existant provient du même .tex et du même moteur"""
+        debut = time.perf_counter()
+        tex_file = document.tex_file
+        try:
+            empreinte = empreinte_compilation(tex_file, self.signature())
+        except OSError as e:
+            return ResultatCompilation(tex_file=tex_file, succes=False, pdf_file=None,
+                                       duree=time.perf_counter() - debut, moteur=self.nom, log=f"Erreur: {e}")
+        if not forcer and _a_jour(tex_file, empreinte):
+            return ResultatCompilation(tex_file=tex_file, succes=True, pdf_file=os.path.splitext(tex_file)[0] + '.pdf',
+                                       duree=time.perf_counter() - debut, inchange=True, moteur=self.nom)
+
+        resultat = self.produire(document)
+        resultat.duree = time.perf_counter() - debut
+        _memoriser_empreinte(tex_file, empreinte if resultat.succes and resultat.pdf_file else None)
+        return resultat
+
+
+def _compiler_passes(tex_file: str, passes_max: int, format_nom: Optional[str]) -> Tuple[bool, int, List[str]]:
+    """
+    Lance les passes pdflatex nécessaires, retourne (succès, nombre de passes, journaux)
+
+    Une nouvelle passe n'est lancée que si la précédente l'exige : LaTeX demande un
+    « Rerun » dans son journal, ou le .aux a changé (références encore instables).
+    """
+    aux_file = os.path.splitext(tex_file)[0] + '.aux'
+    commande = [PDFLATEX_PATH, "-interaction=nonstopmode", tex_file]
+    # Lignes du journal non coupées à 79 caractères : les messages « Rerun » restent détectables
+    env = {**os.environ, 'max_print_line': '10000'}
+    if format_nom:
+        commande.insert(1, f"-fmt={format_nom}")
+        # Le dossier des formats en tête du chemin de recherche (':' final = chemins par défaut)
+        env['TEXFORMATS'] = f"{ROOT_DIR / LATEX_FORMAT_DOSSIER}{os.pathsep}"
+
+    log = []
+    passes = 0
+    try:
+        while passes < max(1, passes_max):
+            aux_avant = _empreinte(aux_file)
+            result = subprocess.run(
+                commande,
+                capture_output=True,
+                text=True,
+                cwd=os.path.dirname(tex_file) or '.',
+                env=env
+            )
+            passes += 1
+            log.append(result.stdout)
+            if result.returncode != 0:
+                return False, passes, log
+            # Sans .aux préalable, seul le journal indique si les références sont à résoudre
+            aux_modifie = aux_avant is not None and _empreinte(aux_file) != aux_avant
+            if not (MOTIF_RERUN.search(result.stdout) or aux_modifie):
+                break
+    except Exception as e:
+        log.append(f"Erreur: {e}")
+        return False, passes, log
+    return True, passes, log
+
+
+class MoteurPdflatex(MoteurRendu):
+    """
+    Rendu des .tex générés avec pdflatex
+
+    Un document sans références croisées (lettre) est compilé en une seule passe.
+    Avec LATEX_FORMAT_PRECOMPILE, la compilation part du format du préambule ; en cas
+    d'échec elle est refaite normalement.
+    La sortie de pdflatex est capturée dans le résultat au lieu d'être affichée :
+    les compilations parallèles ne mélangent pas leurs journaux.
+    """
+
+    nom = "pdflatex"
+
+    def __init__(self, passes_max: int = LATEX_COMPILE_PASSES):
+        self.passes_max = passes_max
+
+    def disponible(self) -> bool:
+        return os.path.exists(PDFLATEX_PATH)
+
+    def accepte(self, document: DocumentPDF) -> bool:
+        # Moteur de repli : on tente toujours la compilation (l'erreur est rapportée dans le résultat)
+        return True
+
+    def signature(self) -> str:
+        return f"{PDFLATEX_PATH}\0{_signature_moteur()}\0{LATEX_FORMAT_PRECOMPILE}"
+
+    def produire(self, document: DocumentPDF) -> ResultatCompilation:
+        tex_file = document.tex_file
+        log = []
+        passes = 0
+
+        format_nom = None
+        if LATEX_FORMAT_PRECOMPILE:
+            try:
+                format_nom = preparer_format(tex_file)
+            except Exception as e:
+                log.append(f"Format précompilé indisponible: {e}\n")
+
+        succes = False
+        if format_nom:
+            succes, passes, log_format = _compiler_passes(tex_file, self.passes_max, format_nom)
+            log += log_format
+            if not succes:
+                log.append("Échec avec le format précompilé, compilation complète\n")
+                format_nom = None
+        if not succes:
+            succes, passes_completes, log_complet = _compiler_passes(tex_file, self.passes_max, None)
+            passes += passes_completes
+            log += log_complet
+
+        pdf_file = os.path.splitext(tex_file)[0] + '.pdf'
+        return ResultatCompilation(
+            tex_file=tex_file,
+            succes=succes,
+            pdf_file=pdf_file if os.path.exists(pdf_file) else None,
+            duree=0.0,
+            passes=passes,
+            format_precompile=bool(format_nom),
+            moteur=self.nom,
+            log=''.join(log)
+        )
+
+
+def obtenir_moteur(nom: str = MOTEUR_PDF) -> MoteurRendu:
+    """Instancie le moteur de rendu nommé (voir MOTEURS_RENDU)"""
+    if nom not in MOTEURS_RENDU:
+        raise ValueError(f"Moteur de rendu PDF inconnu: {nom} (disponibles: {', '.join(MOTEURS_RENDU)})")
+    module, classe = MOTEURS_RENDU[nom].rsplit('.', 1)
+    return getattr(importlib.import_module(module), classe)()
+
+
+def rendre_document(document: Union[str, DocumentPDF], moteur: str = MOTEUR_PDF,
+                    forcer: bool = False) -> ResultatCompilation:
+    """
+    Rend un document avec le moteur demandé (exécuté dans un processus du pool)
+
+    Si ce moteur ne peut pas rendre le document (dépendance absente, .tex sans données),
+    le rendu se fait avec pdflatex.
+    """
+    if isinstance(document, str):
+        document = DocumentPDF(document)
+    rendu = obtenir_moteur(moteur)
+    if not rendu.accepte(document):
+        resultat = MoteurPdflatex().rendre(document, forcer)
+        resultat.log = f"Moteur {moteur} indisponible pour ce document, rendu pdflatex\n" + resultat.log
+        return resultat
+    return rendu.rendre(document, forcer)
+
+
+def compiler_tex(tex_file: str, passes_max: int = LATEX_COMPILE_PASSES,
+                 forcer: bool = False) -> ResultatCompilation:
+    """
+    Compile un fichier .tex avec pdflatex (exécuté dans un processus du pool)
+
+    Si le PDF existant provient du même .tex (empreinte identique), rien n'est recompilé,
+    sauf avec forcer=True.
+    """
+    return MoteurPdflatex(passes_max).rendre(DocumentPDF(tex_file), forcer)
+
+
+def afficher_resultat(resultat: ResultatCompilation):
+    """Affiche le bilan d'une compilation (journal complet en DEBUG_MODE)"""
+    if resultat.inchange:
+        print(f"✓ {resultat.tex_file} inchangé, PDF conservé")
+    elif resultat.succes:
+        if resultat.moteur == "pdflatex":
+            details = f"{resultat.passes} passe(s)" + (", format précompilé" if resultat.format_precompile else "")
+        else:
+            details = resultat.moteur
+        print(f"✓ {resultat.tex_file} compilé avec succès ({details}, {resultat.duree:.1f}s)")
+    else:
+        print(f"Erreur lors de la compilation de {resultat.tex_file}")
+        if DEBUG_MODE:
+            print(resultat.log)
+
+
+class ServiceCompilation:
+    """
+    Pool de processus de compilation partagé par toutes les étapes qui produisent des .tex
+
+    processus=False : pool de threads, pour quelques documents seulement (pdflatex tourne
+    de toute façon dans un sous-processus, inutile de payer le démarrage d'un pool de processus)
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, forcer: Optional[bool] = None,
+                 moteur: str = MOTEUR_PDF, processus: bool = True):
+        self.max_workers = max_workers or LATEX_COMPILATION_WORKERS or os.cpu_count() or 1
+        self.moteur = moteur
+        # Transmis explicitement : les processus du pool ne voient pas les options du parent
+        self.forcer = _options['forcer'] if forcer is None else forcer
+        pool = ProcessPoolExecutor if processus else ThreadPoolExecutor
+        self._pool = pool(max_workers=self.max_workers)
+        self._futures: List[Future] = []
+
+    def soumettre(self, document: Union[str, DocumentPDF]) -> Future:
+        """Met un document (ou un .tex) en file de rendu, retourne un Future[ResultatCompilation]"""
+        future = self._pool.submit(rendre_document, document, moteur=self.moteur, forcer=self.forcer)
+        # Le rendu se fait dans un autre processus (ou thread) : sa durée est reportée ici,
+        # pour l'offre en cours
+        offre = instrumentation.offre_courante()
+        future.add_done_callback(lambda f: self._mesurer(f, offre))
+        self._futures.append(future)
+        return future
+
+    @staticmethod
+    def _mesurer(future: Future, offre: str):
+        if future.cancelled() or future.exception() is not None:
+            return
+        resultat = future.result()
+        instrumentation.enregistrer('pdf.rendu', resultat.duree, resultat.succes, offre=offre)
+
+    def terminer(self) -> List[ResultatCompilation]:
+        """Attend toutes les compilations soumises et arrête le pool"""
+        resultats = [future.result() for future in self._futures]
+        self._pool.shutdown()
+        self._futures = []
+        return resultats
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._pool.shutdown(cancel_futures=exc[0] is not None)
+
+
+class CompillateurPDF:
+    """Compile les fichiers LaTeX en PDF (avec le moteur de rendu configuré)"""
+
+    @staticmethod
+    @instrumentation.instrumenter('pdf.rendu')
+    def compiler(document: Union[str, DocumentPDF], forcer: Optional[bool] = None) -> bool:
+        """Rend un document (ou un .tex) en PDF dans le processus courant"""
+        resultat = rendre_document(document, forcer=_options['forcer'] if forcer is None else forcer)
+        afficher_resultat(resultat)
+        return resultat.succes
+
+
+def main():
+    """Recompile les .tex des dossiers (ou fichiers) donnés, en sautant ceux qui n'ont pas changé"""
+    argv = appliquer_options_ligne_commande(sys.argv[1:])
+    if not argv:
+        print("Usage: python3 core/compilation_latex.py [--force] <dossier|fichier.tex>...")
+        sys.exit(1)
+
+    tex_files = []
+    for chemin in argv:
+        if os.path.isdir(chemin):
+            tex_files += sorted(str(p) for p in Path(chemin).rglob('*.tex'))
+        else:
+            tex_files.append(chemin)
+
+    with ServiceCompilation() as service:
+        futures = [service.soumettre(tex_file) for tex_file in tex_files]
+        resultats = [future.result() for future in futures]
+    for resultat in resultats:
+        afficher_resultat(resultat)
+    if any(not r.succes for r in resultats):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
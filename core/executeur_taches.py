@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Exécuteur de tâches avec dépendances
+Lance chaque tâche dans un pool de threads dès que les tâches dont elle dépend sont terminées
+"""
+
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+@dataclass
+class Tache:
+    """Une tâche du graphe : reçoit le dictionnaire des résultats déjà disponibles"""
+    nom: str
+    fonction: Callable[[Dict[str, Any]], Any]
+    dependances: Tuple[str, ...] = ()
+
+
+def executer_taches(taches: List[Tache], max_workers: int = 5,
+                    on_termine: Optional[Callable[[str, Any], None]] = None) -> Dict[str, Any]:
+    """
+    Exécute un graphe de tâches en parallèle (au plus max_workers à la fois)
+
+    on_termine(nom, resultat) est appelé dans le thread appelant à chaque tâche terminée.
+    Si une tâche échoue, les tâches non démarrées sont annulées, celles déjà en cours
+    sont menées à terme (leurs résultats passent encore par on_termine, pour être
+    sauvegardés) puis la première exception est propagée.
+    """
+    noms = {t.nom for t in taches}
+    for tache in taches:
+        inconnues = set(tache.dependances) - noms
+        if inconnues:
+            raise ValueError(f"Tâche '{tache.nom}': dépendances inconnues {sorted(inconnues)}")
+
+    resultats: Dict[str, Any] = {}
+    restantes = list(taches)
+    en_cours = {}
+    erreur: Optional[BaseException] = None
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        while (restantes and erreur is None) or en_cours:
+            # Soumettre toutes les tâches dont les dépendances sont satisfaites
+            pretes = [] if erreur else [t for t in restantes if all(d in resultats for d in t.dependances)]
+            for tache in pretes:
+                restantes.remove(tache)
+                # Copie : la tâche voit un instantané stable des résultats, et le contexte
+                # (contextvars) du thread appelant, comme l'offre instrumentée en cours
+                en_cours[pool.submit(contextvars.copy_context().run, tache.fonction, dict(resultats))] = tache.nom
+
+            if not en_cours:
+                raise ValueError(f"Dépendances cycliques: {sorted(t.nom for t in restantes)}")
+
+            terminees, _ = wait(en_cours, return_when=FIRST_COMPLETED)
+            for future in terminees:
+                nom = en_cours.pop(future)
+                if future.cancelled():
+                    continue
+                try:
+                    resultats[nom] = future.result()
+                except Exception as e:
+                    if erreur is None:
+                        erreur = e
+                        for autre in en_cours:
+                            autre.cancel()
+                    continue
+                if on_termine:
+                    on_termine(nom, resultats[nom])
+
+    if erreur is not None:
+        raise erreur
+    return resultats
@@ -6,16 +6,30 @@ Auteur: Maxime Miroux
 
 import re
 import os
+import functools
 import sys
-import subprocess
+import json
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
 import requests
 from bs4 import BeautifulSoup
-from anthropic import Anthropic
 from dotenv import load_dotenv
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
+
+import cache_http
+import cache_llm
+import cache_profil
+import client_http
+import compilation_latex
+import instrumentation
+from client_claude import ClientClaude, LimiteurDebit, systeme_avec_contexte
+from compilation_latex import (CompillateurPDF, DocumentPDF, ServiceCompilation,
+                               afficher_resultat as afficher_compilation)
+from executeur_taches import Tache, executer_taches
+from journal_batch import JournalBatch
 
 # Déterminer le répertoire racine du projet
 SCRIPT_DIR = Path(__file__).parent.absolute()
@@ -28,6 +42,15 @@ load_dotenv(ROOT_DIR / ".env")
 # Importer la configuration centralisée
 from config import *
 
+# Messages affichés à la fin de chaque génération parallèle
+MSG_ETAPE_TERMINEE = {
+    'profil': "   ✓ Profil personnalisé généré",
+    'lettre': "   ✓ Lettre de motivation générée",
+    'topo': "   ✓ Topo d'entretien généré",
+    'questions_techniques': "   ✓ Questions techniques générées",
+    'questions_personnalite': "   ✓ Questions de personnalité générées",
+}
+
 
 @dataclass
 class InfosPersonnelles:
@@ -55,202 +78,203 @@ class InfosPersonnelles:
 
 
 class ParseurInfosStatiques:
-    """Parse le fichier infos_statique.txt"""
-    
+    """
+    Parse le fichier infos_statique.txt
+
+    Le fichier est lu en une seule passe, ligne par ligne : une ligne `[[type]]` ouvre
+    un bloc (expérience, formation...), un titre de section connu (`# FORMATION`...)
+    ramène aux champs généraux ; les autres lignes `#` d'un bloc (commentaires,
+    sous-titres) ne le ferment pas.
+    Les champs `cle: valeur` vont au bloc en cours (la première occurrence l'emporte),
+    les lignes indentées qui suivent `cle: |` forment une valeur multiligne.
+    """
+
+    # Ouverture de bloc `[[type]]` (compilé une fois ; les autres lignes sont
+    # reconnues par de simples opérations sur les chaînes)
+    _MOTIF_BLOC = re.compile(r'\[\[(\w+)\]\]')
+
+    # Titres de section qui ferment le bloc en cours
+    _TITRES_SECTIONS = ('# INFORMATIONS', '# PROFIL', '# EXPÉRIENCE', '# EXPERIENCE', '# FORMATION',
+                        '# CERTIFICATION', '# PROJET', '# COMPÉTENCE', '# COMPETENCE', '# LANGUE')
+
+    # Champs texte des projets (lignes brutes) : champ → début de la ligne qui le termine
+    # ('' : ligne vide)
+    _TEXTES_PROJET = {'description': 'compétences et outils', 'compétences et outils': ''}
+
+    # À incrémenter quand le résultat du parse change : invalide les profils en cache
+    VERSION = 2
+
+    @staticmethod
+    def charger(filepath: str = FICHIER_PROFIL) -> InfosPersonnelles:
+        """
+        InfosPersonnelles du fichier de profil, depuis le cache du profil parsé s'il est à jour
+
+        Un fichier .toml ou .json est lu au format structuré (profil_structure.py),
+        tout autre fichier au format infos_statique.txt.
+        """
+        if Path(filepath).suffix in ('.toml', '.json'):
+            import profil_structure
+            construire = functools.partial(profil_structure.depuis_texte, format=Path(filepath).suffix[1:])
+        else:
+            construire = ParseurInfosStatiques.parse_texte
+        if not CACHE_PROFIL_ACTIF:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                return construire(f.read())
+        return cache_profil.charger(filepath, construire, (ParseurInfosStatiques.VERSION, MODE_PROFIL))
+
     @staticmethod
     def parse(filepath: str) -> InfosPersonnelles:
         """Parse le fichier et retourne un objet InfosPersonnelles"""
         with open(filepath, 'r', encoding='utf-8') as f:
             content = f.read()
-        
-        # Extraction simple des informations
+        return ParseurInfosStatiques.parse_texte(content)
+
+    @classmethod
+    def parse_texte(cls, content: str, mode: Optional[str] = None) -> InfosPersonnelles:
+        """Construit InfosPersonnelles à partir du contenu du fichier (mode : MODE_PROFIL par défaut)"""
+        mode = mode or MODE_PROFIL
+        general = cls._nouvelle_section()
+        blocs = []  # (type, section) dans l'ordre du fichier
+        section = general
+        suite = None  # lignes de la valeur multiligne en cours
+        texte, nom_texte = None, ""  # lignes du champ texte de projet en cours
+
+        for ligne in content.split('\n'):
+            if ligne.startswith('[[') or (ligne.startswith('#') and (
+                    section is general or ligne.startswith(cls._TITRES_SECTIONS))):
+                bloc = cls._MOTIF_BLOC.match(ligne)
+                if bloc:
+                    section = cls._nouvelle_section()
+                    blocs.append((bloc.group(1), section))
+                else:
+                    section = general
+                suite = texte = None
+                continue
+
+            if suite is not None:
+                if ligne.startswith('  ') and len(ligne) > 2:
+                    suite.append(ligne)
+                    continue
+                suite = None
+
+            if texte is not None:
+                fin = cls._TEXTES_PROJET[nom_texte]
+                if ligne.lstrip().startswith(fin) if fin else not ligne:
+                    texte = None
+                else:
+                    texte.append(ligne)
+
+            if not ligne:
+                continue
+
+            # Puce « - ... » (liste du bloc)
+            debut = ligne.find('  - ')
+            if debut >= 0 and len(ligne) > debut + 4:
+                section['puces'].append(ligne[debut + 4:])
+
+            # Champ « cle: valeur » (non indenté, hors commentaire)
+            if ligne[0].isspace() or ligne[0] == '#':
+                continue
+            nom, deux_points, valeur = ligne.partition(':')
+            if not deux_points or not nom:
+                continue
+            nom, valeur = nom.rstrip(), valeur.strip()
+            section['champs'].setdefault(nom, valeur)
+            if valeur == '|' and not section['suites'].get(nom):
+                suite = section['suites'][nom] = []
+            elif not valeur and nom in cls._TEXTES_PROJET and nom not in section['textes']:
+                texte, nom_texte = section['textes'].setdefault(nom, []), nom
+
+        champ = cls._champ
         data = {
-            'nom': ParseurInfosStatiques._extract('nom:', content),
-            'titre': ParseurInfosStatiques._extract('titre:', content),
-            'localisation': ParseurInfosStatiques._extract('localisation:', content),
-            'email': ParseurInfosStatiques._extract('email:', content),
-            'linkedin': ParseurInfosStatiques._extract('linkedin:', content),
-            'telephone': ParseurInfosStatiques._extract('telephone:', content),
-            'profil_defaut': ParseurInfosStatiques._extract_multiline('profil_defaut:', content),
+            'nom': champ(general, 'nom'),
+            'titre': champ(general, 'titre'),
+            'localisation': champ(general, 'localisation'),
+            'email': champ(general, 'email'),
+            'linkedin': champ(general, 'linkedin'),
+            'telephone': champ(general, 'telephone'),
+            'profil_defaut': cls._multiligne(general, 'profil_defaut'),
+            'experiences': [], 'formations': [], 'certifications': [],
+            'projets': [], 'langues': [], 'competences': [],
         }
-        
+
         # Parser les compétences selon le mode (specifique ou generique)
-        if MODE_PROFIL == "specifique":
-            # Mode spécifique : catégories hardcodées
-            data['competences_scientific_ai'] = ParseurInfosStatiques._extract_multiline('competences_scientific_ai:', content)
-            data['competences_simulation'] = ParseurInfosStatiques._extract_multiline('competences_simulation:', content)
-            data['competences_generative_ai'] = ParseurInfosStatiques._extract_multiline('competences_generative_ai:', content)
-            data['competences_informatique'] = ParseurInfosStatiques._extract_multiline('competences_informatique:', content)
-            data['competences'] = []
-        else:
-            # Mode générique : parse les catégories dynamiquement
-            data['competences'] = ParseurInfosStatiques._parse_competences_generique(content)
-            data['competences_scientific_ai'] = ""
-            data['competences_simulation'] = ""
-            data['competences_generative_ai'] = ""
-            data['competences_informatique'] = ""
-        
-        # Pour simplifier, on parse les sections complexes manuellement
-        # (Dans une version production, utiliser un vrai parser TOML/YAML)
-        data['experiences'] = ParseurInfosStatiques._parse_experiences(content)
-        data['formations'] = ParseurInfosStatiques._parse_formations(content)
-        data['certifications'] = ParseurInfosStatiques._parse_certifications(content)
-        data['projets'] = ParseurInfosStatiques._parse_projets(content)
-        data['langues'] = ParseurInfosStatiques._parse_langues(content)
-        
+        for cle in ('competences_scientific_ai', 'competences_simulation',
+                    'competences_generative_ai', 'competences_informatique'):
+            data[cle] = cls._multiligne(general, cle) if mode == "specifique" else ""
+
+        for type_bloc, bloc in blocs:
+            if type_bloc == 'experience':
+                data['experiences'].append({
+                    'poste': champ(bloc, 'poste'),
+                    'entreprise': champ(bloc, 'entreprise'),
+                    'periode': champ(bloc, 'periode'),
+                    'missions': bloc['puces'],
+                })
+            elif type_bloc == 'formation':
+                data['formations'].append({
+                    'diplome': champ(bloc, 'diplome'),
+                    'etablissement': champ(bloc, 'etablissement'),
+                    'periode': champ(bloc, 'periode'),
+                    'details': bloc['puces'],
+                })
+            elif type_bloc == 'certification':
+                data['certifications'].append({'titre': champ(bloc, 'titre'), 'date': champ(bloc, 'date')})
+            elif type_bloc == 'projet':
+                data['projets'].append({
+                    'titre': bloc['champs'].get('titre', ""),
+                    'description': "\n".join(bloc['textes'].get('description', [])).strip(),
+                    'competences': "\n".join(bloc['textes'].get('compétences et outils', [])).strip(),
+                })
+            elif type_bloc == 'langue':
+                data['langues'].append({'langue': champ(bloc, 'langue'), 'niveau': champ(bloc, 'niveau')})
+            elif type_bloc == 'competence' and mode != "specifique":
+                # Mode générique : catégories dynamiques, contenu simple ou multiligne
+                categorie = champ(bloc, 'categorie')
+                contenu = cls._multiligne(bloc, 'contenu') or champ(bloc, 'contenu')
+                if categorie and contenu:
+                    data['competences'].append({'categorie': categorie, 'contenu': contenu})
+
         return InfosPersonnelles(**data)
-    
-    @staticmethod
-    def _extract(key: str, content: str) -> str:
-        """Extrait une valeur simple"""
-        match = re.search(f'{key}\\s*(.*)$', content, re.MULTILINE)
-        if match:
-            value = match.group(1).strip()
-            # Ignorer les lignes qui commencent par # (commentaires markdown)
-            if value and not value.startswith('#'):
-                return value
-        return ""
-    
-    @staticmethod
-    def _extract_multiline(key: str, content: str) -> str:
-        """Extrait une valeur multiligne"""
-        pattern = f'{key}\\s*\\|\\n((?:  .+\\n?)+)'
-        match = re.search(pattern, content)
-        if match:
-            lines = match.group(1).strip().split('\n')
-            return ' '.join(line.strip() for line in lines)
-        return ""
-    
-    @staticmethod
-    def _parse_experiences(content: str) -> List[Dict]:
-        """Parse les expériences"""
-        experiences = []
-        sections = re.findall(r'\[\[experience\]\](.+?)(?=\[\[|# FORMATION)', content, re.DOTALL)
-        
-        for section in sections:
-            exp = {
-                'poste': ParseurInfosStatiques._extract('poste:', section),
-                'entreprise': ParseurInfosStatiques._extract('entreprise:', section),
-                'periode': ParseurInfosStatiques._extract('periode:', section),
-                'missions': re.findall(r'  - (.+)', section)
-            }
-            experiences.append(exp)
-        
-        return experiences
-    
-    @staticmethod
-    def _parse_formations(content: str) -> List[Dict]:
-        """Parse les formations"""
-        formations = []
-        sections = re.findall(r'\[\[formation\]\](.+?)(?=\[\[|# CERTIFICATIONS)', content, re.DOTALL)
-        
-        for section in sections:
-            form = {
-                'diplome': ParseurInfosStatiques._extract('diplome:', section),
-                'etablissement': ParseurInfosStatiques._extract('etablissement:', section),
-                'periode': ParseurInfosStatiques._extract('periode:', section),
-                'details': re.findall(r'  - (.+)', section)
-            }
-            formations.append(form)
-        
-        return formations
-    
-    @staticmethod
-    def _parse_certifications(content: str) -> List[Dict]:
-        """Parse les certifications"""
-        certifications = []
-        sections = re.findall(r'\[\[certification\]\](.+?)(?=\[\[|# PROJETS)', content, re.DOTALL)
-        
-        for section in sections:
-            cert = {
-                'titre': ParseurInfosStatiques._extract('titre:', section),
-                'date': ParseurInfosStatiques._extract('date:', section)
-            }
-            certifications.append(cert)
-        
-        return certifications
-    
+
     @staticmethod
-    def _parse_projets(content: str) -> List[Dict]:
-        """Parse les projets"""
-        projets = []
-        sections = re.findall(r'\[\[projet\]\](.+?)(?=\[\[|# COMPÉTENCES)', content, re.DOTALL)
-        
-        for section in sections:
-            # Extraire titre (avec ou sans espaces autour de :)
-            titre_match = re.search(r'titre\s*:\s*(.+?)(?:\n|$)', section)
-            titre = titre_match.group(1).strip() if titre_match else ""
-            
-            # Extraire description multiligne
-            desc_match = re.search(r'description\s*:\s*\n(.+?)(?=compétences et outils|$)', section, re.DOTALL)
-            description = desc_match.group(1).strip() if desc_match else ""
-            
-            # Extraire compétences et outils multiligne
-            comp_match = re.search(r'compétences et outils\s*:\s*\n(.+?)(?=\n\n|\[\[|$)', section, re.DOTALL)
-            competences = comp_match.group(1).strip() if comp_match else ""
-            
-            proj = {
-                'titre': titre,
-                'description': description,
-                'competences': competences
-            }
-            projets.append(proj)
-        
-        return projets
-    
+    def _nouvelle_section() -> Dict:
+        """Champs, valeurs multilignes, puces et textes d'un bloc (ou des champs généraux)"""
+        return {'champs': {}, 'suites': {}, 'puces': [], 'textes': {}}
+
     @staticmethod
-    def _parse_langues(content: str) -> List[Dict]:
-        """Parse les langues"""
-        langues = []
-        sections = re.findall(r'\[\[langue\]\](.+?)(?=\[\[|$)', content, re.DOTALL)
-        
-        for section in sections:
-            lang = {
-                'langue': ParseurInfosStatiques._extract('langue:', section),
-                'niveau': ParseurInfosStatiques._extract('niveau:', section)
-            }
-            langues.append(lang)
-        
-        return langues
-    
+    def _champ(section: Dict, cle: str) -> str:
+        """Valeur simple d'un champ"""
+        valeur = section['champs'].get(cle, "")
+        # Ignorer les valeurs qui commencent par # (commentaires markdown)
+        return "" if valeur.startswith('#') else valeur
+
     @staticmethod
-    def _parse_competences_generique(content: str) -> List[Dict]:
-        """Parse les compétences en mode générique (pour tout type de profil)"""
-        competences = []
-        # Chercher la section COMPÉTENCES
-        sections = re.findall(r'\[\[competence\]\](.+?)(?=\[\[|# LANGUES|$)', content, re.DOTALL)
-        
-        for section in sections:
-            categorie = ParseurInfosStatiques._extract('categorie:', section)
-            contenu = ParseurInfosStatiques._extract_multiline('contenu:', section)
-            # Si contenu n'est pas multiligne, essayer extraction simple
-            if not contenu:
-                contenu = ParseurInfosStatiques._extract('contenu:', section)
-            
-            if categorie and contenu:
-                comp = {
-                    'categorie': categorie,
-                    'contenu': contenu
-                }
-                competences.append(comp)
-        
-        return competences
+    def _multiligne(section: Dict, cle: str) -> str:
+        """Valeur multiligne d'un champ `cle: |` (lignes jointes par des espaces)"""
+        lignes = section['suites'].get(cle)
+        if not lignes:
+            return ""
+        return ' '.join(ligne.strip() for ligne in "\n".join(lignes).strip().split('\n'))
 
 
 class ScraperAnnonce:
     """Scrape une annonce de poste depuis une URL"""
     
     @staticmethod
-    def scraper(url: str) -> str:
-        """Scrape le contenu d'une annonce"""
+    @instrumentation.instrumenter('scraping')
+    def scraper(url: str, session: Optional[requests.Session] = None) -> str:
+        """Scrape le contenu d'une annonce (session HTTP partagée du processus par défaut)"""
         try:
             headers = {
                 'User-Agent': USER_AGENT
             }
-            response = requests.get(url, headers=headers, timeout=HTTP_TIMEOUT)
-            response.raise_for_status()
+            # Cache disque + requête conditionnelle (évite de retélécharger une annonce récente)
+            # via la session partagée (keep-alive, reprises sur 429/5xx)
+            contenu = cache_http.telecharger(url, session=session or client_http.obtenir_session(),
+                                             headers=headers, timeout=client_http.timeout_pour(url))
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = BeautifulSoup(contenu, 'html.parser')
             
             # Retirer les scripts et styles
             for script in soup(["script", "style", "nav", "footer", "header"]):
@@ -274,37 +298,87 @@ class ScraperAnnonce:
 class GenerateurIA:
     """Utilise Claude (Anthropic) pour générer du contenu personnalisé"""
     
-    def __init__(self, api_key: str):
-        self.client = Anthropic(api_key=api_key)
+    def __init__(self, api_key: str, limiteur: Optional[LimiteurDebit] = None):
+        # Tous les appels passent par le client partagé (limitation de débit)
+        self.claude = ClientClaude(api_key, limiteur)
+        self.client = self.claude.client
     
-    def analyser_annonce(self, annonce_text: str) -> Dict[str, str]:
-        """Analyse l'annonce et extrait les informations clés"""
+    @staticmethod
+    def profil_candidat(infos: InfosPersonnelles) -> str:
+        """Profil complet du candidat (PROMPT_TEMPLATE_CANDIDAT), identique pour tous les appels"""
+        experiences = ""
+        for exp in infos.experiences:
+            experiences += f"- {exp['poste']} chez {exp['entreprise']} ({exp['periode']})\n"
+            for mission in exp['missions']:
+                experiences += f"  • {mission}\n"
         
-        prompt = PROMPT_TEMPLATE_ANALYSE.format(
-            annonce_text=annonce_text[:MAX_ANNONCE_LENGTH]
-        )
-
-        response = self.client.messages.create(
-            model=CLAUDE_MODEL,
-            max_tokens=MAX_TOKENS_ANALYSE,
-            temperature=TEMPERATURE,
-            system=SYSTEM_PROMPT_ANALYSE,
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
-        )
+        # Compétences selon le mode
+        competences = ""
+        if MODE_PROFIL == "specifique":
+            # Mode spécifique : catégories hardcodées
+            if infos.competences_scientific_ai:
+                competences += f"Scientific AI: {infos.competences_scientific_ai.strip()}\n"
+            if infos.competences_simulation:
+                competences += f"Simulation: {infos.competences_simulation.strip()}\n"
+            if infos.competences_generative_ai:
+                competences += f"Generative AI: {infos.competences_generative_ai.strip()}\n"
+            if infos.competences_informatique:
+                competences += f"Informatique: {infos.competences_informatique.strip()}\n"
+        else:
+            # Mode générique : catégories dynamiques
+            for comp in infos.competences:
+                competences += f"{comp['categorie']}: {comp['contenu']}\n"
         
-        response_text = response.content[0].text
+        formations = "".join(
+            f"- {form['diplome']}, {form['etablissement']} ({form['periode']})\n" for form in infos.formations
+        )
+        projets = "".join(f"- {proj['titre']}: {proj['description']}\n" for proj in infos.projets)
+        langues = "".join(f"- {lang['langue']}: {lang['niveau']}\n" for lang in infos.langues)
         
-        # Parser le JSON
+        return PROMPT_TEMPLATE_CANDIDAT.format(
+            nom=infos.nom,
+            titre=infos.titre,
+            profil=infos.profil_defaut,
+            experiences=experiences.rstrip() or "Non disponible",
+            competences=competences.rstrip() or "Non disponible",
+            formations=formations.rstrip() or "Non disponible",
+            projets=projets.rstrip() or "Non disponible",
+            langues=langues.rstrip() or "Non disponible"
+        )
+    
+    def _systeme(self, system_prompt: str, infos: Optional[InfosPersonnelles]):
+        """Prompt système précédé du profil candidat (préfixe commun mis en cache par l'API)"""
+        if infos is None:
+            return system_prompt
+        return systeme_avec_contexte(system_prompt, self.profil_candidat(infos))
+    
+    @staticmethod
+    def _extraire_json(response_text: str) -> Dict:
+        """Parse le JSON de la réponse (éventuellement entouré de ```json)"""
         import json
+        if '```json' in response_text:
+            response_text = response_text.split('```json')[1].split('```')[0].strip()
+        elif '```' in response_text:
+            response_text = response_text.split('```')[1].split('```')[0].strip()
+        return json.loads(response_text)
+    
+    # Chaque génération est séparée en deux temps : la requête (system, prompt, max_tokens)
+    # puis la lecture de la réponse, pour pouvoir être envoyée en appel direct ou en lot (Batch API).
+    # Une réponse attendue en JSON n'est mise en cache que si elle se parse (valider).
+    
+    def requete_analyse_annonce(self, annonce_text: str, infos: Optional[InfosPersonnelles] = None) -> Dict:
+        """Requête d'analyse de l'annonce"""
+        prompt = PROMPT_TEMPLATE_ANALYSE.format(
+            annonce_text=annonce_text[:MAX_ANNONCE_LENGTH]
+        )
+        return {'system': self._systeme(SYSTEM_PROMPT_ANALYSE, infos), 'prompt': prompt, 'max_tokens': MAX_TOKENS_ANALYSE,
+                'valider': GenerateurIA._extraire_json}
+    
+    @staticmethod
+    def lire_analyse_annonce(response_text: str) -> Dict[str, str]:
+        """Informations clés de l'annonce (valeurs par défaut si la réponse n'est pas du JSON)"""
         try:
-            # Extraire le JSON si entouré de ```json
-            if '```json' in response_text:
-                response_text = response_text.split('```json')[1].split('```')[0].strip()
-            elif '```' in response_text:
-                response_text = response_text.split('```')[1].split('```')[0].strip()
-            return json.loads(response_text)
+            return GenerateurIA._extraire_json(response_text)
         except:
             # Si le parsing échoue, retourner des valeurs par défaut
             return {
@@ -315,35 +389,31 @@ class GenerateurIA:
                 'mission_principale': ''
             }
     
-    def analyser_entreprise(self, site_text: str, poste_cible: str) -> Dict[str, str]:
-        """Analyse le site web d'une entreprise pour candidature spontanée"""
+    @instrumentation.instrumenter('ia.analyser_annonce')
+    def analyser_annonce(self, annonce_text: str, infos: Optional[InfosPersonnelles] = None) -> Dict[str, str]:
+        """
+        Analyse l'annonce et extrait les informations clés
         
+        Avec infos, l'appel écrit dans le cache de l'API le profil candidat
+        que les cinq générations suivantes relisent.
+        """
+        return self.lire_analyse_annonce(self.claude.appeler(**self.requete_analyse_annonce(annonce_text, infos)))
+    
+    def requete_analyse_entreprise(self, site_text: str, poste_cible: str,
+                                   infos: Optional[InfosPersonnelles] = None) -> Dict:
+        """Requête d'analyse du site web de l'entreprise"""
         prompt = PROMPT_TEMPLATE_ANALYSE_ENTREPRISE.format(
             site_text=site_text[:MAX_ANNONCE_LENGTH],
             poste_cible=poste_cible
         )
-
-        response = self.client.messages.create(
-            model=CLAUDE_MODEL,
-            max_tokens=MAX_TOKENS_ANALYSE,
-            temperature=TEMPERATURE,
-            system=SYSTEM_PROMPT_ANALYSE_ENTREPRISE,
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
-        )
-        
-        response_text = response.content[0].text
-        
-        # Parser le JSON
-        import json
+        return {'system': self._systeme(SYSTEM_PROMPT_ANALYSE_ENTREPRISE, infos), 'prompt': prompt, 'max_tokens': MAX_TOKENS_ANALYSE,
+                'valider': GenerateurIA._extraire_json}
+    
+    @staticmethod
+    def lire_analyse_entreprise(response_text: str, poste_cible: str) -> Dict[str, str]:
+        """Informations clés de l'entreprise (valeurs par défaut si la réponse n'est pas du JSON)"""
         try:
-            # Extraire le JSON si entouré de ```json
-            if '```json' in response_text:
-                response_text = response_text.split('```json')[1].split('```')[0].strip()
-            elif '```' in response_text:
-                response_text = response_text.split('```')[1].split('```')[0].strip()
-            result = json.loads(response_text)
+            result = GenerateurIA._extraire_json(response_text)
             # Ajouter le poste cible pour compatibilité avec le reste du code
             result['poste'] = poste_cible
             return result
@@ -360,91 +430,33 @@ class GenerateurIA:
                 'mots_cles': ''
             }
     
-    def generer_profil_adapte(self, profil_base: str, analyse_annonce: Dict, infos: 'InfosPersonnelles' = None) -> str:
-        """Génère un profil adapté à l'annonce"""
-        
-        # Préparer un résumé des expériences
-        experiences_resume = ""
-        if infos and infos.experiences:
-            for i, exp in enumerate(infos.experiences[:2]):  # Prendre les 2 premières expériences
-                experiences_resume += f"- {exp['poste']} chez {exp['entreprise']} ({exp['periode']})\n"
-                # Ajouter 2-3 missions clés
-                for mission in exp['missions'][:3]:
-                    experiences_resume += f"  • {mission}\n"
-        
-        # Préparer un résumé des compétences (selon le mode)
-        competences_techniques = ""
-        if infos:
-            if MODE_PROFIL == "specifique":
-                # Mode spécifique : catégories hardcodées
-                if infos.competences_scientific_ai:
-                    competences_techniques += f"Scientific AI: {infos.competences_scientific_ai.strip()}\n"
-                if infos.competences_simulation:
-                    competences_techniques += f"Simulation: {infos.competences_simulation.strip()}\n"
-                if infos.competences_generative_ai:
-                    competences_techniques += f"Generative AI: {infos.competences_generative_ai.strip()}\n"
-                if infos.competences_informatique:
-                    competences_techniques += f"Informatique: {infos.competences_informatique.strip()}\n"
-            else:
-                # Mode générique : catégories dynamiques
-                for comp in infos.competences:
-                    competences_techniques += f"{comp['categorie']}: {comp['contenu']}\n"
-        
+    @instrumentation.instrumenter('ia.analyser_entreprise')
+    def analyser_entreprise(self, site_text: str, poste_cible: str,
+                            infos: Optional[InfosPersonnelles] = None) -> Dict[str, str]:
+        """Analyse le site web d'une entreprise pour candidature spontanée"""
+        requete = self.requete_analyse_entreprise(site_text, poste_cible, infos)
+        return self.lire_analyse_entreprise(self.claude.appeler(**requete), poste_cible)
+    
+    def requete_profil(self, profil_base: str, analyse_annonce: Dict, infos: 'InfosPersonnelles' = None) -> Dict:
+        """Requête de profil adapté à l'annonce"""
         prompt = PROMPT_TEMPLATE_PROFIL.format(
             profil_base=profil_base,
-            experiences_resume=experiences_resume or "Non disponible",
-            competences_techniques=competences_techniques or "Non disponible",
             poste=analyse_annonce['poste'],
             entreprise=analyse_annonce['entreprise'],
             competences=', '.join(analyse_annonce.get('competences_cles', [])),
             mission=analyse_annonce.get('mission_principale', '')
         )
-
-        response = self.client.messages.create(
-            model=CLAUDE_MODEL,
-            max_tokens=MAX_TOKENS_PROFIL,
-            temperature=TEMPERATURE,
-            system=SYSTEM_PROMPT_PROFIL,
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
-        )
-        
-        return response.content[0].text.strip()
+        return {'system': self._systeme(SYSTEM_PROMPT_PROFIL, infos), 'prompt': prompt, 'max_tokens': MAX_TOKENS_PROFIL}
     
-    def generer_profil_adapte_spontanee(self, profil_base: str, analyse_entreprise: Dict, infos: 'InfosPersonnelles' = None) -> str:
-        """Génère un profil adapté pour une candidature spontanée"""
-        
-        # Préparer un résumé des expériences
-        experiences_resume = ""
-        if infos and infos.experiences:
-            for i, exp in enumerate(infos.experiences[:2]):
-                experiences_resume += f"- {exp['poste']} chez {exp['entreprise']} ({exp['periode']})\n"
-                for mission in exp['missions'][:3]:
-                    experiences_resume += f"  • {mission}\n"
-        
-        # Préparer un résumé des compétences (selon le mode)
-        competences_techniques = ""
-        if infos:
-            if MODE_PROFIL == "specifique":
-                # Mode spécifique : catégories hardcodées
-                if infos.competences_scientific_ai:
-                    competences_techniques += f"Scientific AI: {infos.competences_scientific_ai.strip()}\n"
-                if infos.competences_simulation:
-                    competences_techniques += f"Simulation: {infos.competences_simulation.strip()}\n"
-                if infos.competences_generative_ai:
-                    competences_techniques += f"Generative AI: {infos.competences_generative_ai.strip()}\n"
-                if infos.competences_informatique:
-                    competences_techniques += f"Informatique: {infos.competences_informatique.strip()}\n"
-            else:
-                # Mode générique : catégories dynamiques
-                for comp in infos.competences:
-                    competences_techniques += f"{comp['categorie']}: {comp['contenu']}\n"
-        
+    @instrumentation.instrumenter('ia.generer_profil_adapte')
+    def generer_profil_adapte(self, profil_base: str, analyse_annonce: Dict, infos: 'InfosPersonnelles' = None) -> str:
+        """Génère un profil adapté à l'annonce"""
+        return self.claude.appeler(**self.requete_profil(profil_base, analyse_annonce, infos)).strip()
+    
+    def requete_profil_spontanee(self, profil_base: str, analyse_entreprise: Dict, infos: 'InfosPersonnelles' = None) -> Dict:
+        """Requête de profil adapté pour une candidature spontanée"""
         prompt = PROMPT_TEMPLATE_PROFIL_SPONTANEE.format(
             profil_base=profil_base,
-            experiences_resume=experiences_resume or "Non disponible",
-            competences_techniques=competences_techniques or "Non disponible",
             entreprise=analyse_entreprise['entreprise'],
             secteur=analyse_entreprise.get('secteur', ''),
             activites=', '.join(analyse_entreprise.get('activites_principales', [])),
@@ -452,52 +464,29 @@ class GenerateurIA:
             technologies=analyse_entreprise.get('technologies', ''),
             poste_cible=analyse_entreprise['poste']
         )
-
-        response = self.client.messages.create(
-            model=CLAUDE_MODEL,
-            max_tokens=MAX_TOKENS_PROFIL,
-            temperature=TEMPERATURE,
-            system=SYSTEM_PROMPT_PROFIL,
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
-        )
-        
-        return response.content[0].text.strip()
+        return {'system': self._systeme(SYSTEM_PROMPT_PROFIL, infos), 'prompt': prompt, 'max_tokens': MAX_TOKENS_PROFIL}
     
-    def generer_lettre_motivation(self, infos: InfosPersonnelles, analyse_annonce: Dict) -> Dict[str, str]:
-        """Génère les paragraphes de la lettre de motivation"""
-        
+    @instrumentation.instrumenter('ia.generer_profil_adapte_spontanee')
+    def generer_profil_adapte_spontanee(self, profil_base: str, analyse_entreprise: Dict, infos: 'InfosPersonnelles' = None) -> str:
+        """Génère un profil adapté pour une candidature spontanée"""
+        return self.claude.appeler(**self.requete_profil_spontanee(profil_base, analyse_entreprise, infos)).strip()
+    
+    def requete_lettre(self, infos: InfosPersonnelles, analyse_annonce: Dict) -> Dict:
+        """Requête des paragraphes de la lettre de motivation"""
         prompt = PROMPT_TEMPLATE_LETTRE.format(
-            nom=infos.nom,
-            profil=infos.profil_defaut,
-            experience=f"{infos.experiences[0]['poste']} chez {infos.experiences[0]['entreprise']}",
             poste=analyse_annonce['poste'],
             entreprise=analyse_annonce['entreprise'],
             competences=', '.join(analyse_annonce.get('competences_cles', [])),
             mission=analyse_annonce.get('mission_principale', '')
         )
-
-        response = self.client.messages.create(
-            model=CLAUDE_MODEL,
-            max_tokens=MAX_TOKENS_LETTRE,
-            temperature=TEMPERATURE,
-            system=SYSTEM_PROMPT_LETTRE,
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
-        )
-        
-        response_text = response.content[0].text
-        
-        import json
+        return {'system': self._systeme(SYSTEM_PROMPT_LETTRE, infos), 'prompt': prompt, 'max_tokens': MAX_TOKENS_LETTRE,
+                'valider': GenerateurIA._extraire_json}
+    
+    @staticmethod
+    def lire_lettre(response_text: str) -> Dict[str, str]:
+        """Paragraphes de la lettre (textes par défaut si la réponse n'est pas du JSON)"""
         try:
-            # Extraire le JSON si entouré de ```json
-            if '```json' in response_text:
-                response_text = response_text.split('```json')[1].split('```')[0].strip()
-            elif '```' in response_text:
-                response_text = response_text.split('```')[1].split('```')[0].strip()
-            return json.loads(response_text)
+            return GenerateurIA._extraire_json(response_text)
         except:
             return {
                 'paragraphe_1': 'Paragraphe 1 non généré',
@@ -506,13 +495,14 @@ class GenerateurIA:
                 'conclusion': 'Conclusion non générée'
             }
     
-    def generer_lettre_motivation_spontanee(self, infos: InfosPersonnelles, analyse_entreprise: Dict) -> Dict[str, str]:
-        """Génère une lettre de motivation pour candidature spontanée"""
-        
+    @instrumentation.instrumenter('ia.generer_lettre_motivation')
+    def generer_lettre_motivation(self, infos: InfosPersonnelles, analyse_annonce: Dict) -> Dict[str, str]:
+        """Génère les paragraphes de la lettre de motivation"""
+        return self.lire_lettre(self.claude.appeler(**self.requete_lettre(infos, analyse_annonce)))
+    
+    def requete_lettre_spontanee(self, infos: InfosPersonnelles, analyse_entreprise: Dict) -> Dict:
+        """Requête de lettre de motivation pour candidature spontanée"""
         prompt = PROMPT_TEMPLATE_LETTRE_SPONTANEE.format(
-            nom=infos.nom,
-            profil=infos.profil_defaut,
-            experience=f"{infos.experiences[0]['poste']} chez {infos.experiences[0]['entreprise']}",
             entreprise=analyse_entreprise['entreprise'],
             secteur=analyse_entreprise.get('secteur', ''),
             activites=', '.join(analyse_entreprise.get('activites_principales', [])),
@@ -521,144 +511,131 @@ class GenerateurIA:
             poste_cible=analyse_entreprise['poste'],
             besoins=analyse_entreprise.get('besoins_potentiels', '')
         )
-
-        response = self.client.messages.create(
-            model=CLAUDE_MODEL,
-            max_tokens=MAX_TOKENS_LETTRE,
-            temperature=TEMPERATURE,
-            system=SYSTEM_PROMPT_LETTRE,
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
-        )
-        
-        response_text = response.content[0].text
-        
-        import json
-        try:
-            # Extraire le JSON si entouré de ```json
-            if '```json' in response_text:
-                response_text = response_text.split('```json')[1].split('```')[0].strip()
-            elif '```' in response_text:
-                response_text = response_text.split('```')[1].split('```')[0].strip()
-            return json.loads(response_text)
-        except:
-            return {
-                'paragraphe_1': 'Paragraphe 1 non généré',
-                'paragraphe_2': 'Paragraphe 2 non généré',
-                'paragraphe_3': 'Paragraphe 3 non généré',
-                'conclusion': 'Conclusion non générée'
-            }
+        return {'system': self._systeme(SYSTEM_PROMPT_LETTRE, infos), 'prompt': prompt, 'max_tokens': MAX_TOKENS_LETTRE,
+                'valider': GenerateurIA._extraire_json}
     
-    def generer_topo_entretien(self, annonce_text: str, analyse_annonce: Dict, infos: InfosPersonnelles) -> str:
-        """Génère un topo de préparation d'entretien"""
-        
-        # Préparer le profil candidat
-        profil_candidat = f"""
-Profil: {infos.profil_defaut}
-
-Expériences principales:
-"""
-        for exp in infos.experiences[:2]:
-            profil_candidat += f"- {exp['poste']} chez {exp['entreprise']} ({exp['periode']})\n"
-        
-        profil_candidat += f"\nCompétences:\n"
-        profil_candidat += f"- Scientific AI: {infos.competences_scientific_ai}\n"
-        profil_candidat += f"- Simulation: {infos.competences_simulation}\n"
-        profil_candidat += f"- Generative AI: {infos.competences_generative_ai}\n"
-        profil_candidat += f"- Informatique: {infos.competences_informatique}\n"
-        
+    @instrumentation.instrumenter('ia.generer_lettre_motivation_spontanee')
+    def generer_lettre_motivation_spontanee(self, infos: InfosPersonnelles, analyse_entreprise: Dict) -> Dict[str, str]:
+        """Génère une lettre de motivation pour candidature spontanée"""
+        return self.lire_lettre(self.claude.appeler(**self.requete_lettre_spontanee(infos, analyse_entreprise)))
+    
+    def _appeler_flux(self, requete: Dict, sortie: Optional['FichierFlux'] = None) -> str:
+        """Appel simple, ou en streaming vers un fichier (le texte complet est aussi retourné)"""
+        if sortie is None:
+            return self.claude.appeler(**requete).strip()
+        with sortie:
+            return self.claude.appeler(**requete, on_texte=sortie).strip()
+    
+    def requete_topo(self, annonce_text: str, analyse_annonce: Dict, infos: InfosPersonnelles) -> Dict:
+        """Requête du topo de préparation d'entretien"""
         prompt = PROMPT_TEMPLATE_TOPO.format(
             poste=analyse_annonce['poste'],
             entreprise=analyse_annonce['entreprise'],
             competences=', '.join(analyse_annonce.get('competences_cles', [])),
             mission=analyse_annonce.get('mission_principale', ''),
-            annonce_text=annonce_text[:MAX_ANNONCE_LENGTH],
-            profil_candidat=profil_candidat
-        )
-        
-        response = self.client.messages.create(
-            model=CLAUDE_MODEL,
-            max_tokens=MAX_TOKENS_TOPO,
-            temperature=TEMPERATURE,
-            system=SYSTEM_PROMPT_TOPO,
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
+            annonce_text=annonce_text[:MAX_ANNONCE_LENGTH]
         )
-        
-        return response.content[0].text.strip()
+        return {'system': self._systeme(SYSTEM_PROMPT_TOPO, infos), 'prompt': prompt, 'max_tokens': MAX_TOKENS_TOPO}
     
-    def generer_questions_techniques(self, annonce_text: str, analyse_annonce: Dict, infos: InfosPersonnelles) -> str:
-        """Génère des questions techniques d'entretien avec réponses"""
-        
-        # Préparer un résumé des expériences
-        experiences_resume = ""
-        for exp in infos.experiences[:2]:
-            experiences_resume += f"- {exp['poste']} chez {exp['entreprise']}\n"
-            for mission in exp['missions'][:3]:
-                experiences_resume += f"  • {mission}\n"
-        
-        # Préparer les compétences
-        competences_techniques = f"""
-Scientific AI: {infos.competences_scientific_ai}
-Simulation: {infos.competences_simulation}
-Generative AI: {infos.competences_generative_ai}
-Informatique: {infos.competences_informatique}
-"""
-        
+    @instrumentation.instrumenter('ia.generer_topo_entretien')
+    def generer_topo_entretien(self, annonce_text: str, analyse_annonce: Dict, infos: InfosPersonnelles,
+                               sortie: Optional['FichierFlux'] = None) -> str:
+        """Génère un topo de préparation d'entretien (écrit en streaming dans sortie si fournie)"""
+        return self._appeler_flux(self.requete_topo(annonce_text, analyse_annonce, infos), sortie)
+    
+    def requete_questions_techniques(self, annonce_text: str, analyse_annonce: Dict, infos: InfosPersonnelles) -> Dict:
+        """Requête des questions techniques d'entretien"""
         prompt = PROMPT_TEMPLATE_QUESTIONS_TECH.format(
             nb_questions=NB_QUESTIONS_TECHNIQUES,
             poste=analyse_annonce['poste'],
             entreprise=analyse_annonce['entreprise'],
             competences=', '.join(analyse_annonce.get('competences_cles', [])),
-            annonce_text=annonce_text[:MAX_ANNONCE_LENGTH],
-            experiences_resume=experiences_resume,
-            competences_techniques=competences_techniques
-        )
-        
-        response = self.client.messages.create(
-            model=CLAUDE_MODEL,
-            max_tokens=MAX_TOKENS_QUESTIONS_TECH,
-            temperature=TEMPERATURE,
-            system=SYSTEM_PROMPT_QUESTIONS_TECH,
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
+            annonce_text=annonce_text[:MAX_ANNONCE_LENGTH]
         )
-        
-        return response.content[0].text.strip()
+        return {'system': self._systeme(SYSTEM_PROMPT_QUESTIONS_TECH, infos), 'prompt': prompt, 'max_tokens': MAX_TOKENS_QUESTIONS_TECH}
     
-    def generer_questions_personnalite(self, annonce_text: str, analyse_annonce: Dict, infos: InfosPersonnelles) -> str:
-        """Génère des questions de personnalité avec réponses STAR"""
-        
-        # Préparer un résumé des expériences
-        experiences_resume = ""
-        for exp in infos.experiences:
-            experiences_resume += f"\n{exp['poste']} chez {exp['entreprise']} ({exp['periode']}):\n"
-            for mission in exp['missions'][:2]:
-                experiences_resume += f"- {mission}\n"
-        
+    @instrumentation.instrumenter('ia.generer_questions_techniques')
+    def generer_questions_techniques(self, annonce_text: str, analyse_annonce: Dict, infos: InfosPersonnelles,
+                                     sortie: Optional['FichierFlux'] = None) -> str:
+        """Génère des questions techniques d'entretien avec réponses (écrites en streaming dans sortie si fournie)"""
+        return self._appeler_flux(self.requete_questions_techniques(annonce_text, analyse_annonce, infos), sortie)
+    
+    def requete_questions_personnalite(self, annonce_text: str, analyse_annonce: Dict, infos: InfosPersonnelles) -> Dict:
+        """Requête des questions de personnalité"""
         prompt = PROMPT_TEMPLATE_QUESTIONS_PERSO.format(
             nb_questions=NB_QUESTIONS_PERSONNALITE,
             entreprise=analyse_annonce['entreprise'],
             poste=analyse_annonce['poste'],
-            annonce_text=annonce_text[:MAX_ANNONCE_LENGTH],
-            nom=infos.nom,
-            experiences_resume=experiences_resume
-        )
-        
-        response = self.client.messages.create(
-            model=CLAUDE_MODEL,
-            max_tokens=MAX_TOKENS_QUESTIONS_PERSO,
-            temperature=TEMPERATURE,
-            system=SYSTEM_PROMPT_QUESTIONS_PERSO,
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
+            annonce_text=annonce_text[:MAX_ANNONCE_LENGTH]
         )
-        
-        return response.content[0].text.strip()
+        return {'system': self._systeme(SYSTEM_PROMPT_QUESTIONS_PERSO, infos), 'prompt': prompt, 'max_tokens': MAX_TOKENS_QUESTIONS_PERSO}
+    
+    @instrumentation.instrumenter('ia.generer_questions_personnalite')
+    def generer_questions_personnalite(self, annonce_text: str, analyse_annonce: Dict, infos: InfosPersonnelles) -> str:
+        """Génère des questions de personnalité avec réponses STAR"""
+        return self.claude.appeler(**self.requete_questions_personnalite(annonce_text, analyse_annonce, infos)).strip()
+    
+    def requetes_generation(self, contenu_text: str, analyse: Dict, infos: InfosPersonnelles,
+                            mode: str = "annonce") -> Dict[str, Dict]:
+        """Requêtes des cinq générations qui suivent l'analyse, par nom d'étape"""
+        if mode == "spontanee":
+            requetes = {
+                'profil': self.requete_profil_spontanee(infos.profil_defaut, analyse, infos),
+                'lettre': self.requete_lettre_spontanee(infos, analyse),
+            }
+        else:
+            requetes = {
+                'profil': self.requete_profil(infos.profil_defaut, analyse, infos),
+                'lettre': self.requete_lettre(infos, analyse),
+            }
+        requetes['topo'] = self.requete_topo(contenu_text, analyse, infos)
+        requetes['questions_techniques'] = self.requete_questions_techniques(contenu_text, analyse, infos)
+        requetes['questions_personnalite'] = self.requete_questions_personnalite(contenu_text, analyse, infos)
+        return requetes
+    
+    @staticmethod
+    def lire_generation(nom: str, response_text: str):
+        """Lit la réponse d'une étape de requetes_generation"""
+        if nom == 'lettre':
+            return GenerateurIA.lire_lettre(response_text)
+        return response_text.strip()
+
+
+class TemplateLaTeX:
+    """
+    Template LaTeX compilé
+
+    Le fichier est découpé une seule fois en segments : texte littéral et placeholders
+    `{NOM}`. Les paramètres fixés à la compilation (issus de la configuration) sont
+    intégrés au texte littéral ; le rendu assemble le document en une concaténation.
+    Un placeholder sans valeur reste tel quel (ex. `{RGB}` de \\definecolor).
+    """
+
+    _MOTIF_PLACEHOLDER = re.compile(r'\{([A-Z][A-Z0-9_]*)\}')
+
+    def __init__(self, texte: str, parametres: Optional[Dict[str, str]] = None):
+        parametres = parametres or {}
+        # Texte littéral aux indices pairs, noms des placeholders aux indices impairs
+        self.segments: List[str] = [""]
+        for i, morceau in enumerate(self._MOTIF_PLACEHOLDER.split(texte)):
+            if i % 2 == 0:
+                self.segments[-1] += morceau
+            elif morceau in parametres:
+                self.segments[-1] += parametres[morceau]
+            else:
+                self.segments += [morceau, ""]
+
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def charger(cls, chemin: Path, **parametres: str) -> 'TemplateLaTeX':
+        """Template compilé d'un fichier, lu une fois par fichier et jeu de paramètres"""
+        with open(chemin, 'r', encoding='utf-8') as f:
+            return cls(f.read(), parametres)
+
+    def rendre(self, valeurs: Dict[str, str]) -> str:
+        """Document complet, chaque placeholder remplacé par sa valeur (sans nouvelle substitution)"""
+        return ''.join(segment if i % 2 == 0 else valeurs.get(segment, f"{{{segment}}}")
+                       for i, segment in enumerate(self.segments))
 
 
 class GenerateurLaTeX:
@@ -718,6 +695,7 @@ class GenerateurLaTeX:
         return mission_text
     
     @staticmethod
+    @instrumentation.instrumenter('latex.generer_cv')
     def generer_cv(infos: InfosPersonnelles, profil_adapte: str, output_path: str):
         """Génère le CV LaTeX"""
         
@@ -727,10 +705,6 @@ class GenerateurLaTeX:
         else:
             template_file = TEMPLATES_DIR / 'cv_template.tex'
         
-        # Lire le template
-        with open(template_file, 'r', encoding='utf-8') as f:
-            template = f.read()
-        
         # Adapter le template selon le format choisi
         if CV_FORMAT == "1page":
             cv_margins = CV_MARGINS_1PAGE
@@ -747,15 +721,18 @@ class GenerateurLaTeX:
             vspace_form = VSPACE_BETWEEN_FORMATIONS_2PAGES
             vspace_proj = VSPACE_BETWEEN_PROJETS_2PAGES
         
-        # Remplacer les paramètres dans le template
-        template = template.replace('{CV_MARGINS}', cv_margins)
-        template = template.replace('{PARSKIP}', parskip)
-        template = template.replace('{HEADER_SPACING}', header_spacing)
-        template = template.replace('{FONT_SIZE_BASE}', FONT_SIZE_BASE)
-        template = template.replace('{FONT_SIZE_NAME}', FONT_SIZE_NAME)
-        template = template.replace('{FONT_SIZE_TITLE}', FONT_SIZE_TITLE)
-        template = template.replace('{FONT_SIZE_SECTION}', FONT_SIZE_SECTION)
-        template = template.replace('{BULLET_SYMBOL}', GenerateurLaTeX.get_bullet_symbol())
+        # Template compilé avec les paramètres de mise en page (réutilisé d'un CV à l'autre)
+        template = TemplateLaTeX.charger(
+            template_file,
+            CV_MARGINS=cv_margins,
+            PARSKIP=parskip,
+            HEADER_SPACING=header_spacing,
+            FONT_SIZE_BASE=FONT_SIZE_BASE,
+            FONT_SIZE_NAME=FONT_SIZE_NAME,
+            FONT_SIZE_TITLE=FONT_SIZE_TITLE,
+            FONT_SIZE_SECTION=FONT_SIZE_SECTION,
+            BULLET_SYMBOL=GenerateurLaTeX.get_bullet_symbol(),
+        )
         
         # Générer les sections avec les espacements appropriés
         experiences_tex = GenerateurLaTeX._generer_experiences(infos.experiences, vspace_exp)
@@ -775,43 +752,40 @@ class GenerateurLaTeX:
         # Remplacer les placeholders (en échappant les caractères spéciaux LaTeX)
         telephone = infos.telephone if infos.telephone and infos.telephone.strip() else '+33 X XX XX XX XX'
         replacements = {
-            '{NOM}': GenerateurLaTeX.escape_latex(infos.nom),
-            '{TITRE}': GenerateurLaTeX.escape_latex(infos.titre),
-            '{LOCALISATION}': GenerateurLaTeX.escape_latex(infos.localisation),
-            '{EMAIL}': infos.email,  # Email pas besoin d'échapper
-            '{TELEPHONE}': telephone,
-            '{LINKEDIN}': infos.linkedin,  # URL pas besoin d'échapper
-            '{LINKEDIN_TEXT}': infos.linkedin.replace('https://', '').replace('http://', ''),
-            '{PROFIL}': GenerateurLaTeX.escape_latex(profil_adapte),
-            '{EXPERIENCES}': experiences_tex,  # Déjà échappé dans _generer_experiences
-            '{FORMATIONS}': formations_tex,  # Déjà échappé dans _generer_formations
-            '{CERTIFICATIONS}': certifications_tex,
-            '{PROJETS}': projets_tex,
-            '{COMPETENCES_SCIENTIFIC_AI}': GenerateurLaTeX.escape_latex(infos.competences_scientific_ai),
-            '{COMPETENCES_SIMULATION}': GenerateurLaTeX.escape_latex(infos.competences_simulation),
-            '{COMPETENCES_GENERATIVE_AI}': GenerateurLaTeX.escape_latex(infos.competences_generative_ai),
-            '{COMPETENCES_INFORMATIQUE}': GenerateurLaTeX.escape_latex(infos.competences_informatique),
-            '{COMPETENCES_SECTION}': competences_section,  # Section complète pour mode générique
-            '{LANGUES}': langues_tex,
+            'NOM': GenerateurLaTeX.escape_latex(infos.nom),
+            'TITRE': GenerateurLaTeX.escape_latex(infos.titre),
+            'LOCALISATION': GenerateurLaTeX.escape_latex(infos.localisation),
+            'EMAIL': infos.email,  # Email pas besoin d'échapper
+            'TELEPHONE': telephone,
+            'LINKEDIN': infos.linkedin,  # URL pas besoin d'échapper
+            'LINKEDIN_TEXT': infos.linkedin.replace('https://', '').replace('http://', ''),
+            'PROFIL': GenerateurLaTeX.escape_latex(profil_adapte),
+            'EXPERIENCES': experiences_tex,  # Déjà échappé dans _generer_experiences
+            'FORMATIONS': formations_tex,  # Déjà échappé dans _generer_formations
+            'CERTIFICATIONS': certifications_tex,
+            'PROJETS': projets_tex,
+            'COMPETENCES_SCIENTIFIC_AI': GenerateurLaTeX.escape_latex(infos.competences_scientific_ai),
+            'COMPETENCES_SIMULATION': GenerateurLaTeX.escape_latex(infos.competences_simulation),
+            'COMPETENCES_GENERATIVE_AI': GenerateurLaTeX.escape_latex(infos.competences_generative_ai),
+            'COMPETENCES_INFORMATIQUE': GenerateurLaTeX.escape_latex(infos.competences_informatique),
+            'COMPETENCES_SECTION': competences_section,  # Section complète pour mode générique
+            'LANGUES': langues_tex,
         }
         
-        cv_content = template
-        for key, value in replacements.items():
-            cv_content = cv_content.replace(key, value)
+        cv_content = template.rendre(replacements)
         
         # Écrire le fichier
         with open(output_path, 'w', encoding='utf-8') as f:
             f.write(cv_content)
     
     @staticmethod
+    @instrumentation.instrumenter('latex.generer_lettre')
     def generer_lettre(infos: InfosPersonnelles, analyse_annonce: Dict, 
                        contenu_lettre: Dict, output_path: str):
         """Génère la lettre de motivation LaTeX"""
         
-        # Lire le template
-        template_file = TEMPLATES_DIR / 'lettre_motivation_template.tex'
-        with open(template_file, 'r', encoding='utf-8') as f:
-            template = f.read()
+        # Template compilé (lu une seule fois)
+        template = TemplateLaTeX.charger(TEMPLATES_DIR / 'lettre_motivation_template.tex')
         
         # Date actuelle
         date_fr = datetime.now().strftime("%d/%m/%Y")
@@ -819,23 +793,21 @@ class GenerateurLaTeX:
         # Remplacer les placeholders (en échappant les caractères spéciaux LaTeX)
         telephone = infos.telephone if infos.telephone and infos.telephone.strip() else '+33 X XX XX XX XX'
         replacements = {
-            '{NOM}': GenerateurLaTeX.escape_latex(infos.nom),
-            '{LOCALISATION}': GenerateurLaTeX.escape_latex(infos.localisation),
-            '{EMAIL}': infos.email,
-            '{TELEPHONE}': telephone,
-            '{LINKEDIN}': infos.linkedin,
-            '{ENTREPRISE}': GenerateurLaTeX.escape_latex(analyse_annonce.get('entreprise', 'Entreprise')),
-            '{DATE}': date_fr,
-            '{POSTE}': GenerateurLaTeX.escape_latex(analyse_annonce.get('poste', 'Poste')),
-            '{PARAGRAPHE_1}': GenerateurLaTeX.escape_latex(contenu_lettre.get('paragraphe_1', '')),
-            '{PARAGRAPHE_2}': GenerateurLaTeX.escape_latex(contenu_lettre.get('paragraphe_2', '')),
-            '{PARAGRAPHE_3}': GenerateurLaTeX.escape_latex(contenu_lettre.get('paragraphe_3', '')),
-            '{CONCLUSION}': GenerateurLaTeX.escape_latex(contenu_lettre.get('conclusion', '')),
+            'NOM': GenerateurLaTeX.escape_latex(infos.nom),
+            'LOCALISATION': GenerateurLaTeX.escape_latex(infos.localisation),
+            'EMAIL': infos.email,
+            'TELEPHONE': telephone,
+            'LINKEDIN': infos.linkedin,
+            'ENTREPRISE': GenerateurLaTeX.escape_latex(analyse_annonce.get('entreprise', 'Entreprise')),
+            'DATE': date_fr,
+            'POSTE': GenerateurLaTeX.escape_latex(analyse_annonce.get('poste', 'Poste')),
+            'PARAGRAPHE_1': GenerateurLaTeX.escape_latex(contenu_lettre.get('paragraphe_1', '')),
+            'PARAGRAPHE_2': GenerateurLaTeX.escape_latex(contenu_lettre.get('paragraphe_2', '')),
+            'PARAGRAPHE_3': GenerateurLaTeX.escape_latex(contenu_lettre.get('paragraphe_3', '')),
+            'CONCLUSION': GenerateurLaTeX.escape_latex(contenu_lettre.get('conclusion', '')),
         }
         
-        lettre_content = template
-        for key, value in replacements.items():
-            lettre_content = lettre_content.replace(key, value)
+        lettre_content = template.rendre(replacements)
         
         # Écrire le fichier
         with open(output_path, 'w', encoding='utf-8') as f:
@@ -964,194 +936,345 @@ class GenerateurLaTeX:
         return tex
 
 
-class CompillateurPDF:
-    """Compile les fichiers LaTeX en PDF"""
-    
-    @staticmethod
-    def compiler(tex_file: str) -> bool:
-        """Compile un fichier .tex en PDF"""
-        try:
-            # Utiliser le chemin complet de pdflatex
-            pdflatex_path = "/Library/TeX/texbin/pdflatex"
-            
-            # Compiler N fois pour les références (défini dans config.py)
-            for _ in range(LATEX_COMPILE_PASSES):
-                result = subprocess.run(
-                    [pdflatex_path, "-interaction=nonstopmode", tex_file],
-                    capture_output=True,
-                    text=True,
-                    cwd=os.path.dirname(tex_file) or '.'
-                )
-                
-                if result.returncode != 0 and DEBUG_MODE:
-                    print(f"Erreur lors de la compilation de {tex_file}")
-                    print(result.stdout)
-                    return False
-            
-            print(f"✓ {tex_file} compilé avec succès")
-            return True
-            
-        except Exception as e:
-            print(f"Erreur: {e}")
-            return False
+class FichierFlux:
+    """
+    Écrit une génération reçue en streaming dans son fichier, au fil des tokens
 
+    S'utilise comme contexte puis comme rappel on_texte de ClientClaude.appeler : chaque
+    fragment est écrit (et vidé sur disque) dès réception, et une ligne de progression
+    est affichée au plus toutes les STREAMING_PROGRESSION_SECONDES.
+    """
+    
+    # Les générations parallèles affichent leur progression sans entremêler les lignes
+    _verrou_affichage = threading.Lock()
+    
+    def __init__(self, chemin: Path, entete: str = "", nom: str = "", log=print):
+        self.chemin = Path(chemin)
+        self.entete = entete
+        self.nom = nom or self.chemin.name
+        self.log = log
+        self.caracteres = 0
+        self.termine = False  # génération reçue en entier : le fichier est complet
+        self._fichier = None
+        self._dernier_affichage = 0.0
+    
+    def __enter__(self) -> 'FichierFlux':
+        self._fichier = open(self.chemin, 'w', encoding='utf-8')
+        self._fichier.write(self.entete)
+        self._fichier.flush()
+        self._dernier_affichage = time.monotonic()
+        return self
+    
+    def __call__(self, fragment: str):
+        self._fichier.write(fragment)
+        self._fichier.flush()
+        self.caracteres += len(fragment)
+        maintenant = time.monotonic()
+        if maintenant - self._dernier_affichage >= STREAMING_PROGRESSION_SECONDES:
+            self._dernier_affichage = maintenant
+            with self._verrou_affichage:
+                self.log(f"   ⏳ {self.nom}: {self.caracteres} caractères reçus")
+    
+    def __exit__(self, *exc):
+        self._fichier.close()
+        self.termine = exc[0] is None
+        return False
 
-def main():
-    """Fonction principale"""
-    
-    print("=" * 60)
-    print("  GÉNÉRATEUR AUTOMATIQUE DE CV ET LETTRE DE MOTIVATION")
-    print("=" * 60)
-    print()
-    
-    # 1. Vérifier la clé API
-    api_key = os.environ.get('ANTHROPIC_API_KEY')
-    if not api_key:
-        print("❌ Erreur: La variable d'environnement ANTHROPIC_API_KEY n'est pas définie")
-        print("   Vérifiez votre fichier .env ou exportez: export ANTHROPIC_API_KEY='votre-clé'")
-        sys.exit(1)
-    
-    # 2. Déterminer le mode : annonce ou candidature spontanée
-    mode = MODE_GENERATION
-    
-    # Si un argument "--spontanee" est passé, passer en mode spontané
-    if len(sys.argv) > 1 and sys.argv[1] == "--spontanee":
-        mode = "spontanee"
-        if len(sys.argv) > 2:
-            url_input = sys.argv[2]
-        else:
-            url_input = input("URL du site web de l'entreprise: ").strip()
-        if len(sys.argv) > 3:
-            poste_cible = sys.argv[3]
-        else:
-            poste_cible = input(f"Poste visé (défaut: {POSTE_CIBLE_SPONTANEE}): ").strip() or POSTE_CIBLE_SPONTANEE
-    else:
-        # Mode annonce
-        if len(sys.argv) > 1 and sys.argv[1] != "--spontanee":
-            url_input = sys.argv[1]
-        else:
-            url_input = input("URL de l'annonce de poste: ").strip()
-        poste_cible = None
+
+class EtapesCandidature:
+    """
+    Points de reprise d'une génération (fichier FILENAME_ETAPES du dossier de candidature)
+    
+    Chaque résultat de l'IA y est écrit dès qu'il est produit : si une étape échoue,
+    une relance sur la même URL retrouve le dossier inachevé et ne rappelle l'API
+    que pour les étapes manquantes.
+    """
+    
+    def __init__(self, dossier: Path, url: str, mode: str,
+                 etapes: Optional[Dict] = None, termine: bool = False):
+        self.dossier = Path(dossier)
+        self.url = url
+        self.mode = mode
+        self.etapes = etapes or {}
+        self.termine = termine
+    
+    @classmethod
+    def trouver(cls, url: str, mode: str) -> Optional['EtapesCandidature']:
+        """Dossier inachevé le plus récent pour cette URL (None s'il n'y en a pas)"""
+        candidats = []
+        for chemin in (ROOT_DIR / OUTPUT_FOLDER).glob(f"*/{FILENAME_ETAPES}"):
+            try:
+                with open(chemin, 'r', encoding='utf-8') as f:
+                    donnees = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if donnees.get('url') == url and donnees.get('mode') == mode and not donnees.get('termine'):
+                candidats.append((chemin.stat().st_mtime, chemin.parent, donnees))
+        if not candidats:
+            return None
+        _, dossier, donnees = max(candidats, key=lambda c: c[0])
+        return cls(dossier, url, mode, donnees.get('etapes'))
+    
+    def enregistrer(self, nom: str, resultat):
+        """Ajoute le résultat d'une étape et réécrit le fichier"""
+        self.etapes[nom] = resultat
+        self._ecrire()
+    
+    def terminer(self):
+        """Marque la candidature complète : elle ne sera plus reprise"""
+        self.termine = True
+        self._ecrire()
+    
+    def _ecrire(self):
+        """Écriture atomique : une interruption ne laisse jamais un fichier tronqué"""
+        chemin = self.dossier / FILENAME_ETAPES
+        tmp = chemin.with_name(chemin.name + '.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'url': self.url, 'mode': self.mode, 'termine': self.termine, 'etapes': self.etapes},
+                      f, ensure_ascii=False, indent=2)
+        os.replace(tmp, chemin)
+
+
+def creer_dossier_candidature(analyse: Dict) -> Path:
+    """Crée le dossier Poste_Entreprise_Date (suffixe si une autre offre a produit le même nom)"""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M")
+    poste_clean = re.sub(r'[^a-zA-Z0-9]', '_', analyse['poste'])[:30]
+    entreprise_clean = re.sub(r'[^a-zA-Z0-9]', '_', analyse['entreprise'])[:20]
     
-    if not url_input:
-        print("❌ URL requise")
-        sys.exit(1)
+    folder_name = f"{poste_clean}_{entreprise_clean}_{timestamp}"
+    folder_path_obj = ROOT_DIR / OUTPUT_FOLDER / folder_name
     
-    # Afficher le mode
+    (ROOT_DIR / OUTPUT_FOLDER).mkdir(parents=True, exist_ok=True)
+    suffixe = 2
+    while True:
+        try:
+            folder_path_obj.mkdir()
+            return folder_path_obj
+        except FileExistsError:
+            folder_name = f"{poste_clean}_{entreprise_clean}_{timestamp}_{suffixe}"
+            folder_path_obj = ROOT_DIR / OUTPUT_FOLDER / folder_name
+            suffixe += 1
+
+
+def entete_entretien(titre: str, type_candidature: str, analyse: Dict) -> str:
+    """En-tête des fichiers de préparation d'entretien (topo, questions)"""
+    return ("=" * 80 + "\n"
+            f"  {titre}\n"
+            + "=" * 80 + "\n\n"
+            f"Type: {type_candidature}\n"
+            f"Poste: {analyse['poste']}\n"
+            f"Entreprise: {analyse['entreprise']}\n"
+            f"Date de génération: {datetime.now().strftime('%d/%m/%Y %H:%M')}\n"
+            "\n" + "=" * 80 + "\n\n")
+
+
+def generer_candidature(url: str, infos: InfosPersonnelles, ia: GenerateurIA,
+                        mode: str = "annonce", poste_cible: Optional[str] = None,
+                        session: Optional[requests.Session] = None,
+                        verbose: bool = True,
+                        compilation: Optional[ServiceCompilation] = None,
+                        journal: Optional[JournalBatch] = None) -> Optional[str]:
+    """
+    Génère une candidature complète (CV, lettre, préparation d'entretien) pour une URL
+    
+    Point d'entrée utilisable comme bibliothèque : les informations personnelles,
+    le client IA et la session HTTP sont fournis par l'appelant, ce qui permet
+    de les partager entre plusieurs candidatures (mode batch).
+    Avec un service de compilation partagé, les PDF sont compilés en arrière-plan
+    (voir ecrire_candidature).
+    Avec un journal, chaque étape réussie y est enregistrée et les étapes déjà
+    journalisées pour l'URL sont reprises au lieu d'être refaites.
+    Le dossier est créé dès l'analyse terminée et chaque résultat y est sauvegardé
+    aussitôt (EtapesCandidature) : une relance reprend un dossier inachevé.
+    Le topo et les questions techniques, les générations les plus longues, y sont
+    écrits au fil du streaming (STREAMING_GENERATIONS).
+    
+    Retourne le chemin du dossier de candidature, ou None si le scraping a échoué.
+    """
+    log = print if verbose else (lambda *args, **kwargs: None)
+    artefacts = journal.artefacts(url) if journal else {}
+    
+    # 1. Scraper le contenu (annonce ou site web)
+    log()
     if mode == "spontanee":
-        print(f"📌 Mode: Candidature spontanée")
-        print(f"🎯 Poste cible: {poste_cible}")
-        print()
+        log("🔍 Scraping du site web de l'entreprise...")
     else:
-        print(f"📌 Mode: Réponse à une annonce")
-        print()
-    
-    print()
-    print(MSG_CHARGEMENT_INFOS)
-    
-    # 3. Charger les informations statiques
-    infos = ParseurInfosStatiques.parse('infos_statique.txt')
-    print(f"   ✓ Informations de {infos.nom} chargées")
+        log(MSG_SCRAPING)
     
-    # 4. Scraper le contenu (annonce ou site web)
-    print()
-    if mode == "spontanee":
-        print("🔍 Scraping du site web de l'entreprise...")
+    if 'scraping' in artefacts:
+        contenu_text = artefacts['scraping']
     else:
-        print(MSG_SCRAPING)
-    
-    scraper = ScraperAnnonce()
-    contenu_text = scraper.scraper(url_input)
+        contenu_text = ScraperAnnonce.scraper(url, session=session)
     
     if not contenu_text:
-        print(f"❌ Impossible de scraper {'le site web' if mode == 'spontanee' else 'l\'annonce'}")
-        sys.exit(1)
-    
-    print(f"   ✓ Contenu récupéré ({len(contenu_text)} caractères)")
-    
-    # 5. Analyser avec l'IA
-    print()
-    ia = GenerateurIA(api_key)
-    
+        source = 'le site web' if mode == 'spontanee' else "l'annonce"
+        print(f"❌ Impossible de scraper {source}")
+        if journal:
+            journal.echec(url, 'scraping', f"Impossible de scraper {source}")
+        return None
+    
+    if journal and 'scraping' not in artefacts:
+        journal.reussite(url, 'scraping', contenu_text)
+    log(f"   ✓ Contenu récupéré ({len(contenu_text)} caractères)")
+    
+    # 2. Générer le contenu avec l'IA
+    # L'analyse est lancée en premier ; les cinq générations qui n'en dépendent
+    # que d'elle sont ensuite exécutées en parallèle (MAX_APPELS_IA_PARALLELES)
     if mode == "spontanee":
-        print(f"🤖 Analyse de l'entreprise avec Claude ({CLAUDE_MODEL})...")
-        analyse = ia.analyser_entreprise(contenu_text, poste_cible)
-        print(f"   ✓ Entreprise: {analyse['entreprise']}")
-        print(f"   ✓ Secteur: {analyse.get('secteur', 'N/A')}")
-        print(f"   ✓ Poste visé: {analyse['poste']}")
+        taches = [
+            Tache('analyse', lambda r: ia.analyser_entreprise(contenu_text, poste_cible, infos)),
+            Tache('profil', lambda r: ia.generer_profil_adapte_spontanee(infos.profil_defaut, r['analyse'], infos), ('analyse',)),
+            Tache('lettre', lambda r: ia.generer_lettre_motivation_spontanee(infos, r['analyse']), ('analyse',)),
+        ]
     else:
-        print(MSG_ANALYSE_IA.format(model=CLAUDE_MODEL))
-        analyse = ia.analyser_annonce(contenu_text)
-        print(f"   ✓ Poste: {analyse['poste']}")
-        print(f"   ✓ Entreprise: {analyse['entreprise']}")
+        taches = [
+            Tache('analyse', lambda r: ia.analyser_annonce(contenu_text, infos)),
+            Tache('profil', lambda r: ia.generer_profil_adapte(infos.profil_defaut, r['analyse'], infos), ('analyse',)),
+            Tache('lettre', lambda r: ia.generer_lettre_motivation(infos, r['analyse']), ('analyse',)),
+        ]
+    
+    # Générations longues : écrites dans le dossier de candidature au fil des tokens reçus
+    # (le dossier existe dès l'analyse terminée, avant le lancement des tâches qui en dépendent)
+    type_candidature = 'Candidature spontanée' if mode == 'spontanee' else 'Réponse à annonce'
+    flux: Dict[str, FichierFlux] = {}  # fichier → dernière sortie en streaming
+    
+    def sortie_flux(nom: str, fichier: str, titre: str, analyse: Dict) -> Optional[FichierFlux]:
+        if not STREAMING_GENERATIONS:
+            return None
+        flux[fichier] = FichierFlux(reprise.dossier / fichier, entete_entretien(titre, type_candidature, analyse),
+                                    nom=nom, log=log)
+        return flux[fichier]
+    
+    taches += [
+        Tache('topo', lambda r: ia.generer_topo_entretien(
+            contenu_text, r['analyse'], infos,
+            sortie=sortie_flux('topo', "preparation_entretien.txt", "PRÉPARATION D'ENTRETIEN", r['analyse'])
+        ), ('analyse',)),
+        Tache('questions_techniques', lambda r: ia.generer_questions_techniques(
+            contenu_text, r['analyse'], infos,
+            sortie=sortie_flux('questions techniques', "questions_techniques.txt",
+                               f"QUESTIONS TECHNIQUES D'ENTRETIEN ({NB_QUESTIONS_TECHNIQUES} questions)", r['analyse'])
+        ), ('analyse',)),
+        Tache('questions_personnalite', lambda r: ia.generer_questions_personnalite(contenu_text, r['analyse'], infos), ('analyse',)),
+    ]
+    
+    def afficher_progression(nom: str, resultat):
+        if nom == 'analyse':
+            if mode == "spontanee":
+                log(f"   ✓ Entreprise: {resultat['entreprise']}")
+                log(f"   ✓ Secteur: {resultat.get('secteur', 'N/A')}")
+                log(f"   ✓ Poste visé: {resultat['poste']}")
+            else:
+                log(f"   ✓ Poste: {resultat['poste']}")
+                log(f"   ✓ Entreprise: {resultat['entreprise']}")
+            log()
+            log(MSG_GENERATION_PROFIL)
+            log(MSG_GENERATION_LETTRE)
+            log("📚 Génération du topo de préparation d'entretien...")
+            log(f"🔧 Génération de {NB_QUESTIONS_TECHNIQUES} questions techniques...")
+            log(f"💭 Génération de {NB_QUESTIONS_PERSONNALITE} questions de personnalité...")
+        else:
+            log(MSG_ETAPE_TERMINEE[nom])
     
-    # 6. Générer le profil adapté
-    print()
-    print(MSG_GENERATION_PROFIL)
+    log()
     if mode == "spontanee":
-        profil_adapte = ia.generer_profil_adapte_spontanee(infos.profil_defaut, analyse, infos)
+        log(f"🤖 Analyse de l'entreprise avec Claude ({CLAUDE_MODEL})...")
     else:
-        profil_adapte = ia.generer_profil_adapte(infos.profil_defaut, analyse, infos)
-    print("   ✓ Profil personnalisé généré")
+        log(MSG_ANALYSE_IA.format(model=CLAUDE_MODEL))
     
-    # 7. Générer la lettre de motivation
-    print()
-    print(MSG_GENERATION_LETTRE)
-    if mode == "spontanee":
-        contenu_lettre = ia.generer_lettre_motivation_spontanee(infos, analyse)
+    # Fichiers déjà écrits (journal) : seuls les PDF restent à produire, dans ce dossier.
+    # Les points de reprise y restent aussi, sans créer de nouveau dossier.
+    dossier_tex = artefacts.get('tex')
+    if dossier_tex and os.path.isdir(dossier_tex):
+        reprise = EtapesCandidature(Path(dossier_tex), url, mode, termine=True)
     else:
-        contenu_lettre = ia.generer_lettre_motivation(infos, analyse)
-    print("   ✓ Lettre de motivation générée")
-    
-    # 7b. Générer le topo de préparation d'entretien
-    print()
-    print("📚 Génération du topo de préparation d'entretien...")
-    topo_entretien = ia.generer_topo_entretien(contenu_text, analyse, infos)
-    print("   ✓ Topo d'entretien généré")
-    
-    # 7c. Générer les questions techniques
-    print()
-    print(f"🔧 Génération de {NB_QUESTIONS_TECHNIQUES} questions techniques...")
-    questions_techniques = ia.generer_questions_techniques(contenu_text, analyse, infos)
-    print("   ✓ Questions techniques générées")
-    
-    # 7d. Générer les questions de personnalité
-    print()
-    print(f"💭 Génération de {NB_QUESTIONS_PERSONNALITE} questions de personnalité...")
-    questions_personnalite = ia.generer_questions_personnalite(contenu_text, analyse, infos)
-    print("   ✓ Questions de personnalité générées")
-    
-    # 8. Créer le dossier de candidature
-    print()
-    print(MSG_CREATION_DOSSIER)
-    
-    # Nom du dossier : Poste_Entreprise_Date
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M")
-    poste_clean = re.sub(r'[^a-zA-Z0-9]', '_', analyse['poste'])[:30]
-    entreprise_clean = re.sub(r'[^a-zA-Z0-9]', '_', analyse['entreprise'])[:20]
-    
-    folder_name = f"{poste_clean}_{entreprise_clean}_{timestamp}"
-    folder_path_obj = ROOT_DIR / OUTPUT_FOLDER / folder_name
-    
-    # Créer le dossier
-    folder_path_obj.mkdir(parents=True, exist_ok=True)
-    folder_path = str(folder_path_obj)  # Convertir en string pour compatibilité
-    print(f"   ✓ Dossier créé: {OUTPUT_FOLDER}/{folder_name}/")
-    
-    # 9. Créer les fichiers LaTeX dans le dossier
-    print()
-    print(MSG_CREATION_LATEX)
+        # Étapes déjà sauvegardées dans un dossier inachevé pour cette URL : pas de nouvel appel
+        reprise = EtapesCandidature.trouver(url, mode)
+    deja_faites = dict(reprise.etapes) if reprise else {}
+    if deja_faites:
+        log(f"   ↻ Reprise de {reprise.dossier.name} ({', '.join(deja_faites)} déjà générés)")
+        taches = [Tache(t.nom, (lambda r, resultat=deja_faites[t.nom]: resultat), t.dependances)
+                  if t.nom in deja_faites else t for t in taches]
+    if journal:
+        taches = [journal.tache(url, tache, artefacts) for tache in taches]
+    
+    def sauvegarder_etape(nom: str, resultat):
+        # Appelé dans ce thread à chaque tâche terminée ; l'analyse arrive toujours en premier
+        nonlocal reprise
+        if reprise is None:
+            reprise = EtapesCandidature(creer_dossier_candidature(resultat), url, mode)
+        if nom not in deja_faites and not reprise.termine:
+            reprise.enregistrer(nom, resultat)
+        afficher_progression(nom, resultat)
+    
+    resultats = executer_taches(taches, max_workers=MAX_APPELS_IA_PARALLELES,
+                                on_termine=sauvegarder_etape)
+    
+    # Reprise après les fichiers : seuls les PDF restent à produire
+    if reprise.termine:
+        compiler_candidature(dossier_tex, infos, resultats, verbose=verbose, compilation=compilation)
+        return dossier_tex
+    
+    dossier = ecrire_candidature(url, contenu_text, resultats, infos, mode=mode, verbose=verbose,
+                                 compilation=compilation, folder_path=str(reprise.dossier),
+                                 fichiers_ecrits={f for f, sortie in flux.items() if sortie.termine})
+    reprise.terminer()
+    if journal:
+        journal.reussite(url, 'tex', dossier)
+    return dossier
+
+
+def ecrire_candidature(url: str, contenu_text: str, resultats: Dict, infos: InfosPersonnelles,
+                       mode: str = "annonce", verbose: bool = True,
+                       compilation: Optional[ServiceCompilation] = None,
+                       folder_path: Optional[str] = None,
+                       fichiers_ecrits: Optional[set] = None) -> str:
+    """
+    Écrit le dossier de candidature à partir des résultats de l'IA
+    
+    resultats contient les clés analyse, profil, lettre, topo, questions_techniques
+    et questions_personnalite (générations directes ou issues de la Batch API).
+    Sans service de compilation, le CV et la lettre sont compilés (en parallèle) avant
+    de rendre la main ; avec un service partagé, ils y sont seulement soumis et
+    l'appelant attend la fin des compilations (ServiceCompilation.terminer).
+    folder_path désigne un dossier déjà créé (points de reprise) ; sinon il est créé ici.
+    fichiers_ecrits : fichiers déjà écrits en entier au fil du streaming (FichierFlux),
+    qui ne sont pas réécrits.
+    Retourne le chemin du dossier de candidature.
+    """
+    log = print if verbose else (lambda *args, **kwargs: None)
+    type_candidature = 'Candidature spontanée' if mode == 'spontanee' else 'Réponse à annonce'
+    fichiers_ecrits = fichiers_ecrits or set()
+    
+    analyse = resultats['analyse']
+    profil_adapte = resultats['profil']
+    contenu_lettre = resultats['lettre']
+    topo_entretien = resultats['topo']
+    questions_techniques = resultats['questions_techniques']
+    questions_personnalite = resultats['questions_personnalite']
+    
+    # 3. Créer le dossier de candidature (Poste_Entreprise_Date)
+    log()
+    log(MSG_CREATION_DOSSIER)
+    
+    if folder_path is None:
+        folder_path = str(creer_dossier_candidature(analyse))  # Convertir en string pour compatibilité
+    log(f"   ✓ Dossier: {OUTPUT_FOLDER}/{os.path.basename(folder_path)}/")
+    
+    # 4. Créer les fichiers LaTeX dans le dossier
+    log()
+    log(MSG_CREATION_LATEX)
     
     cv_filename = os.path.join(folder_path, FILENAME_CV)
     lettre_filename = os.path.join(folder_path, FILENAME_LETTRE)
     
     GenerateurLaTeX.generer_cv(infos, profil_adapte, cv_filename)
-    print(f"   ✓ {FILENAME_CV} créé")
+    log(f"   ✓ {FILENAME_CV} créé")
     
     GenerateurLaTeX.generer_lettre(infos, analyse, contenu_lettre, lettre_filename)
-    print(f"   ✓ {FILENAME_LETTRE} créé")
+    log(f"   ✓ {FILENAME_LETTRE} créé")
     
-    # 10. Sauvegarder le contenu original (annonce ou site web)
+    # 5. Sauvegarder le contenu original (annonce ou site web)
     if mode == "spontanee":
         source_filename = os.path.join(folder_path, "site_entreprise_original.txt")
         titre_source = "SITE WEB DE L'ENTREPRISE"
@@ -1160,17 +1283,17 @@ def main():
         titre_source = "ANNONCE ORIGINALE"
     
     with open(source_filename, 'w', encoding='utf-8') as f:
-        f.write(f"Type: {'Candidature spontanée' if mode == 'spontanee' else 'Réponse à annonce'}\n")
-        f.write(f"URL: {url_input}\n")
+        f.write(f"Type: {type_candidature}\n")
+        f.write(f"URL: {url}\n")
         f.write(f"Date de scraping: {datetime.now().strftime('%d/%m/%Y %H:%M')}\n")
         f.write("=" * 60 + "\n\n")
         f.write(contenu_text)
-    print(f"   ✓ {titre_source.lower()} sauvegardée")
+    log(f"   ✓ {titre_source.lower()} sauvegardée")
     
-    # 11. Sauvegarder l'analyse
+    # 6. Sauvegarder l'analyse
     analyse_filename = os.path.join(folder_path, FILENAME_ANALYSE)
     with open(analyse_filename, 'w', encoding='utf-8') as f:
-        f.write(f"Type: {'Candidature spontanée' if mode == 'spontanee' else 'Réponse à annonce'}\n")
+        f.write(f"Type: {type_candidature}\n")
         f.write(f"Poste: {analyse['poste']}\n")
         f.write(f"Entreprise: {analyse['entreprise']}\n")
         
@@ -1189,67 +1312,160 @@ def main():
                 f.write(f"  - {comp}\n")
         
         f.write(f"\nMots-clés: {analyse.get('mots_cles', 'N/A')}\n")
-    print(f"   ✓ {FILENAME_ANALYSE} sauvegardée")
-    
-    # 11b. Sauvegarder le topo d'entretien
-    topo_filename = os.path.join(folder_path, "preparation_entretien.txt")
-    with open(topo_filename, 'w', encoding='utf-8') as f:
-        f.write("=" * 80 + "\n")
-        f.write("  PRÉPARATION D'ENTRETIEN\n")
-        f.write("=" * 80 + "\n\n")
-        f.write(f"Type: {'Candidature spontanée' if mode == 'spontanee' else 'Réponse à annonce'}\n")
-        f.write(f"Poste: {analyse['poste']}\n")
-        f.write(f"Entreprise: {analyse['entreprise']}\n")
-        f.write(f"Date de génération: {datetime.now().strftime('%d/%m/%Y %H:%M')}\n")
-        f.write("\n" + "=" * 80 + "\n\n")
-        f.write(topo_entretien)
-    print(f"   ✓ preparation_entretien.txt sauvegardée")
-    
-    # 11c. Sauvegarder les questions techniques
-    questions_tech_filename = os.path.join(folder_path, "questions_techniques.txt")
-    with open(questions_tech_filename, 'w', encoding='utf-8') as f:
-        f.write("=" * 80 + "\n")
-        f.write(f"  QUESTIONS TECHNIQUES D'ENTRETIEN ({NB_QUESTIONS_TECHNIQUES} questions)\n")
-        f.write("=" * 80 + "\n\n")
-        f.write(f"Type: {'Candidature spontanée' if mode == 'spontanee' else 'Réponse à annonce'}\n")
-        f.write(f"Poste: {analyse['poste']}\n")
-        f.write(f"Entreprise: {analyse['entreprise']}\n")
-        f.write(f"Date de génération: {datetime.now().strftime('%d/%m/%Y %H:%M')}\n")
-        f.write("\n" + "=" * 80 + "\n\n")
-        f.write(questions_techniques)
-    print(f"   ✓ questions_techniques.txt sauvegardée")
-    
-    # 11d. Sauvegarder les questions de personnalité
+    log(f"   ✓ {FILENAME_ANALYSE} sauvegardée")
+    
+    # 6b. Sauvegarder le topo d'entretien (sauf s'il a déjà été écrit en streaming)
+    if "preparation_entretien.txt" not in fichiers_ecrits:
+        topo_filename = os.path.join(folder_path, "preparation_entretien.txt")
+        with open(topo_filename, 'w', encoding='utf-8') as f:
+            f.write(entete_entretien("PRÉPARATION D'ENTRETIEN", type_candidature, analyse))
+            f.write(topo_entretien)
+    log(f"   ✓ preparation_entretien.txt sauvegardée")
+    
+    # 6c. Sauvegarder les questions techniques (sauf si déjà écrites en streaming)
+    if "questions_techniques.txt" not in fichiers_ecrits:
+        questions_tech_filename = os.path.join(folder_path, "questions_techniques.txt")
+        with open(questions_tech_filename, 'w', encoding='utf-8') as f:
+            f.write(entete_entretien(f"QUESTIONS TECHNIQUES D'ENTRETIEN ({NB_QUESTIONS_TECHNIQUES} questions)", type_candidature, analyse))
+            f.write(questions_techniques)
+    log(f"   ✓ questions_techniques.txt sauvegardée")
+    
+    # 6d. Sauvegarder les questions de personnalité
     questions_perso_filename = os.path.join(folder_path, "questions_personnalite.txt")
     with open(questions_perso_filename, 'w', encoding='utf-8') as f:
-        f.write("=" * 80 + "\n")
-        f.write(f"  QUESTIONS DE PERSONNALITÉ ({NB_QUESTIONS_PERSONNALITE} questions)\n")
-        f.write("=" * 80 + "\n\n")
-        f.write(f"Type: {'Candidature spontanée' if mode == 'spontanee' else 'Réponse à annonce'}\n")
-        f.write(f"Poste: {analyse['poste']}\n")
-        f.write(f"Entreprise: {analyse['entreprise']}\n")
-        f.write(f"Date de génération: {datetime.now().strftime('%d/%m/%Y %H:%M')}\n")
-        f.write("\n" + "=" * 80 + "\n\n")
+        f.write(entete_entretien(f"QUESTIONS DE PERSONNALITÉ ({NB_QUESTIONS_PERSONNALITE} questions)", type_candidature, analyse))
         f.write(questions_personnalite)
-    print(f"   ✓ questions_personnalite.txt sauvegardée")
+    log(f"   ✓ questions_personnalite.txt sauvegardée")
+    
+    # 7. Compiler en PDF
+    compiler_candidature(folder_path, infos, resultats, verbose=verbose, compilation=compilation)
+    
+    return folder_path
+
+
+def compiler_candidature(folder_path: str, infos: InfosPersonnelles, resultats: Dict,
+                         verbose: bool = True, compilation: Optional[ServiceCompilation] = None):
+    """
+    Compile le CV et la lettre d'un dossier de candidature (si AUTO_COMPILE_PDF)
+    
+    Avec un service partagé les documents y sont seulement soumis, sinon ils sont
+    compilés en parallèle avant de rendre la main.
+    """
+    if not AUTO_COMPILE_PDF:
+        return
+    log = print if verbose else (lambda *args, **kwargs: None)
+    log()
+    log(MSG_COMPILATION)
+    
+    # Les données d'origine accompagnent les .tex : un moteur sans LaTeX (MOTEUR_PDF) rend depuis elles
+    infos_dict = asdict(infos)
+    documents = [
+        DocumentPDF(os.path.join(folder_path, FILENAME_CV), 'cv',
+                    {'infos': infos_dict, 'profil': resultats['profil']}),
+        DocumentPDF(os.path.join(folder_path, FILENAME_LETTRE), 'lettre',
+                    {'infos': infos_dict, 'analyse': resultats['analyse'], 'lettre': resultats['lettre']}),
+    ]
+    if compilation is not None:
+        # Pool partagé : la compilation se poursuit pendant la génération des offres suivantes
+        for document in documents:
+            compilation.soumettre(document)
+    else:
+        # Deux documents : un pool de threads suffit (pdflatex est un sous-processus)
+        with ServiceCompilation(max_workers=len(documents), processus=False) as service:
+            futures = [service.soumettre(document) for document in documents]
+            for future in futures:
+                afficher_compilation(future.result())
+
+
+def main():
+    """Fonction principale"""
+    
+    print("=" * 60)
+    print("  GÉNÉRATEUR AUTOMATIQUE DE CV ET LETTRE DE MOTIVATION")
+    print("=" * 60)
+    print()
+    
+    # 1. Vérifier la clé API
+    api_key = os.environ.get('ANTHROPIC_API_KEY')
+    if not api_key:
+        print("❌ Erreur: La variable d'environnement ANTHROPIC_API_KEY n'est pas définie")
+        print("   Vérifiez votre fichier .env ou exportez: export ANTHROPIC_API_KEY='votre-clé'")
+        sys.exit(1)
+    
+    # Options du cache des réponses IA (--no-cache / --refresh)
+    sys.argv = cache_llm.appliquer_options_ligne_commande(sys.argv)
+    # --force : recompiler les PDF même si le .tex n'a pas changé
+    sys.argv = compilation_latex.appliquer_options_ligne_commande(sys.argv)
+    
+    # 2. Déterminer le mode : annonce ou candidature spontanée
+    mode = MODE_GENERATION
+    
+    # Si un argument "--spontanee" est passé, passer en mode spontané
+    if len(sys.argv) > 1 and sys.argv[1] == "--spontanee":
+        mode = "spontanee"
+        if len(sys.argv) > 2:
+            url_input = sys.argv[2]
+        else:
+            url_input = input("URL du site web de l'entreprise: ").strip()
+        if len(sys.argv) > 3:
+            poste_cible = sys.argv[3]
+        else:
+            poste_cible = input(f"Poste visé (défaut: {POSTE_CIBLE_SPONTANEE}): ").strip() or POSTE_CIBLE_SPONTANEE
+    else:
+        # Mode annonce
+        if len(sys.argv) > 1 and sys.argv[1] != "--spontanee":
+            url_input = sys.argv[1]
+        else:
+            url_input = input("URL de l'annonce de poste: ").strip()
+        poste_cible = None
     
-    # 12. Compiler en PDF
-    if AUTO_COMPILE_PDF:
+    if not url_input:
+        print("❌ URL requise")
+        sys.exit(1)
+    
+    # Afficher le mode
+    if mode == "spontanee":
+        print(f"📌 Mode: Candidature spontanée")
+        print(f"🎯 Poste cible: {poste_cible}")
+        print()
+    else:
+        print(f"📌 Mode: Réponse à une annonce")
         print()
-        print(MSG_COMPILATION)
-        
-        CompillateurPDF.compiler(cv_filename)
-        CompillateurPDF.compiler(lettre_filename)
     
-    # 13. Fin
+    print()
+    print(MSG_CHARGEMENT_INFOS)
+    
+    # 3. Charger les informations statiques
+    try:
+        infos = ParseurInfosStatiques.charger(FICHIER_PROFIL)
+    except ValueError as e:
+        print(f"❌ Profil invalide ({FICHIER_PROFIL}): {e}")
+        sys.exit(1)
+    print(f"   ✓ Informations de {infos.nom} chargées")
+    
+    # 4. Générer la candidature (scraping, IA, LaTeX, PDF)
+    ia = GenerateurIA(api_key)
+    with instrumentation.offre(url_input), instrumentation.mesurer('offre'):
+        folder_path = generer_candidature(url_input, infos, ia, mode=mode, poste_cible=poste_cible)
+    rapport = instrumentation.ecrire_rapport('generation')
+    
+    if not folder_path:
+        sys.exit(1)
+    
+    # 5. Fin
     print()
     print("=" * 60)
     print("✅ GÉNÉRATION TERMINÉE AVEC SUCCÈS!")
     print("=" * 60)
     print()
+    print(f"📊 Tokens: {ia.claude.resume_usage()}")
+    if rapport:
+        print(f"⏱️  Durées par étape (rapport: {rapport.relative_to(ROOT_DIR)}):")
+        print(instrumentation.rapport().resume())
+    print()
     if mode == "spontanee":
         print(f"📌 Type: Candidature spontanée")
-        print(f"🎯 Poste visé: {analyse['poste']}")
+        print(f"🎯 Poste visé: {poste_cible}")
     else:
         print(f"📌 Type: Réponse à annonce")
     print()
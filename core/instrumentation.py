@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Instrumentation des étapes du pipeline
+Mesure la durée de chaque étape (scraping, appels Claude, écriture LaTeX, compilation PDF)
+et les compteurs qui lui sont attribués : tokens (y compris ceux du cache de prompts),
+réponses du cache local, reprises, octets téléchargés. Chaque exécution écrit un rapport
+JSON et CSV ; les statistiques par étape (p50/p95) résument un batch
+"""
+
+import csv
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Importer la configuration centralisée
+from config import *
+
+ROOT_DIR = Path(__file__).parent.absolute().parent
+
+# Compteurs attribués à l'étape en cours
+COMPTEURS = ('input_tokens', 'output_tokens', 'cache_creation_input_tokens', 'cache_read_input_tokens',
+             'reponses_cache_local', 'tentatives', 'octets')
+
+
+@dataclass
+class Mesure:
+    """Une exécution d'une étape : durée, issue et compteurs"""
+    etape: str
+    offre: str = ""
+    debut: float = 0.0
+    duree: float = 0.0
+    succes: bool = True
+    compteurs: Dict[str, int] = field(default_factory=dict)
+
+
+# Étape en cours et offre traitée : propres à chaque thread, transmises aux tâches
+# qu'il lance (executer_taches et ServiceCompilation copient le contexte)
+_mesure_courante: ContextVar[Optional[Mesure]] = ContextVar('mesure_courante', default=None)
+_offre_courante: ContextVar[str] = ContextVar('offre_courante', default="")
+
+
+def centile(valeurs: List[float], p: float) -> float:
+    """Centile p (0-100) par interpolation linéaire entre les rangs"""
+    if not valeurs:
+        return 0.0
+    valeurs = sorted(valeurs)
+    rang = (len(valeurs) - 1) * p / 100
+    bas = int(rang)
+    haut = min(bas + 1, len(valeurs) - 1)
+    return valeurs[bas] + (valeurs[haut] - valeurs[bas]) * (rang - bas)
+
+
+class Rapport:
+    """Mesures collectées pendant l'exécution (partagées entre threads)"""
+
+    def __init__(self):
+        self.debut = time.time()
+        self._mesures: List[Mesure] = []
+        self._lock = threading.Lock()
+
+    def ajouter(self, mesure: Mesure):
+        with self._lock:
+            self._mesures.append(mesure)
+
+    @property
+    def mesures(self) -> List[Mesure]:
+        with self._lock:
+            return list(self._mesures)
+
+    def statistiques(self) -> Dict[str, Dict]:
+        """Par étape : nombre, échecs, durées (total, p50, p95, max) et compteurs cumulés"""
+        par_etape: Dict[str, List[Mesure]] = {}
+        for mesure in self.mesures:
+            par_etape.setdefault(mesure.etape, []).append(mesure)
+        stats = {}
+        for etape, mesures in par_etape.items():
+            durees = [m.duree for m in mesures]
+            stats[etape] = {
+                'nombre': len(mesures),
+                'echecs': sum(1 for m in mesures if not m.succes),
+                'duree_totale': round(sum(durees), 3),
+                'duree_p50': round(centile(durees, 50), 3),
+                'duree_p95': round(centile(durees, 95), 3),
+                'duree_max': round(max(durees), 3),
+                **{nom: sum(m.compteurs.get(nom, 0) for m in mesures) for nom in COMPTEURS},
+            }
+        return stats
+
+    def ecrire(self, nom: str, dossier: Optional[Path] = None) -> Path:
+        """
+        Écrit le rapport <nom>_<date>.json (mesures et statistiques) et <nom>_<date>.csv
+        (une ligne par mesure) dans RAPPORTS_DOSSIER ; retourne le chemin du JSON
+        """
+        dossier = Path(dossier or ROOT_DIR / RAPPORTS_DOSSIER)
+        dossier.mkdir(parents=True, exist_ok=True)
+        base = dossier / f"{nom}_{datetime.fromtimestamp(self.debut).strftime('%Y%m%d_%H%M%S')}"
+        mesures = self.mesures
+
+        with open(base.with_suffix('.json'), 'w', encoding='utf-8') as f:
+            json.dump({
+                'debut': datetime.fromtimestamp(self.debut).isoformat(timespec='seconds'),
+                'duree': round(time.time() - self.debut, 3),
+                'etapes': self.statistiques(),
+                'mesures': [asdict(m) for m in mesures],
+            }, f, ensure_ascii=False, indent=2)
+
+        with open(base.with_suffix('.csv'), 'w', encoding='utf-8', newline='') as f:
+            ecrivain = csv.writer(f)
+            ecrivain.writerow(('etape', 'offre', 'debut', 'duree', 'succes') + COMPTEURS)
+            for m in mesures:
+                ecrivain.writerow((m.etape, m.offre, datetime.fromtimestamp(m.debut).isoformat(timespec='milliseconds'),
+                                   round(m.duree, 3), m.succes) + tuple(m.compteurs.get(nom, 0) for nom in COMPTEURS))
+
+        return base.with_suffix('.json')
+
+    def resume(self) -> str:
+        """Tableau des durées par étape (p50/p95) et des tokens consommés"""
+        lignes = [f"   {'Étape':<42} {'n':>4} {'p50':>8} {'p95':>8} {'total':>9} {'tokens in/out':>15}"]
+        for etape, s in sorted(self.statistiques().items(), key=lambda e: -e[1]['duree_totale']):
+            tokens = (f"{s['input_tokens'] + s['cache_creation_input_tokens'] + s['cache_read_input_tokens']}"
+                      f"/{s['output_tokens']}") if s['output_tokens'] else ""
+            lignes.append(f"   {etape:<42} {s['nombre']:>4} {s['duree_p50']:>7.2f}s {s['duree_p95']:>7.2f}s "
+                          f"{s['duree_totale']:>8.1f}s {tokens:>15}")
+        return "\n".join(lignes)
+
+
+_rapport = Rapport()
+_compteurs_lock = threading.Lock()
+
+
+def rapport() -> Rapport:
+    """Rapport du processus"""
+    return _rapport
+
+
+def nouveau_rapport() -> Rapport:
+    """Repart d'un rapport vide (un rapport par scénario de benchmark)"""
+    global _rapport
+    _rapport = Rapport()
+    return _rapport
+
+
+@contextmanager
+def mesurer(etape: str):
+    """Mesure le bloc comme une exécution de l'étape (les compteurs vont à l'étape la plus interne)"""
+    if not INSTRUMENTATION_ACTIVE:
+        yield None
+        return
+    mesure = Mesure(etape, offre=_offre_courante.get(), debut=time.time())
+    jeton = _mesure_courante.set(mesure)
+    depart = time.perf_counter()
+    try:
+        yield mesure
+    except BaseException:
+        mesure.succes = False
+        raise
+    finally:
+        mesure.duree = time.perf_counter() - depart
+        _mesure_courante.reset(jeton)
+        _rapport.ajouter(mesure)
+
+
+def instrumenter(etape: str):
+    """Décorateur : chaque appel de la fonction est mesuré comme une exécution de l'étape"""
+    def decorateur(fonction):
+        @functools.wraps(fonction)
+        def enveloppe(*args, **kwargs):
+            with mesurer(etape):
+                return fonction(*args, **kwargs)
+        return enveloppe
+    return decorateur
+
+
+@contextmanager
+def offre(url: str):
+    """Rattache les mesures du bloc (et des tâches qu'il lance) à une offre"""
+    jeton = _offre_courante.set(url)
+    try:
+        yield
+    finally:
+        _offre_courante.reset(jeton)
+
+
+def ecrire_rapport(nom: str) -> Optional[Path]:
+    """Écrit le rapport de l'exécution (None si l'instrumentation est désactivée ou sans mesure)"""
+    if not INSTRUMENTATION_ACTIVE or not _rapport.mesures:
+        return None
+    return _rapport.ecrire(nom)
+
+
+def offre_courante() -> str:
+    """Offre rattachée au contexte courant (à capturer avant de confier un travail à un autre processus)"""
+    return _offre_courante.get()
+
+
+def enregistrer(etape: str, duree: float, succes: bool = True, offre: Optional[str] = None, **compteurs: int):
+    """Ajoute une mesure prise ailleurs (processus de compilation) au rapport"""
+    if not INSTRUMENTATION_ACTIVE:
+        return
+    _rapport.ajouter(Mesure(etape, offre=_offre_courante.get() if offre is None else offre,
+                            debut=time.time() - duree, duree=duree, succes=succes, compteurs=compteurs))
+
+
+def ajouter(**compteurs: int):
+    """Ajoute des compteurs (COMPTEURS) à l'étape en cours ; sans étape en cours, ils sont ignorés"""
+    mesure = _mesure_courante.get()
+    if mesure is None:
+        return
+    with _compteurs_lock:
+        for nom, valeur in compteurs.items():
+            mesure.compteurs[nom] = mesure.compteurs.get(nom, 0) + (valeur or 0)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Journal persistant des traitements batch
+Enregistre dans SQLite l'état de chaque URL à chaque étape du pipeline (scraping,
+analyse, générations, .tex, PDF) avec l'artefact produit : après une interruption,
+--resume reprend là où le batch s'est arrêté sans rappeler Claude pour les étapes réussies
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from executeur_taches import Tache
+
+# Importer la configuration centralisée
+from config import *
+
+ROOT_DIR = Path(__file__).parent.absolute().parent
+
+# Étapes du pipeline, dans l'ordre
+ETAPES = ('scraping', 'analyse', 'profil', 'lettre', 'topo',
+          'questions_techniques', 'questions_personnalite', 'tex', 'pdf')
+
+# Étapes de génération IA (même nom que les tâches de generer_candidature)
+ETAPES_IA = ('analyse', 'profil', 'lettre', 'topo', 'questions_techniques', 'questions_personnalite')
+
+OK = 'ok'
+ECHEC = 'echec'
+
+
+class JournalBatch:
+    """Journal SQLite (url, étape) → état, artefact JSON, erreur"""
+
+    def __init__(self, chemin: str):
+        self.chemin = Path(chemin)
+        self.chemin.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Connexion partagée entre threads (workers du batch, rappels du pool de compilation)
+        self._conn = sqlite3.connect(str(self.chemin), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS etapes (
+                url TEXT NOT NULL,
+                etape TEXT NOT NULL,
+                etat TEXT NOT NULL,
+                artefact TEXT,
+                erreur TEXT,
+                maj REAL NOT NULL,
+                PRIMARY KEY (url, etape)
+            )
+        """)
+        self._conn.commit()
+
+    def _ecrire(self, url: str, etape: str, etat: str, artefact: Any = None, erreur: Optional[str] = None):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO etapes (url, etape, etat, artefact, erreur, maj) VALUES (?, ?, ?, ?, ?, ?)",
+                (url, etape, etat, json.dumps(artefact, ensure_ascii=False), erreur, time.time())
+            )
+            self._conn.commit()
+
+    def reussite(self, url: str, etape: str, artefact: Any = None):
+        """Enregistre une étape réussie et son artefact (sérialisable en JSON)"""
+        self._ecrire(url, etape, OK, artefact)
+
+    def echec(self, url: str, etape: str, erreur: str):
+        """Enregistre une étape en échec : elle sera refaite à la reprise"""
+        self._ecrire(url, etape, ECHEC, erreur=erreur)
+
+    def artefacts(self, url: str) -> Dict[str, Any]:
+        """Artefacts des étapes réussies de l'URL"""
+        with self._lock:
+            lignes = self._conn.execute(
+                "SELECT etape, artefact FROM etapes WHERE url = ? AND etat = ?", (url, OK)
+            ).fetchall()
+        return {etape: json.loads(artefact) for etape, artefact in lignes}
+
+    def etats(self, url: str) -> Dict[str, str]:
+        """État de chaque étape déjà tentée pour l'URL"""
+        with self._lock:
+            lignes = self._conn.execute("SELECT etape, etat FROM etapes WHERE url = ?", (url,)).fetchall()
+        return dict(lignes)
+
+    def dossier_termine(self, url: str) -> Optional[str]:
+        """Dossier de candidature si l'URL a franchi toutes les étapes (PDF compris si AUTO_COMPILE_PDF)"""
+        artefacts = self.artefacts(url)
+        derniere = 'pdf' if AUTO_COMPILE_PDF else 'tex'
+        dossier = artefacts.get('tex')
+        if derniere in artefacts and dossier and Path(dossier).is_dir():
+            return dossier
+        return None
+
+    def reinitialiser(self, urls: Iterable[str]):
+        """Oublie l'historique des URLs (nouveau batch sans --resume)"""
+        with self._lock:
+            self._conn.executemany("DELETE FROM etapes WHERE url = ?", [(url,) for url in urls])
+            self._conn.commit()
+
+    def tache(self, url: str, tache: Tache, artefacts: Dict[str, Any]) -> Tache:
+        """
+        Enveloppe une tâche de génération : l'artefact journalisé est réutilisé s'il existe,
+        sinon la tâche s'exécute et son résultat (ou son échec) est journalisé
+        """
+        if tache.nom in artefacts:
+            artefact = artefacts[tache.nom]
+            return Tache(tache.nom, lambda r: artefact, tache.dependances)
+
+        def executer(resultats: Dict[str, Any]):
+            try:
+                resultat = tache.fonction(resultats)
+            except Exception as e:
+                self.echec(url, tache.nom, str(e))
+                raise
+            self.reussite(url, tache.nom, resultat)
+            return resultat
+
+        return Tache(tache.nom, executer, tache.dependances)
+
+    def fermer(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Moteur de génération en batch (dans le même processus Python)
+Partage les informations personnelles, le client Claude et la session HTTP
+entre toutes les offres au lieu de relancer un interpréteur par URL
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional
+
+import client_http
+import instrumentation
+from client_claude import LimiteurDebit
+from compilation_latex import ServiceCompilation
+from generateur_cv_lettre import (ParseurInfosStatiques, GenerateurIA, ScraperAnnonce,
+                                  generer_candidature, ecrire_candidature, compiler_candidature)
+from journal_batch import ETAPES_IA, JournalBatch
+
+# Importer la configuration centralisée
+from config import *
+
+
+class MoteurBatch:
+    """Génère les candidatures de plusieurs offres avec des ressources partagées"""
+
+    def __init__(self, api_key: str, infos_path: str = FICHIER_PROFIL,
+                 journal: Optional[JournalBatch] = None):
+        # Chargés une seule fois pour tout le batch
+        self.infos = ParseurInfosStatiques.charger(infos_path)
+        # Un seul limiteur : les workers se partagent le débit de l'API
+        self.limiteur = LimiteurDebit(API_REQUETES_PAR_MINUTE, API_TOKENS_PAR_MINUTE)
+        self.ia = GenerateurIA(api_key, self.limiteur)
+        # Session HTTP partagée (pools keep-alive par hôte, reprises avec backoff)
+        self.session = client_http.obtenir_session()
+        # Compilations LaTeX en arrière-plan (un processus par cœur), hors du chemin critique
+        self.compilation = ServiceCompilation() if AUTO_COMPILE_PDF else None
+        # Journal des étapes (reprise après interruption) et URL de chaque dossier produit
+        self.journal = journal
+        self._urls_par_dossier: Dict[str, str] = {}
+
+    def _journaliser(self, url: str, etape: str, artefact: Any = None, erreur: Optional[str] = None):
+        if self.journal is None:
+            return
+        if erreur is None:
+            self.journal.reussite(url, etape, artefact)
+        else:
+            self.journal.echec(url, etape, erreur)
+
+    def _deja_termine(self, url: str) -> Optional[Dict]:
+        """Résultat d'une URL entièrement traitée lors d'un précédent lancement (reprise)"""
+        dossier = self.journal.dossier_termine(url) if self.journal else None
+        return {'url': url, 'success': True, 'dossier': dossier, 'repris': True} if dossier else None
+
+    def generer(self, url: str, verbose: bool = False) -> Optional[str]:
+        """Génère la candidature d'une offre, retourne le dossier créé (None si échec)"""
+        try:
+            with instrumentation.offre(url), instrumentation.mesurer('offre'):
+                dossier = generer_candidature(url, self.infos, self.ia, session=self.session, verbose=verbose,
+                                              compilation=self.compilation, journal=self.journal)
+        except Exception as e:
+            print(f"❌ Exception ({url}): {e}")
+            return None
+        if dossier:
+            self._urls_par_dossier[dossier] = url
+        return dossier
+
+    def executer(self, urls: List[str], workers: int = BATCH_WORKERS,
+                 on_resultat: Optional[Callable[[Dict, int, int], None]] = None) -> List[Dict]:
+        """
+        Traite toutes les URLs avec au plus `workers` offres en cours à la fois
+
+        Une nouvelle offre démarre dès qu'un worker se libère ; le rythme des appels
+        Claude est régulé par le limiteur de débit partagé, pas par des pauses fixes.
+        on_resultat(resultat, nb_termines, total) est appelé à chaque offre terminée.
+        Avec un journal, les offres déjà terminées sont reprises telles quelles.
+        Les résultats sont retournés dans l'ordre des URLs.
+        """
+        resultats: List[Optional[Dict]] = [None] * len(urls)
+        termines = 0
+
+        a_traiter = []
+        for i, url in enumerate(urls):
+            resultats[i] = self._deja_termine(url)
+            if resultats[i] is None:
+                a_traiter.append(i)
+            else:
+                termines += 1
+                if on_resultat:
+                    on_resultat(resultats[i], termines, len(urls))
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            futures = {pool.submit(self.generer, urls[i]): i for i in a_traiter}
+            for future in as_completed(futures):
+                i = futures[future]
+                dossier = future.result()
+                resultats[i] = {'url': urls[i], 'success': bool(dossier), 'dossier': dossier}
+                termines += 1
+                if on_resultat:
+                    on_resultat(resultats[i], termines, len(urls))
+
+        return resultats
+
+    def _scraper(self, url: str) -> Optional[str]:
+        """Contenu de l'annonce (None si le scraping échoue)"""
+        try:
+            with instrumentation.offre(url):
+                return ScraperAnnonce.scraper(url, session=self.session) or None
+        except Exception as e:
+            print(f"❌ Exception ({url}): {e}")
+            return None
+
+    def executer_batch_api(self, urls: List[str],
+                           on_resultat: Optional[Callable[[Dict, int, int], None]] = None) -> List[Dict]:
+        """
+        Traite toutes les URLs via la Message Batches API (mode --batch-api)
+
+        Latence élevée mais débit et coût bien meilleurs que les appels directs :
+        toutes les analyses partent en un premier lot, puis les cinq générations
+        de chaque offre analysée en un second lot. Les dossiers sont écrits à la fin.
+        Avec un journal, seules les étapes non encore réussies sont envoyées.
+        Même format de retour que executer().
+        """
+        termines = {i: self._deja_termine(url) for i, url in enumerate(urls)}
+        termines = {i: r for i, r in termines.items() if r}
+        artefacts = [self.journal.artefacts(url) if self.journal and i not in termines else {}
+                     for i, url in enumerate(urls)]
+        if termines:
+            print(f"⏭️  {len(termines)} offre(s) déjà terminée(s) lors d'un précédent lancement")
+
+        # 1. Scraping des annonces (session partagée, délais de politesse par hôte)
+        contenus: List[Optional[str]] = [a.get('scraping') for a in artefacts]
+        a_scraper = [i for i in range(len(urls)) if i not in termines and not contenus[i]]
+        with ThreadPoolExecutor(max_workers=HTTP_POOL_TAILLE) as pool:
+            for i, contenu in zip(a_scraper, pool.map(self._scraper, [urls[i] for i in a_scraper])):
+                contenus[i] = contenu
+                self._journaliser(urls[i], 'scraping', contenu,
+                                  erreur=None if contenu else "Impossible de scraper l'annonce")
+        print(f"🌐 {sum(1 for c in contenus if c)}/{len(urls) - len(termines)} annonce(s) récupérée(s)")
+
+        # 2. Premier lot : analyses des annonces
+        print("🤖 Lot 1/2 : analyse des annonces...")
+        analyses = {i: artefacts[i]['analyse'] for i in range(len(urls)) if 'analyse' in artefacts[i]}
+        requetes = {f"analyse-{i}": self.ia.requete_analyse_annonce(contenu, self.infos)
+                    for i, contenu in enumerate(contenus) if contenu and i not in analyses}
+        textes = self.ia.claude.appeler_lot(requetes) if requetes else {}
+        for identifiant, texte in textes.items():
+            i = int(identifiant.rsplit('-', 1)[1])
+            if texte is None:
+                self._journaliser(urls[i], 'analyse', erreur="Requête du lot en échec")
+                continue
+            analyses[i] = GenerateurIA.lire_analyse_annonce(texte)
+            self._journaliser(urls[i], 'analyse', analyses[i])
+
+        # 3. Second lot : profil, lettre, topo et questions de chaque offre analysée
+        print("🤖 Lot 2/2 : génération des candidatures...")
+        generations = {i: {nom: artefacts[i][nom] for nom in ETAPES_IA if nom != 'analyse' and nom in artefacts[i]}
+                       for i in analyses}
+        requetes = {}
+        for i, analyse in analyses.items():
+            for nom, requete in self.ia.requetes_generation(contenus[i], analyse, self.infos).items():
+                if nom not in generations[i]:
+                    requetes[f"{nom}-{i}"] = requete
+        textes = self.ia.claude.appeler_lot(requetes) if requetes else {}
+        for identifiant, texte in textes.items():
+            nom, i = identifiant.rsplit('-', 1)
+            i = int(i)
+            if texte is None:
+                self._journaliser(urls[i], nom, erreur="Requête du lot en échec")
+                continue
+            generations[i][nom] = GenerateurIA.lire_generation(nom, texte)
+            self._journaliser(urls[i], nom, generations[i][nom])
+
+        # 4. Écriture des dossiers
+        resultats = []
+        for i, url in enumerate(urls):
+            if i in termines:
+                resultats.append(termines[i])
+            else:
+                dossier = None
+                if i in analyses and all(nom in generations[i] for nom in ETAPES_IA if nom != 'analyse'):
+                    resultats_ia = dict(generations[i], analyse=analyses[i])
+                    try:
+                        with instrumentation.offre(url):
+                            dossier = self._ecrire(url, contenus[i], resultats_ia, artefacts[i])
+                        self._urls_par_dossier[dossier] = url
+                    except Exception as e:
+                        print(f"❌ Exception ({url}): {e}")
+                        dossier = None
+                resultats.append({'url': url, 'success': bool(dossier), 'dossier': dossier})
+            if on_resultat:
+                on_resultat(resultats[-1], i + 1, len(urls))
+
+        return resultats
+
+    def _ecrire(self, url: str, contenu: str, resultats_ia: Dict, artefacts: Dict) -> str:
+        """Écrit le dossier d'une offre du lot (ou soumet seulement ses PDF s'il existe déjà)"""
+        dossier = artefacts.get('tex')
+        if dossier and os.path.isdir(dossier):
+            compiler_candidature(dossier, self.infos, resultats_ia, verbose=False, compilation=self.compilation)
+        else:
+            dossier = ecrire_candidature(url, contenu, resultats_ia, self.infos, verbose=False,
+                                         compilation=self.compilation)
+            self._journaliser(url, 'tex', dossier)
+        return dossier
+
+    def fermer(self):
+        """Attend les compilations LaTeX en cours puis libère les connexions HTTP inactives"""
+        if self.compilation is not None:
+            print("\n📄 Finalisation des compilations LaTeX...")
+            compilations = self.compilation.terminer()
+            self.compilation = None
+            echecs = [r for r in compilations if not r.succes]
+            self._journaliser_pdf(compilations)
+            # Moteurs utilisés : le nombre de passes n'a de sens que pour pdflatex
+            details = []
+            for moteur in dict.fromkeys(r.moteur for r in compilations if not r.inchange):
+                if moteur == "pdflatex":
+                    passes = sum(r.passes for r in compilations if r.moteur == moteur)
+                    details.append(f"{passes} passe(s) pdflatex")
+                else:
+                    details.append(moteur)
+            inchanges = sum(1 for r in compilations if r.inchange)
+            if inchanges:
+                details.append(f"{inchanges} inchangé(s)")
+            print(f"   ✓ {len(compilations) - len(echecs)}/{len(compilations)} PDF compilés"
+                  + (f" ({', '.join(details)})" if details else ""))
+            for resultat in echecs:
+                print(f"   ❌ {resultat.tex_file}")
+                if DEBUG_MODE:
+                    print(resultat.log)
+        self.session.close()
+
+    def _journaliser_pdf(self, compilations: List):
+        """Étape 'pdf' de chaque offre : réussie si tous les documents de son dossier sont compilés"""
+        par_dossier: Dict[str, List] = {}
+        for resultat in compilations:
+            par_dossier.setdefault(os.path.dirname(resultat.tex_file), []).append(resultat)
+        for dossier, resultats in par_dossier.items():
+            url = self._urls_par_dossier.get(dossier)
+            if url is None:
+                continue
+            echecs = [os.path.basename(r.tex_file) for r in resultats if not r.succes]
+            if echecs:
+                self._journaliser(url, 'pdf', erreur=f"Compilation en échec: {', '.join(echecs)}")
+            else:
+                self._journaliser(url, 'pdf', [r.pdf_file for r in resultats])
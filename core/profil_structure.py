@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Format structuré du profil (TOML ou JSON)
+Alternative à infos_statique.txt : le fichier est lu par tomllib ou json puis validé
+(champs connus, types attendus) et converti directement en InfosPersonnelles, dont il
+reprend les noms de champs. Les compétences suivent MODE_PROFIL comme pour le format
+texte : competences_* en mode spécifique, liste `competences` en mode générique.
+
+Conversion d'un profil existant (le résultat est relu et comparé au format texte) :
+    python3 core/profil_structure.py infos_statique.txt                 # → infos_statique.toml
+    python3 core/profil_structure.py infos_statique.txt -o profil.json
+    python3 core/profil_structure.py --verifier infos_statique.toml
+"""
+
+import argparse
+import json
+import sys
+from dataclasses import asdict, fields
+from datetime import date, time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+try:
+    import tomllib
+except ModuleNotFoundError:  # Python < 3.11
+    import tomli as tomllib
+
+# Importer la configuration centralisée
+from config import *
+
+from generateur_cv_lettre import InfosPersonnelles, ParseurInfosStatiques
+
+# Champs texte du profil
+CHAMPS_TEXTE = ('nom', 'titre', 'localisation', 'email', 'linkedin', 'telephone', 'profil_defaut',
+                'competences_scientific_ai', 'competences_simulation',
+                'competences_generative_ai', 'competences_informatique')
+
+# Compétences du mode spécifique (vides en mode générique)
+COMPETENCES_SPECIFIQUES = ('competences_scientific_ai', 'competences_simulation',
+                           'competences_generative_ai', 'competences_informatique')
+
+# Listes de tables : champ → {clé: str (texte) ou list (liste de textes)}
+TABLES = {
+    'experiences': {'poste': str, 'entreprise': str, 'periode': str, 'missions': list},
+    'formations': {'diplome': str, 'etablissement': str, 'periode': str, 'details': list},
+    'certifications': {'titre': str, 'date': str},
+    'projets': {'titre': str, 'description': str, 'competences': str},
+    'langues': {'langue': str, 'niveau': str},
+    'competences': {'categorie': str, 'contenu': str},
+}
+
+# Champs sans lesquels le profil est refusé
+OBLIGATOIRES = ('nom',)
+
+FORMATS = ('toml', 'json')
+
+
+def _texte(valeur: Any, chemin: str, erreurs: List[str]) -> str:
+    """Valeur d'un champ texte ; nombres et dates (TOML : `date = 2022`) sont acceptés"""
+    if isinstance(valeur, str):
+        return valeur
+    if isinstance(valeur, (int, float, date, time)) and not isinstance(valeur, bool):
+        return str(valeur)
+    erreurs.append(f"{chemin} : texte attendu ({type(valeur).__name__})")
+    return ""
+
+
+def valider(donnees: Any, mode: Optional[str] = None) -> InfosPersonnelles:
+    """
+    InfosPersonnelles des données lues (mode : MODE_PROFIL par défaut)
+
+    Lève ValueError avec la liste de toutes les erreurs : champ inconnu (faute de frappe),
+    type inattendu, champ obligatoire absent, compétence sans catégorie ou sans contenu.
+    """
+    mode = mode or MODE_PROFIL
+    if not isinstance(donnees, dict):
+        raise ValueError("le profil doit être une table (objet JSON)")
+
+    erreurs: List[str] = [f"{cle} : champ inconnu" for cle in donnees
+                          if cle not in CHAMPS_TEXTE and cle not in TABLES]
+    data: Dict[str, Any] = {cle: _texte(donnees[cle], cle, erreurs) if cle in donnees else ""
+                            for cle in CHAMPS_TEXTE}
+    erreurs += [f"{cle} : champ obligatoire" for cle in OBLIGATOIRES if not data[cle].strip()]
+
+    for cle, schema in TABLES.items():
+        elements = donnees.get(cle, [])
+        if not isinstance(elements, list):
+            erreurs.append(f"{cle} : liste de tables attendue")
+            elements = []
+        data[cle] = []
+        for i, element in enumerate(elements):
+            chemin = f"{cle}[{i}]"
+            if not isinstance(element, dict):
+                erreurs.append(f"{chemin} : table attendue")
+                continue
+            erreurs += [f"{chemin}.{inconnu} : champ inconnu" for inconnu in element if inconnu not in schema]
+            entree = {}
+            for nom, type_champ in schema.items():
+                if type_champ is list:
+                    valeurs = element.get(nom, [])
+                    if not isinstance(valeurs, list):
+                        erreurs.append(f"{chemin}.{nom} : liste attendue")
+                        valeurs = []
+                    entree[nom] = [_texte(v, f"{chemin}.{nom}[{j}]", erreurs) for j, v in enumerate(valeurs)]
+                else:
+                    entree[nom] = _texte(element.get(nom, ""), f"{chemin}.{nom}", erreurs)
+            data[cle].append(entree)
+
+    erreurs += [f"competences[{i}] : categorie et contenu obligatoires"
+                for i, c in enumerate(data['competences']) if not (c['categorie'] and c['contenu'])]
+    if erreurs:
+        raise ValueError(f"{len(erreurs)} erreur(s)\n" + "\n".join(f"   - {e}" for e in erreurs))
+
+    # Compétences selon le mode, comme pour infos_statique.txt
+    if mode == "specifique":
+        data['competences'] = []
+    else:
+        for cle in COMPETENCES_SPECIFIQUES:
+            data[cle] = ""
+    return InfosPersonnelles(**data)
+
+
+def depuis_texte(contenu: str, format: str = 'toml', mode: Optional[str] = None) -> InfosPersonnelles:
+    """InfosPersonnelles d'un contenu TOML ou JSON (ValueError si illisible ou invalide)"""
+    try:
+        donnees = tomllib.loads(contenu) if format == 'toml' else json.loads(contenu)
+    except ValueError as e:
+        raise ValueError(f"{format.upper()} illisible : {e}") from e
+    return valider(donnees, mode)
+
+
+def charger(chemin: str, mode: Optional[str] = None) -> InfosPersonnelles:
+    """InfosPersonnelles d'un fichier .toml ou .json"""
+    with open(chemin, 'r', encoding='utf-8') as f:
+        return depuis_texte(f.read(), Path(chemin).suffix[1:], mode)
+
+
+def donnees_depuis_txt(contenu: str) -> Dict[str, Any]:
+    """
+    Données structurées d'un contenu au format infos_statique.txt
+
+    Les compétences des deux modes sont conservées (competences_* et liste `competences`) :
+    le fichier produit se charge à l'identique quel que soit MODE_PROFIL.
+    """
+    donnees = asdict(ParseurInfosStatiques.parse_texte(contenu, mode="generique"))
+    specifique = ParseurInfosStatiques.parse_texte(contenu, mode="specifique")
+    for cle in COMPETENCES_SPECIFIQUES:
+        donnees[cle] = getattr(specifique, cle)
+    # Rubriques de compétences vides omises
+    return {cle: valeur for cle, valeur in donnees.items()
+            if valeur or cle not in COMPETENCES_SPECIFIQUES + ('competences',)}
+
+
+def _chaine_toml(texte: str) -> str:
+    """Chaîne TOML ; un texte sur plusieurs lignes reste lisible (chaîne multiligne)"""
+    if "\n" not in texte:
+        # Les échappements de JSON sont aussi ceux de TOML (DEL mis à part)
+        return json.dumps(texte, ensure_ascii=False).replace("\x7f", "\\u007f")
+    echappe = texte.replace("\\", "\\\\").replace('"', '\\"')
+    echappe = "".join(c if c in "\n\t" or (c >= " " and c != "\x7f") else f"\\u{ord(c):04x}" for c in echappe)
+    return f'"""\n{echappe}"""'
+
+
+def _valeur_toml(valeur: Any) -> str:
+    if isinstance(valeur, list):
+        if not valeur:
+            return "[]"
+        return "[\n" + "".join(f"    {_chaine_toml(v)},\n" for v in valeur) + "]"
+    return _chaine_toml(valeur)
+
+
+def ecrire_toml(donnees: Dict[str, Any]) -> str:
+    """Document TOML : champs simples puis une table [[liste]] par élément"""
+    lignes, tables = [], []
+    for cle, valeur in donnees.items():
+        if isinstance(valeur, list) and valeur and isinstance(valeur[0], dict):
+            tables.append((cle, valeur))
+        else:
+            lignes.append(f"{cle} = {_valeur_toml(valeur)}")
+    for cle, elements in tables:
+        for element in elements:
+            lignes += ["", f"[[{cle}]]"]
+            lignes += [f"{nom} = {_valeur_toml(valeur)}" for nom, valeur in element.items()]
+    return "\n".join(lignes) + "\n"
+
+
+def convertir(source: str, sortie: str) -> Path:
+    """
+    Convertit un fichier infos_statique.txt au format structuré (selon l'extension de sortie)
+
+    Le fichier produit est relu et doit donner le même InfosPersonnelles que le format
+    texte dans les deux modes, sinon ValueError.
+    """
+    with open(source, 'r', encoding='utf-8') as f:
+        contenu = f.read()
+    sortie = Path(sortie)
+    format = sortie.suffix[1:]
+    if format not in FORMATS:
+        raise ValueError(f"extension de sortie non prise en charge : {sortie.suffix or '(aucune)'} (.toml ou .json)")
+
+    donnees = donnees_depuis_txt(contenu)
+    texte = ecrire_toml(donnees) if format == 'toml' else json.dumps(donnees, ensure_ascii=False, indent=2) + "\n"
+    for mode in ("generique", "specifique"):
+        if depuis_texte(texte, format, mode) != ParseurInfosStatiques.parse_texte(contenu, mode):
+            raise ValueError(f"la conversion ne restitue pas le profil à l'identique (mode {mode})")
+
+    sortie.write_text(texte, encoding='utf-8')
+    return sortie
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Conversion et vérification des profils au format structuré")
+    parser.add_argument('source', help="Profil au format infos_statique.txt (ou .toml/.json avec --verifier)")
+    parser.add_argument('-o', '--sortie', help="Fichier produit, .toml ou .json (défaut : source en .toml)")
+    parser.add_argument('--verifier', action='store_true', help="Valider un profil .toml/.json sans conversion")
+    args = parser.parse_args()
+
+    try:
+        if args.verifier:
+            infos = charger(args.source)
+            print(f"✅ {args.source} valide : {infos.nom}, {len(infos.experiences)} expériences, "
+                  f"{len(infos.formations)} formations, {len(infos.projets)} projets")
+            return
+        sortie = convertir(args.source, args.sortie or str(Path(args.source).with_suffix('.toml')))
+    except (OSError, ValueError) as e:
+        print(f"❌ {args.source}: {e}")
+        sys.exit(1)
+    print(f"✅ Profil converti : {sortie}")
+    print(f"   Pour l'utiliser : FICHIER_PROFIL = \"{sortie.name}\" dans config.py")
+
+
+if __name__ == "__main__":
+    main()
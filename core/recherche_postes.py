@@ -5,16 +5,24 @@ Script de recherche automatique de postes et génération en batch
 
 import os
 import sys
-import re
 import json
 import time
-import subprocess
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
+from typing import Callable, Iterator, Optional
 import requests
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
-from anthropic import Anthropic
+
+import cache_llm
+import client_http
+import instrumentation
+from client_claude import ClientClaude, systeme_avec_contexte
 
 # Charger les variables d'environnement
 load_dotenv()
@@ -26,14 +34,68 @@ from config import *
 USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
 
 
+def paginer(charger_page: Callable[[int], list], nb_results: int, taille_page: int,
+            paralleles: int = RECHERCHE_PAGES_PARALLELES, pages_max: int = RECHERCHE_PAGES_MAX) -> Iterator[dict]:
+    """
+    Génère les offres page par page jusqu'à nb_results
+    
+    charger_page(n) retourne les offres de la page n (0 = première page) et une liste vide
+    en fin de résultats ou en cas d'erreur. Les pages nécessaires sont téléchargées en
+    parallèle mais produites dans l'ordre, sans doublons d'URL : le consommateur reçoit
+    les premières offres pendant que les pages suivantes arrivent.
+    """
+    nb_pages = max(1, -(-nb_results // taille_page))
+    vus = set()
+    produits = 0
+    en_cours = deque()
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(paralleles, nb_pages))) as pool:
+        try:
+            # La première page seule : inutile de charger les suivantes si elle est vide ou bloquée
+            en_cours.append(pool.submit(charger_page, 0))
+            page_suivante = 1
+            
+            while en_cours:
+                jobs = en_cours.popleft().result()
+                if not jobs:
+                    # Fin des résultats : les pages suivantes seraient vides aussi
+                    return
+                
+                for job in jobs:
+                    if job['url'] in vus:
+                        continue
+                    vus.add(job['url'])
+                    yield job
+                    produits += 1
+                    if produits >= nb_results:
+                        return
+                
+                # Pages théoriquement nécessaires, puis une à une si des doublons ont manqué
+                while (len(en_cours) < paralleles and page_suivante < pages_max
+                       and (page_suivante < nb_pages or not en_cours)):
+                    en_cours.append(pool.submit(charger_page, page_suivante))
+                    page_suivante += 1
+        finally:
+            for future in en_cours:
+                future.cancel()
+
+
 class RechercheurPostes:
     """Recherche des postes sur différentes plateformes"""
     
+    # Nombre d'offres par page de résultats de chaque plateforme
+    TAILLE_PAGE_LINKEDIN = 25
+    TAILLE_PAGE_INDEED = 10
+    TAILLE_PAGE_WTTJ = 30
+    TAILLE_PAGE_APEC = 20
+    
     def __init__(self, profil_infos: dict, use_playwright: bool = False):
         self.profil = profil_infos
         self.api_key = os.environ.get('ANTHROPIC_API_KEY')
         if self.api_key:
-            self.client = Anthropic(api_key=self.api_key)
+            # Appels Claude via le client partagé (limiteur de débit + cache des réponses)
+            self.claude = ClientClaude(self.api_key)
+            self.client = self.claude.client
         
         # Vérifier si Playwright est disponible
         self.playwright_available = False
@@ -64,21 +126,30 @@ class RechercheurPostes:
     
     def rechercher_linkedin(self, keywords: str, location: str = "France", nb_results: int = 10) -> list:
         """Recherche sur LinkedIn (scraping basique)"""
+        return list(islice(self.iterer_linkedin(keywords, location, nb_results), nb_results))
+    
+    def iterer_linkedin(self, keywords: str, location: str = "France", nb_results: int = 10) -> Iterator[dict]:
+        """Offres LinkedIn page par page (paramètre start=)"""
         print(f"🔍 Recherche LinkedIn: {keywords}")
-        
+        return paginer(lambda page: self._page_linkedin(keywords, location, page),
+                       nb_results, self.TAILLE_PAGE_LINKEDIN)
+    
+    def _page_linkedin(self, keywords: str, location: str, page: int) -> list:
+        """Une page de résultats LinkedIn"""
         # Construction de l'URL de recherche LinkedIn
         keywords_encoded = keywords.replace(" ", "%20")
         location_encoded = location.replace(" ", "%20")
-        url = f"https://www.linkedin.com/jobs/search?keywords={keywords_encoded}&location={location_encoded}&f_TPR=r604800&position=1&pageNum=0"
+        start = page * self.TAILLE_PAGE_LINKEDIN
+        url = f"{URLS_PLATEFORMES['linkedin']}/jobs/search?keywords={keywords_encoded}&location={location_encoded}&f_TPR=r604800&position=1&start={start}"
         
         headers = {'User-Agent': USER_AGENT}
         
         try:
-            response = requests.get(url, headers=headers, timeout=30)
+            response = client_http.get(url, headers=headers)
             response.raise_for_status()
             soup = BeautifulSoup(response.content, 'html.parser')
             
-            job_cards = soup.find_all('div', class_='base-card', limit=nb_results)
+            job_cards = soup.find_all('div', class_='base-card')
             jobs = []
             
             for card in job_cards:
@@ -121,11 +192,19 @@ class RechercheurPostes:
     
     def rechercher_indeed(self, keywords: str, location: str = "France", nb_results: int = 10) -> list:
         """Recherche sur Indeed (avec headers anti-détection améliorés)"""
+        return list(islice(self.iterer_indeed(keywords, location, nb_results), nb_results))
+    
+    def iterer_indeed(self, keywords: str, location: str = "France", nb_results: int = 10) -> Iterator[dict]:
+        """Offres Indeed page par page (paramètre start=10*page)"""
         print(f"🔍 Recherche Indeed: {keywords}")
-        
+        return paginer(lambda page: self._page_indeed(keywords, location, page),
+                       nb_results, self.TAILLE_PAGE_INDEED)
+    
+    def _page_indeed(self, keywords: str, location: str, page: int) -> list:
+        """Une page de résultats Indeed"""
         keywords_encoded = keywords.replace(" ", "+")
         location_encoded = location.replace(" ", "+")
-        url = f"https://fr.indeed.com/jobs?q={keywords_encoded}&l={location_encoded}"
+        url = f"{URLS_PLATEFORMES['indeed']}/jobs?q={keywords_encoded}&l={location_encoded}&start={page * self.TAILLE_PAGE_INDEED}"
         
         # Headers plus complets pour éviter la détection
         headers = {
@@ -143,10 +222,8 @@ class RechercheurPostes:
         }
         
         try:
-            # Ajouter un délai pour simuler un comportement humain
-            time.sleep(1)
-            
-            response = requests.get(url, headers=headers, timeout=30, allow_redirects=True)
+            # Délai de politesse par hôte appliqué par client_http
+            response = client_http.get(url, headers=headers, allow_redirects=True)
             
             # Indeed peut bloquer avec 403, on continue sans erreur
             if response.status_code == 403:
@@ -158,14 +235,14 @@ class RechercheurPostes:
             soup = BeautifulSoup(response.content, 'html.parser')
             
             # Indeed utilise différentes structures selon la page
-            job_cards = soup.find_all('div', class_='job_seen_beacon')[:nb_results]
+            job_cards = soup.find_all('div', class_='job_seen_beacon')
             
             # Si pas de résultats avec cette classe, essayer d'autres
             if not job_cards:
-                job_cards = soup.find_all('div', class_='jobsearch-SerpJobCard')[:nb_results]
+                job_cards = soup.find_all('div', class_='jobsearch-SerpJobCard')
             
             if not job_cards:
-                job_cards = soup.find_all('td', class_='resultContent')[:nb_results]
+                job_cards = soup.find_all('td', class_='resultContent')
             
             jobs = []
             
@@ -185,13 +262,13 @@ class RechercheurPostes:
                     
                     job_id = link_elem.get('data-jk', '')
                     if job_id:
-                        job_url = f"https://fr.indeed.com/viewjob?jk={job_id}"
+                        job_url = f"{URLS_PLATEFORMES['indeed']}/viewjob?jk={job_id}"
                     else:
                         href = link_elem.get('href', '')
                         if href.startswith('http'):
                             job_url = href
                         else:
-                            job_url = "https://fr.indeed.com" + href
+                            job_url = URLS_PLATEFORMES['indeed'] + href
                     
                     # Extraire le titre
                     title = link_elem.get('title', '') or link_elem.get('aria-label', '') or link_elem.text.strip()
@@ -208,7 +285,7 @@ class RechercheurPostes:
                         location_elem = card.find('div', class_='companyLocation')
                     loc = location_elem.text.strip() if location_elem else location
                     
-                    if job_url and 'indeed.com' in job_url:
+                    if job_url and ('indeed.com' in job_url or job_url.startswith(URLS_PLATEFORMES['indeed'])):
                         jobs.append({
                             'url': job_url,
                             'titre': title,
@@ -233,14 +310,34 @@ class RechercheurPostes:
     
     def rechercher_welcome_to_the_jungle(self, keywords: str, nb_results: int = 10) -> list:
         """Recherche sur Welcome to the Jungle"""
+        return list(islice(self.iterer_welcome_to_the_jungle(keywords, nb_results), nb_results))
+    
+    def iterer_welcome_to_the_jungle(self, keywords: str, nb_results: int = 10) -> Iterator[dict]:
+        """Offres WTTJ page par page (variable GraphQL page), scraping basique si l'API est indisponible"""
         print(f"🔍 Recherche Welcome to the Jungle: {keywords}")
         
         # Si Playwright est activé et disponible, l'utiliser
         if self.use_playwright and self.playwright_available:
-            return self._rechercher_wttj_playwright(keywords, nb_results)
+            yield from self._rechercher_wttj_playwright(keywords, nb_results)
+            return
+        
+        # La première page indique si l'API répond ; les suivantes sont chargées en parallèle
+        premiere_page = self._page_wttj(keywords, 0)
+        if premiere_page is None:
+            yield from self._rechercher_wttj_fallback(keywords, nb_results)
+            return
+        
+        def charger_page(page: int) -> list:
+            if page == 0:
+                return premiere_page
+            return self._page_wttj(keywords, page) or []
         
+        yield from paginer(charger_page, nb_results, self.TAILLE_PAGE_WTTJ)
+    
+    def _page_wttj(self, keywords: str, page: int) -> Optional[list]:
+        """Une page de l'API GraphQL WTTJ (None si l'API ne répond pas)"""
         # WTTJ utilise une API GraphQL publique
-        api_url = "https://www.welcometothejungle.com/api/graphql"
+        api_url = f"{URLS_PLATEFORMES['wttj']}/api/graphql"
         
         # Query GraphQL pour rechercher des jobs
         query = """
@@ -274,13 +371,13 @@ class RechercheurPostes:
             'query': query,
             'variables': {
                 'query': keywords,
-                'page': 1,
-                'limit': nb_results
+                'page': page + 1,
+                'limit': self.TAILLE_PAGE_WTTJ
             }
         }
         
         try:
-            response = requests.post(api_url, json=payload, headers=headers, timeout=30)
+            response = client_http.post(api_url, json=payload, headers=headers)
             
             if response.status_code == 200:
                 data = response.json()
@@ -288,7 +385,7 @@ class RechercheurPostes:
                 
                 edges = data.get('data', {}).get('jobs', {}).get('edges', [])
                 
-                for edge in edges[:nb_results]:
+                for edge in edges:
                     node = edge.get('node', {})
                     company = node.get('company', {})
                     office = node.get('office', {})
@@ -297,7 +394,7 @@ class RechercheurPostes:
                     company_slug = company.get('slug', '')
                     
                     if job_slug and company_slug:
-                        job_url = f"https://www.welcometothejungle.com/fr/companies/{company_slug}/jobs/{job_slug}"
+                        job_url = f"{URLS_PLATEFORMES['wttj']}/fr/companies/{company_slug}/jobs/{job_slug}"
                         
                         jobs.append({
                             'url': job_url,
@@ -310,17 +407,17 @@ class RechercheurPostes:
                 return jobs
             else:
                 # Fallback: scraping classique si l'API ne fonctionne pas
-                return self._rechercher_wttj_fallback(keywords, nb_results)
+                return None
         
         except Exception as e:
             print(f"   ⚠️  API WTTJ inaccessible, tentative de scraping basique...")
-            return self._rechercher_wttj_fallback(keywords, nb_results)
+            return None
     
     def _rechercher_wttj_fallback(self, keywords: str, nb_results: int) -> list:
         """Fallback: scraping basique de WTTJ"""
         try:
             keywords_encoded = keywords.replace(" ", "%20")
-            url = f"https://www.welcometothejungle.com/fr/jobs?query={keywords_encoded}"
+            url = f"{URLS_PLATEFORMES['wttj']}/fr/jobs?query={keywords_encoded}"
             
             headers = {
                 'User-Agent': USER_AGENT,
@@ -328,7 +425,7 @@ class RechercheurPostes:
                 'Accept-Language': 'fr-FR,fr;q=0.9',
             }
             
-            response = requests.get(url, headers=headers, timeout=30)
+            response = client_http.get(url, headers=headers)
             response.raise_for_status()
             soup = BeautifulSoup(response.content, 'html.parser')
             
@@ -341,7 +438,7 @@ class RechercheurPostes:
                 href = link.get('href', '')
                 # Format WTTJ: /fr/companies/{company}/jobs/{job_id}
                 if '/companies/' in href and '/jobs/' in href and href not in [j['url'] for j in jobs]:
-                    full_url = href if href.startswith('http') else f"https://www.welcometothejungle.com{href}"
+                    full_url = href if href.startswith('http') else f"{URLS_PLATEFORMES['wttj']}{href}"
                     
                     # Essayer d'extraire le titre
                     title = link.get('aria-label', '') or link.text.strip()
@@ -371,10 +468,18 @@ class RechercheurPostes:
     
     def rechercher_apec(self, keywords: str, nb_results: int = 10) -> list:
         """Recherche sur l'Apec (site pour cadres)"""
+        return list(islice(self.iterer_apec(keywords, nb_results), nb_results))
+    
+    def iterer_apec(self, keywords: str, nb_results: int = 10) -> Iterator[dict]:
+        """Offres Apec page par page (paramètre page=)"""
         print(f"🔍 Recherche Apec: {keywords}")
-        
+        return paginer(lambda page: self._page_apec(keywords, page),
+                       nb_results, self.TAILLE_PAGE_APEC)
+    
+    def _page_apec(self, keywords: str, page: int) -> list:
+        """Une page de résultats Apec"""
         keywords_encoded = keywords.replace(" ", "+")
-        url = f"https://www.apec.fr/candidat/recherche-emploi.html/emploi?motsCles={keywords_encoded}"
+        url = f"{URLS_PLATEFORMES['apec']}/candidat/recherche-emploi.html/emploi?motsCles={keywords_encoded}&page={page}"
         
         headers = {
             'User-Agent': USER_AGENT,
@@ -383,18 +488,18 @@ class RechercheurPostes:
         }
         
         try:
-            time.sleep(1)
-            response = requests.get(url, headers=headers, timeout=30)
+            # Délai de politesse par hôte appliqué par client_http
+            response = client_http.get(url, headers=headers)
             response.raise_for_status()
             soup = BeautifulSoup(response.content, 'html.parser')
             
             jobs = []
             
             # L'Apec utilise des cartes d'offres
-            job_cards = soup.find_all('article', class_='box-offer')[:nb_results]
+            job_cards = soup.find_all('article', class_='box-offer')
             
             if not job_cards:
-                job_cards = soup.find_all('div', {'data-test': 'offer-card'})[:nb_results]
+                job_cards = soup.find_all('div', {'data-test': 'offer-card'})
             
             for card in job_cards:
                 try:
@@ -407,7 +512,7 @@ class RechercheurPostes:
                     if href.startswith('http'):
                         job_url = href
                     else:
-                        job_url = f"https://www.apec.fr{href}"
+                        job_url = f"{URLS_PLATEFORMES['apec']}{href}"
                     
                     # Extraire le titre
                     title_elem = card.find('h2') or card.find('h3') or link_elem
@@ -436,7 +541,7 @@ class RechercheurPostes:
                 except Exception as e:
                     continue
             
-            if not jobs:
+            if not jobs and page == 0:
                 print(f"   💡 Apec: Pas de résultats (site peut nécessiter une connexion)")
             
             return jobs
@@ -445,37 +550,79 @@ class RechercheurPostes:
             print(f"   ⚠️  Erreur lors de la recherche Apec: {e}")
             return []
     
-    def analyser_pertinence_ia(self, jobs: list) -> list:
-        """Utilise l'IA pour scorer la pertinence de chaque poste"""
-        if not self.api_key or not jobs:
-            return jobs
+    def iterer_plateformes(self, keywords: str, location: str = "France", nb_results: int = 10,
+                           on_termine: Optional[Callable[[str, int, Optional[Exception]], None]] = None) -> Iterator[dict]:
+        """
+        Interroge LinkedIn, Indeed, WTTJ et Apec en parallèle (nb_results offres par plateforme)
         
-        print(f"\n🤖 Analyse de la pertinence avec Claude ({CLAUDE_MODEL})...")
+        Les offres sont produites dès que leur page arrive, toutes plateformes confondues :
+        le traitement en aval peut commencer avant la fin de la recherche, dont la durée
+        totale est celle de la plateforme la plus lente.
+        on_termine(plateforme, nb_offres, erreur) est appelé quand une plateforme a fini.
+        """
+        recherches = {
+            'LinkedIn': lambda: self.iterer_linkedin(keywords, location, nb_results),
+            'Indeed': lambda: self.iterer_indeed(keywords, location, nb_results),
+            'Welcome to the Jungle': lambda: self.iterer_welcome_to_the_jungle(keywords, nb_results),
+            'Apec': lambda: self.iterer_apec(keywords, nb_results),  # Pour les postes cadres
+        }
         
-        # Préparer le profil candidat
-        profil_resume = f"""
-Profil: {self.profil.get('profil', '')}
-Compétences Scientific AI: {self.profil.get('competences_scientific_ai', '')}
-Compétences Simulation: {self.profil.get('competences_simulation', '')}
-Compétences Generative AI: {self.profil.get('competences_generative_ai', '')}
-Compétences Informatique: {self.profil.get('competences_informatique', '')}
-"""
+        # Chaque plateforme alimente la file ; (nom, None, nb, erreur) signale sa fin
+        file_offres = queue.Queue()
         
-        # Créer un résumé des jobs
-        jobs_summary = "\n\n".join([
-            f"JOB {i+1}:\nTitre: {job['titre']}\nEntreprise: {job['entreprise']}\nLocalisation: {job['localisation']}"
-            for i, job in enumerate(jobs)
-        ])
+        def parcourir(nom: str, recherche: Callable[[], Iterator[dict]]):
+            nb, erreur = 0, None
+            try:
+                for job in islice(recherche(), nb_results):
+                    file_offres.put((nom, job, None, None))
+                    nb += 1
+            except Exception as e:
+                erreur = e
+            file_offres.put((nom, None, nb, erreur))
         
-        prompt = f"""Analyse ces {len(jobs)} offres d'emploi et score leur pertinence pour ce candidat.
-
-PROFIL CANDIDAT:
-{profil_resume}
-
-OFFRES:
-{jobs_summary}
+        for nom, recherche in recherches.items():
+            threading.Thread(target=parcourir, args=(nom, recherche), daemon=True).start()
+        
+        restantes = len(recherches)
+        while restantes:
+            nom, job, nb, erreur = file_offres.get()
+            if job is not None:
+                yield job
+                continue
+            restantes -= 1
+            if on_termine:
+                on_termine(nom, nb, erreur)
+    
+    def rechercher_plateformes(self, keywords: str, location: str = "France", nb_results: int = 10) -> list:
+        """Recherche sur toutes les plateformes en parallèle, avec un bilan par plateforme"""
+        def afficher_bilan(nom: str, nb: int, erreur: Optional[Exception]):
+            if erreur:
+                print(f"   ⚠️  Erreur lors de la recherche {nom}: {erreur}")
+            print(f"   ✓ {nom}: {nb} offres trouvées")
+        
+        return list(self.iterer_plateformes(keywords, location, nb_results, on_termine=afficher_bilan))
+    
+    def _profil_resume(self) -> str:
+        """
+        Consignes de notation et profil candidat complet, identiques pour tous les lots
 
-Pour chaque offre, donne un score de pertinence de 0 à 10 et une courte justification (1 ligne).
+        Ce bloc est le préfixe mis en cache (prompt caching). Le profil complet (expériences,
+        formations, projets) et les consignes lui font atteindre la taille minimale cachable
+        du modèle (1024 tokens pour Sonnet) pour un profil réel ; en dessous, l'API ignore
+        le point de cache et le bloc est facturé normalement.
+        """
+        candidat = self.profil.get('candidat')
+        if not candidat:
+            # Sans profil complet, seules les compétences extraites décrivent le candidat
+            competences = "".join(
+                f"Compétences {nom}: {self.profil[cle]}\n"
+                for cle, nom in (('competences_scientific_ai', 'Scientific AI'), ('competences_simulation', 'Simulation'),
+                                 ('competences_generative_ai', 'Generative AI'), ('competences_informatique', 'Informatique'))
+                if self.profil.get(cle)
+            )
+            candidat = f"PROFIL CANDIDAT:\nProfil: {self.profil.get('profil', '')}\n\n{competences}"
+        return f"""CONSIGNES:
+Pour chaque offre reçue, donne un score de pertinence de 0 à 10 pour ce candidat et une courte justification (1 ligne).
 
 Réponds au format JSON:
 {{
@@ -484,73 +631,119 @@ Réponds au format JSON:
     ...
   ]
 }}
+
+{candidat}""".rstrip()
+    
+    def _scorer_lot(self, system: list, lot: list, rafraichir: bool = False) -> dict:
+        """Score un lot d'offres, retourne {indice dans le lot: évaluation} (ValueError si réponse inexploitable)"""
+        # Créer un résumé des jobs
+        jobs_summary = "\n\n".join([
+            f"JOB {i+1}:\nTitre: {job['titre']}\nEntreprise: {job['entreprise']}\nLocalisation: {job['localisation']}"
+            for i, job in enumerate(lot)
+        ])
+        
+        # Consignes et format de réponse : dans le prompt système (préfixe en cache)
+        prompt = f"""Analyse ces {len(lot)} offres d'emploi et score leur pertinence pour le candidat.
+
+OFFRES:
+{jobs_summary}
 """
         
-        try:
-            response = self.client.messages.create(
-                model=CLAUDE_MODEL,
-                max_tokens=1500,
-                temperature=0.3,
-                system="Tu es un expert en matching de profils et d'offres d'emploi. Réponds uniquement en JSON.",
-                messages=[{"role": "user", "content": prompt}]
-            )
-            
-            response_text = response.content[0].text
-            
-            # Parser le JSON
-            if '```json' in response_text:
-                response_text = response_text.split('```json')[1].split('```')[0].strip()
-            elif '```' in response_text:
-                response_text = response_text.split('```')[1].split('```')[0].strip()
-            
-            result = json.loads(response_text)
-            evaluations = result.get('evaluations', [])
-            
-            # Ajouter les scores aux jobs
-            for i, job in enumerate(jobs):
-                eval_data = next((e for e in evaluations if e['job_id'] == i+1), None)
-                if eval_data:
-                    job['score_ia'] = eval_data['score']
-                    job['justification_ia'] = eval_data['justification']
-                else:
-                    job['score_ia'] = 5
-                    job['justification_ia'] = "Non évalué"
-            
-            # Trier par score décroissant
-            jobs.sort(key=lambda x: x.get('score_ia', 0), reverse=True)
-            
-            print(f"   ✓ {len(jobs)} offres analysées et triées par pertinence")
-            
-        except Exception as e:
-            print(f"   ⚠️  Impossible d'analyser avec l'IA: {e}")
-            # Ajouter un score par défaut
-            for job in jobs:
+        response_text = self.claude.appeler(
+            system,
+            prompt,
+            max_tokens=MAX_TOKENS_SCORING,
+            temperature=0.3,
+            rafraichir=rafraichir
+        )
+        
+        # Parser le JSON
+        if '```json' in response_text:
+            response_text = response_text.split('```json')[1].split('```')[0].strip()
+        elif '```' in response_text:
+            response_text = response_text.split('```')[1].split('```')[0].strip()
+        
+        # Une réponse tronquée lève ici une ValueError (JSONDecodeError) : le lot sera relancé
+        result = json.loads(response_text)
+        evaluations = {}
+        for e in result.get('evaluations', []):
+            if isinstance(e.get('job_id'), int) and 1 <= e['job_id'] <= len(lot) and 'score' in e:
+                evaluations[e['job_id'] - 1] = e
+        if len(evaluations) < len(lot):
+            raise ValueError(f"{len(lot) - len(evaluations)} offre(s) sans évaluation")
+        return evaluations
+    
+    def analyser_pertinence_ia(self, jobs: list) -> list:
+        """
+        Utilise l'IA pour scorer la pertinence de chaque poste
+        
+        Les offres sont découpées en lots de TAILLE_LOT_SCORING envoyés en parallèle ;
+        seuls les lots dont la réponse est invalide ou incomplète sont relancés.
+        """
+        if not self.api_key or not jobs:
+            return jobs
+        
+        print(f"\n🤖 Analyse de la pertinence avec Claude ({CLAUDE_MODEL})...")
+        
+        system = systeme_avec_contexte(
+            "Tu es un expert en matching de profils et d'offres d'emploi. Réponds uniquement en JSON.",
+            self._profil_resume()
+        )
+        
+        lots = [jobs[i:i + TAILLE_LOT_SCORING] for i in range(0, len(jobs), TAILLE_LOT_SCORING)]
+        a_traiter = list(range(len(lots)))
+        erreurs = {}
+        
+        with ThreadPoolExecutor(max_workers=MAX_APPELS_IA_PARALLELES) as pool:
+            for tentative in range(SCORING_TENTATIVES):
+                # Une nouvelle tentative ne doit pas relire la réponse invalide en cache
+                futures = {pool.submit(self._scorer_lot, system, lots[n], tentative > 0): n for n in a_traiter}
+                a_traiter = []
+                for future, n in futures.items():
+                    try:
+                        evaluations = future.result()
+                    except Exception as e:
+                        erreurs[n] = e
+                        a_traiter.append(n)
+                        continue
+                    erreurs.pop(n, None)
+                    for i, job in enumerate(lots[n]):
+                        job['score_ia'] = evaluations[i]['score']
+                        job['justification_ia'] = evaluations[i].get('justification', '')
+                if not a_traiter:
+                    break
+                print(f"   🔄 {len(a_traiter)} lot(s) à relancer")
+        
+        # Lots toujours en échec : score par défaut
+        for n in a_traiter:
+            print(f"   ⚠️  Impossible d'analyser le lot {n + 1} avec l'IA: {erreurs[n]}")
+            for job in lots[n]:
                 job['score_ia'] = 5
                 job['justification_ia'] = "Non évalué"
         
+        # Trier par score décroissant
+        jobs.sort(key=lambda x: x.get('score_ia', 0), reverse=True)
+        
+        print(f"   ✓ {len(jobs) - sum(len(lots[n]) for n in a_traiter)} offres analysées et triées par pertinence")
+        print(f"   📊 Tokens: {self.claude.resume_usage()}")
+        
         return jobs
 
 
 def charger_profil():
-    """Charge le profil depuis infos_statique.txt"""
-    with open('infos_statique.txt', 'r', encoding='utf-8') as f:
-        content = f.read()
+    """Charge le profil depuis FICHIER_PROFIL (profil parsé en cache, partagé avec la génération)"""
+    from generateur_cv_lettre import GenerateurIA, ParseurInfosStatiques
+    infos = ParseurInfosStatiques.charger(FICHIER_PROFIL)
     
-    # Extraction basique
-    profil = {}
-    
-    # Extraire le profil par défaut
-    match = re.search(r'profil_defaut:\s*\|\n((?:  .+\n?)+)', content)
-    if match:
-        profil['profil'] = ' '.join(line.strip() for line in match.group(1).strip().split('\n'))
-    
-    # Extraire les compétences
+    profil = {'profil': infos.profil_defaut}
     for key in ['competences_scientific_ai', 'competences_simulation', 'competences_generative_ai', 'competences_informatique']:
-        match = re.search(f'{key}:\\s*\\|\\n((?:  .+\\n?)+)', content)
-        if match:
-            profil[key] = ' '.join(line.strip() for line in match.group(1).strip().split('\n'))
+        profil[key] = getattr(infos, key)
+    
+    # Profil complet (expériences, formations, projets, compétences de MODE_PROFIL), comme pour la génération
+    profil['candidat'] = GenerateurIA.profil_candidat(infos)
     
-    return profil
+    # Seuls les champs renseignés (les absents sont remplacés par '' dans les prompts)
+    return {key: valeur for key, valeur in profil.items() if valeur}
 
 
 def afficher_jobs(jobs: list):
@@ -606,34 +799,33 @@ def generer_batch(jobs: list):
     print(f"  GÉNÉRATION EN BATCH - {len(jobs)} offres")
     print("=" * 80 + "\n")
     
-    resultats = []
+    api_key = os.environ.get('ANTHROPIC_API_KEY')
+    if not api_key:
+        print("❌ Erreur: La variable d'environnement ANTHROPIC_API_KEY n'est pas définie")
+        return
     
-    for i, job in enumerate(jobs, 1):
-        print(f"\n{'='*80}")
-        print(f"📄 [{i}/{len(jobs)}] Traitement: {job['titre']}")
-        print(f"🏢 {job['entreprise']}")
-        print(f"{'='*80}\n")
-        
-        try:
-            # Lancer le générateur
-            cmd = ['python3', 'generateur_cv_lettre.py', job['url']]
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            
-            if result.returncode == 0:
-                print(f"✅ Génération réussie pour: {job['titre']}")
-                resultats.append({'job': job, 'success': True})
-            else:
-                print(f"❌ Erreur lors de la génération pour: {job['titre']}")
-                print(f"   {result.stderr[:200]}")
-                resultats.append({'job': job, 'success': False})
-            
-            # Pause entre chaque génération pour éviter de surcharger l'API
-            if i < len(jobs):
-                time.sleep(2)
-        
-        except Exception as e:
-            print(f"❌ Exception: {e}")
-            resultats.append({'job': job, 'success': False})
+    # Import différé : le moteur charge le générateur complet (LaTeX, IA)
+    from moteur_batch import MoteurBatch
+    moteur = MoteurBatch(api_key)
+    
+    # Plusieurs offres en parallèle (BATCH_WORKERS), débit régulé par le limiteur
+    jobs_par_url = {job['url']: job for job in jobs}
+    
+    def afficher_resultat(resultat: dict, nb_termines: int, total: int):
+        job = jobs_par_url[resultat['url']]
+        if resultat['success']:
+            print(f"✅ [{nb_termines}/{total}] Génération réussie pour: {job['titre']} ({job['entreprise']})")
+        else:
+            print(f"❌ [{nb_termines}/{total}] Erreur lors de la génération pour: {job['titre']}")
+    
+    urls = [job['url'] for job in jobs]
+    resultats = [
+        {'job': jobs[i], 'success': r['success']}
+        for i, r in enumerate(moteur.executer(urls, workers=BATCH_WORKERS, on_resultat=afficher_resultat))
+    ]
+    
+    moteur.fermer()
+    rapport = instrumentation.ecrire_rapport('batch')
     
     # Résumé
     print("\n" + "=" * 80)
@@ -651,6 +843,10 @@ def generer_batch(jobs: list):
         for r in resultats:
             if not r['success']:
                 print(f"  - {r['job']['titre']} ({r['job']['entreprise']})")
+    
+    if rapport:
+        print(f"\n⏱️  Durées par étape, p50/p95 (rapport: {rapport.relative_to(instrumentation.ROOT_DIR)}):")
+        print(instrumentation.rapport().resume())
 
 
 def main():
@@ -659,6 +855,9 @@ def main():
     print("=" * 80)
     print()
     
+    # Options du cache des réponses IA (--no-cache / --refresh)
+    sys.argv = cache_llm.appliquer_options_ligne_commande(sys.argv)
+    
     # 1. Charger le profil
     print("📥 Chargement du profil...")
     profil = charger_profil()
@@ -766,33 +965,7 @@ def main():
     
     # 4. Rechercher sur les plateformes
     rechercheur = RechercheurPostes(profil, use_playwright=use_playwright)
-    tous_jobs = []
-    
-    # LinkedIn
-    jobs_linkedin = rechercheur.rechercher_linkedin(search_query, location, nb_jobs)
-    print(f"   ✓ LinkedIn: {len(jobs_linkedin)} offres trouvées")
-    tous_jobs.extend(jobs_linkedin)
-    
-    time.sleep(2)  # Pause entre plateformes
-    
-    # Indeed
-    jobs_indeed = rechercheur.rechercher_indeed(search_query, location, nb_jobs)
-    print(f"   ✓ Indeed: {len(jobs_indeed)} offres trouvées")
-    tous_jobs.extend(jobs_indeed)
-    
-    time.sleep(2)
-    
-    # Welcome to the Jungle
-    jobs_wttj = rechercheur.rechercher_welcome_to_the_jungle(search_query, nb_jobs)
-    print(f"   ✓ Welcome to the Jungle: {len(jobs_wttj)} offres trouvées")
-    tous_jobs.extend(jobs_wttj)
-    
-    time.sleep(2)
-    
-    # Apec (pour les postes cadres)
-    jobs_apec = rechercheur.rechercher_apec(search_query, nb_jobs)
-    print(f"   ✓ Apec: {len(jobs_apec)} offres trouvées")
-    tous_jobs.extend(jobs_apec)
+    tous_jobs = rechercheur.rechercher_plateformes(search_query, location, nb_jobs)
     
     # 4b. Ajouter les critères comme métadonnées
     for job in tous_jobs:
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Rendu PDF en Python pur (moteur "reportlab")
+Construit le CV et la lettre directement depuis les informations personnelles et les
+textes générés, en reproduisant la mise en page des templates LaTeX (CV_TEMPLATE,
+CV_FORMAT, tailles de police, couleurs, puces). Aucune installation TeX requise.
+Installation: pip install reportlab
+"""
+
+import os
+import re
+from datetime import datetime
+from typing import Dict, List, Tuple
+from xml.sax.saxutils import escape
+
+try:
+    import reportlab
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY, TA_LEFT, TA_RIGHT
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import ParagraphStyle
+    from reportlab.lib.units import cm, mm, inch
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.platypus import HRFlowable, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+    REPORTLAB_DISPONIBLE = True
+except ImportError:
+    REPORTLAB_DISPONIBLE = False
+
+from compilation_latex import DocumentPDF, MoteurRendu, ResultatCompilation
+
+# Importer la configuration centralisée
+from config import *
+
+# Polices PDF standard les plus proches de Computer Modern (empattements)
+POLICE = "Times-Roman"
+POLICE_GRAS = "Times-Bold"
+POLICE_ITALIQUE = "Times-Italic"
+
+# Tailles LaTeX (pt) selon la taille de base de la classe article
+TAILLES_LATEX = {
+    10: {'small': 9, 'normalsize': 10, 'large': 12, 'Large': 14.4, 'LARGE': 17.28, 'huge': 20.74, 'Huge': 24.88},
+    11: {'small': 10, 'normalsize': 10.95, 'large': 12, 'Large': 14.4, 'LARGE': 17.28, 'huge': 20.74, 'Huge': 24.88},
+    12: {'small': 10.95, 'normalsize': 12, 'large': 14.4, 'Large': 17.28, 'LARGE': 20.74, 'huge': 24.88, 'Huge': 24.88},
+}
+
+# Équivalents des puces BULLET_STYLE : (police, caractère). ZapfDingbats et Symbol ont leur
+# propre encodage : le caractère y est écrit par son code natif (commentaire), voir puce()
+PUCES = {
+    "blacksquare": ("ZapfDingbats", "■"),   # 0x6E
+    "bullet": (POLICE, "•"),
+    "diamond": ("Symbol", "◊"),             # 0xE0
+    "triangleright": ("ZapfDingbats", "➤"), # 0xE4
+    "circ": ("ZapfDingbats", "❍"),          # 0x6D
+    "star": ("ZapfDingbats", "★"),          # 0x48
+    "checkmark": ("ZapfDingbats", "✓"),     # 0x33
+    "rightarrow": ("Symbol", "→"),          # 0xAE
+    "dash": (POLICE, "—"),
+}
+
+
+def puce() -> Tuple[str, str]:
+    """
+    (police, caractère) de la puce BULLET_STYLE
+
+    Le caractère doit exister dans l'encodage de sa police (celui de ZapfDingbats ou de Symbol,
+    WinAnsi pour les autres) : sinon le glyphe serait faux ou vide, et la puce • de POLICE
+    est utilisée à la place.
+    """
+    police, caractere = PUCES.get(BULLET_STYLE, PUCES['bullet'])
+    try:
+        caractere.encode(pdfmetrics.getFont(police).encName)
+    except (KeyError, LookupError, UnicodeEncodeError):
+        return PUCES['bullet']
+    return police, caractere
+
+
+def longueur(valeur: str, taille_base: float = 10) -> float:
+    """Convertit une longueur LaTeX ("1.2cm", "0.3em", "10pt") en points"""
+    m = re.match(r'\s*([\d.]+)\s*(cm|mm|pt|em|ex|in)?', valeur)
+    if not m:
+        return 0.0
+    nombre, unite = float(m.group(1)), m.group(2) or 'pt'
+    facteurs = {'pt': 1, 'em': taille_base, 'ex': taille_base / 2}
+    if REPORTLAB_DISPONIBLE:
+        facteurs.update({'cm': cm, 'mm': mm, 'in': inch})
+    return nombre * facteurs.get(unite, 1)
+
+
+def couleur(valeur: str):
+    """Couleur reportlab depuis la forme de config "RGB}{20,40,90" """
+    composantes = [int(c) for c in re.findall(r'\d+', valeur)[:3]]
+    return colors.Color(*(c / 255 for c in composantes)) if len(composantes) == 3 else colors.black
+
+
+def taille(commande: str, base: int) -> float:
+    """Taille en points d'une commande LaTeX (\\LARGE, \\large, ...)"""
+    tailles = TAILLES_LATEX.get(base, TAILLES_LATEX[10])
+    return tailles.get(commande.lstrip('\\'), tailles['normalsize'])
+
+
+class Styles:
+    """Styles de paragraphe déduits de la configuration (équivalents du préambule LaTeX)"""
+
+    def __init__(self, taille_base: int, parskip: str):
+        self.base = taille_base
+        normal = taille('normalsize', taille_base)
+        self.bleu = couleur(COLOR_DARKBLUE)
+        self.gris = couleur(COLOR_GRAYTEXT)
+        espace = longueur(parskip, normal)
+
+        def style(nom, **options):
+            options.setdefault('fontName', POLICE)
+            options.setdefault('fontSize', normal)
+            options.setdefault('leading', options['fontSize'] * 1.2)
+            options.setdefault('spaceAfter', espace)
+            return ParagraphStyle(nom, **options)
+
+        self.normal = style('normal')
+        self.petit = style('petit', fontSize=taille('small', taille_base))
+        self.petit_droite = style('petit_droite', fontSize=taille('small', taille_base), alignment=TA_RIGHT)
+        self.nom = style('nom', fontName=POLICE_GRAS, fontSize=taille(FONT_SIZE_NAME, taille_base), alignment=TA_CENTER)
+        self.titre = style('titre', fontName=POLICE_GRAS, fontSize=taille(FONT_SIZE_TITLE, taille_base),
+                           alignment=TA_CENTER)
+        self.centre = style('centre', alignment=TA_CENTER)
+        self.section = style('section', fontName=POLICE_GRAS, fontSize=taille(FONT_SIZE_SECTION, taille_base),
+                             textColor=self.bleu, spaceBefore=normal, spaceAfter=0)
+        self.sous_section = style('sous_section', fontName=POLICE_GRAS, textColor=self.bleu,
+                                  spaceBefore=normal * 0.8, spaceAfter=normal * 0.3)
+        police_puce, _ = puce()
+        self.puce = style('puce', leftIndent=0.3 * cm + normal, bulletIndent=0.3 * cm, bulletFontName=police_puce,
+                          bulletFontSize=normal * 0.8, spaceAfter=0)
+
+
+def _texte(valeur) -> str:
+    """Texte échappé pour le balisage des paragraphes reportlab (tirets -- et --- comme en LaTeX)"""
+    return escape(str(valeur or '')).replace('---', '—').replace('--', '–')
+
+
+def _titre_mission(mission: str, styles: Styles) -> str:
+    """Titre de mission (avant ':') en bleu et gras, comme GenerateurLaTeX.colorize_mission_title"""
+    texte = _texte(mission)
+    if COLORIZE_MISSION_TITLES and (' : ' in mission or ' :' in mission):
+        titre, description = texte.split(':', 1)
+        return f'<font color="{styles.bleu.hexval()}"><b>{titre.strip()}</b></font> : {description.strip()}'
+    return texte
+
+
+class MoteurReportlab(MoteurRendu):
+    """Rendu du CV et de la lettre sans LaTeX, depuis DocumentPDF.donnees"""
+
+    nom = "reportlab"
+
+    def disponible(self) -> bool:
+        return REPORTLAB_DISPONIBLE
+
+    def accepte(self, document: DocumentPDF) -> bool:
+        return self.disponible() and document.type in ('cv', 'lettre') and bool(document.donnees)
+
+    def signature(self) -> str:
+        version = reportlab.Version if REPORTLAB_DISPONIBLE else ""
+        return f"reportlab {version}"
+
+    def produire(self, document: DocumentPDF) -> ResultatCompilation:
+        pdf_file = os.path.splitext(document.tex_file)[0] + '.pdf'
+        try:
+            if document.type == 'cv':
+                rendre_cv(document.donnees['infos'], document.donnees['profil'], pdf_file)
+            else:
+                rendre_lettre(document.donnees['infos'], document.donnees['analyse'],
+                              document.donnees['lettre'], pdf_file)
+        except Exception as e:
+            return ResultatCompilation(tex_file=document.tex_file, succes=False, pdf_file=None, duree=0.0,
+                                       moteur=self.nom, log=f"Erreur: {e}")
+        return ResultatCompilation(tex_file=document.tex_file, succes=True, pdf_file=pdf_file, duree=0.0,
+                                   passes=1, moteur=self.nom)
+
+
+# ==================== CV ====================
+
+def _cvitem(gauche: str, droite: str, largeur: float, styles: Styles) -> Table:
+    """\\cvitem : intitulé en gras à gauche, période en petit à droite"""
+    table = Table([[Paragraph(f"<b>{gauche}</b>", styles.normal), Paragraph(droite, styles.petit_droite)]],
+                  colWidths=[largeur * 0.72, largeur * 0.28])
+    table.setStyle(TableStyle([
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ('LEFTPADDING', (0, 0), (-1, -1), 0),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 0),
+        ('TOPPADDING', (0, 0), (-1, -1), 0),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 0),
+    ]))
+    return table
+
+
+def _puce(texte: str, styles: Styles) -> Paragraph:
+    """\\cvsubitem : ligne à puce indentée"""
+    _, caractere = puce()
+    return Paragraph(texte, styles.puce, bulletText=caractere)
+
+
+def _section(titre: str, styles: Styles, filet: bool = True) -> List:
+    """\\section* (titre bleu souligné d'un filet) ou \\subsection* (sans filet)"""
+    if not filet:
+        return [Paragraph(_texte(titre), styles.sous_section)]
+    return [Paragraph(_texte(titre), styles.section),
+            HRFlowable(width='100%', thickness=0.4, color=colors.black, spaceBefore=1, spaceAfter=styles.base * 0.4)]
+
+
+def _experiences(experiences: List[Dict], espace: float, largeur: float, styles: Styles) -> List:
+    elements = []
+    for i, exp in enumerate(experiences):
+        elements.append(_cvitem(f"{_texte(exp['poste'])} – {_texte(exp['entreprise'])}",
+                                _texte(exp['periode']), largeur, styles))
+        elements += [_puce(_titre_mission(mission, styles), styles) for mission in exp['missions']]
+        if i < len(experiences) - 1:
+            elements.append(Spacer(1, espace + styles.base * 0.3))
+    return elements
+
+
+def _formations(formations: List[Dict], espace: float, largeur: float, styles: Styles) -> List:
+    elements = []
+    for i, form in enumerate(formations):
+        elements.append(_cvitem(_texte(form['diplome']), _texte(form['periode']), largeur, styles))
+        elements.append(Paragraph(f"<i>{_texte(form['etablissement'])}</i>", styles.normal))
+        elements += [_puce(_texte(detail), styles) for detail in form['details']]
+        if i < len(formations) - 1:
+            elements.append(Spacer(1, espace + styles.base * 0.3))
+    return elements
+
+
+def _competences(infos: Dict, styles: Styles, compact: bool) -> List:
+    """Compétences par catégorie (liste dynamique en mode générique, champs fixes en mode spécifique)"""
+    if MODE_PROFIL == "specifique":
+        groupes = [("Scientific AI & DL" if compact else "Scientific AI & Deep Learning",
+                    infos.get('competences_scientific_ai')),
+                   ("Simulation" if compact else "Simulation & Physique", infos.get('competences_simulation')),
+                   ("Generative AI" if compact else "Generative AI & LLM", infos.get('competences_generative_ai')),
+                   ("Informatique" if compact else "Informatique & DevOps", infos.get('competences_informatique'))]
+    else:
+        groupes = [(comp['categorie'], comp['contenu']) for comp in infos.get('competences') or []]
+        if not groupes:
+            return [Paragraph("<i>Aucune compétence listée</i>", styles.normal)]
+
+    elements = []
+    for categorie, contenu in groupes:
+        if compact:
+            # \skillgroup : catégorie en gras, contenu en petit
+            elements.append(Paragraph(f"<b>{_texte(categorie)}</b>", styles.normal))
+            elements.append(Paragraph(_texte(contenu), styles.petit))
+            elements.append(Spacer(1, 0.2 * cm))
+        else:
+            elements.append(Paragraph(f"<b>{_texte(categorie)} :</b> {_texte(contenu)}", styles.normal))
+    return elements
+
+
+def _format_cv():
+    """Marges, interligne et espacements selon CV_FORMAT (comme GenerateurLaTeX.generer_cv)"""
+    if CV_FORMAT == "1page":
+        return (CV_MARGINS_1PAGE, LATEX_PARSKIP_1PAGE, HEADER_SPACING_1PAGE,
+                VSPACE_BETWEEN_EXPERIENCES_1PAGE, VSPACE_BETWEEN_FORMATIONS_1PAGE)
+    return (CV_MARGINS_2PAGES, LATEX_PARSKIP_2PAGES, HEADER_SPACING_2PAGES,
+            VSPACE_BETWEEN_EXPERIENCES_2PAGES, VSPACE_BETWEEN_FORMATIONS_2PAGES)
+
+
+def rendre_cv(infos: Dict, profil_adapte: str, pdf_file: str):
+    """Écrit le CV (template CV_TEMPLATE) en PDF"""
+    marges, parskip, espace_entete, espace_exp, espace_form = _format_cv()
+    taille_base = int(re.match(r'\d+', FONT_SIZE_BASE).group())
+    styles = Styles(taille_base, parskip)
+    marge = longueur(marges)
+    largeur = A4[0] - 2 * marge
+    telephone = infos.get('telephone') if (infos.get('telephone') or '').strip() else '+33 X XX XX XX XX'
+    linkedin = infos.get('linkedin') or ''
+
+    elements = [Paragraph(_texte(infos['nom']), styles.nom), Paragraph(_texte(infos['titre']), styles.titre)]
+
+    if CV_TEMPLATE == "2colonnes":
+        elements.append(Spacer(1, longueur(espace_entete)))
+        separation = 1 * cm
+        largeur_gauche = largeur * 0.25 - separation / 2
+        largeur_droite = largeur * 0.75 - separation / 2
+
+        # Colonne gauche : contact, compétences, langues, certifications
+        gauche = _section("Contact", styles, filet=False)
+        for libelle, valeur in (("Localisation", _texte(infos.get('localisation'))),
+                                ("Email", f'<a href="mailto:{_texte(infos.get("email"))}">'
+                                          f'<font size="{styles.petit.fontSize}">{_texte(infos.get("email"))}</font></a>'),
+                                ("LinkedIn", f'<a href="{_texte(linkedin)}">'
+                                             f'<font size="{styles.petit.fontSize}">LinkedIn</font></a>'),
+                                ("Tél", _texte(telephone))):
+            gauche.append(Paragraph(f"<b>{libelle}:</b> {valeur}", styles.normal))
+        gauche += _section("Compétences", styles, filet=False) + _competences(infos, styles, compact=True)
+        gauche += _section("Langues", styles, filet=False)
+        for lang in infos.get('langues') or []:
+            gauche += [Paragraph(f"<b>{_texte(lang['langue'])}</b>", styles.normal),
+                       Paragraph(_texte(lang['niveau']), styles.petit)]
+        gauche += _section("Certifications", styles, filet=False)
+        for cert in infos.get('certifications') or []:
+            gauche += [Paragraph(f"<b>{_texte(cert['titre'])}</b>", styles.normal),
+                       Paragraph(_texte(cert['date']), styles.petit)]
+
+        # Colonne droite : profil, expériences, formations
+        droite = _section("Profil", styles) + [Paragraph(_texte(profil_adapte), styles.normal)]
+        droite += _section("Expérience", styles)
+        droite += _experiences(infos.get('experiences') or [], longueur(espace_exp), largeur_droite, styles)
+        droite += _section("Formation", styles)
+        droite += _formations(infos.get('formations') or [], longueur(espace_form), largeur_droite, styles)
+
+        # Comme paracol, chaque colonne peut se poursuivre sur la page suivante
+        colonnes = Table([[gauche, droite]], colWidths=[largeur_gauche + separation, largeur_droite],
+                         splitInRow=1)
+        colonnes.setStyle(TableStyle([
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('LEFTPADDING', (0, 0), (-1, -1), 0),
+            ('RIGHTPADDING', (0, 0), (0, -1), separation),
+            ('RIGHTPADDING', (1, 0), (1, -1), 0),
+            ('TOPPADDING', (0, 0), (-1, -1), 0),
+        ]))
+        elements.append(colonnes)
+    else:
+        elements.append(Paragraph(_texte(infos.get('localisation')), styles.centre))
+        elements.append(Paragraph(
+            f'<a href="mailto:{_texte(infos.get("email"))}">{_texte(infos.get("email"))}</a> &nbsp;&nbsp;|&nbsp;&nbsp; '
+            f'<a href="{_texte(linkedin)}">{_texte(linkedin.replace("https://", "").replace("http://", ""))}</a>',
+            styles.centre))
+        elements.append(Spacer(1, longueur(espace_entete)))
+        elements += _section("Profil", styles) + [Paragraph(_texte(profil_adapte), styles.normal)]
+        elements += _section("Expérience professionnelle", styles)
+        elements += _experiences(infos.get('experiences') or [], longueur(espace_exp), largeur, styles)
+        elements += _section("Formation", styles)
+        elements += _formations(infos.get('formations') or [], longueur(espace_form), largeur, styles)
+        elements += _section("Certifications", styles)
+        elements += [_cvitem(_texte(cert['titre']), _texte(cert['date']), largeur, styles)
+                     for cert in infos.get('certifications') or []]
+        elements += _section("Compétences", styles) + _competences(infos, styles, compact=False)
+        elements += _section("Langues", styles)
+        elements += [Paragraph(f"{_texte(lang['langue'])} : {_texte(lang['niveau'])}", styles.normal)
+                     for lang in infos.get('langues') or []]
+
+    doc = SimpleDocTemplate(pdf_file, pagesize=A4, leftMargin=marge, rightMargin=marge,
+                            topMargin=marge, bottomMargin=marge, title=f"CV - {infos['nom']}", author=infos['nom'])
+    doc.build(elements)
+
+
+# ==================== LETTRE ====================
+
+def rendre_lettre(infos: Dict, analyse_annonce: Dict, contenu_lettre: Dict, pdf_file: str):
+    """Écrit la lettre de motivation (lettre_motivation_template.tex) en PDF"""
+    styles = Styles(11, "0.5em")
+    gauche = ParagraphStyle('gauche', parent=styles.normal, alignment=TA_LEFT, spaceAfter=0)
+    droite = ParagraphStyle('droite', parent=styles.normal, alignment=TA_RIGHT, spaceAfter=0)
+    corps = ParagraphStyle('corps', parent=styles.normal, alignment=TA_JUSTIFY)
+    telephone = infos.get('telephone') if (infos.get('telephone') or '').strip() else '+33 X XX XX XX XX'
+
+    entete = "<br/>".join([f"<b>{_texte(infos['nom'])}</b>", _texte(infos.get('localisation')),
+                           _texte(infos.get('email')), _texte(telephone), _texte(infos.get('linkedin'))])
+    destinataire = "<br/>".join([_texte(analyse_annonce.get('entreprise', 'Entreprise')),
+                                 datetime.now().strftime("%d/%m/%Y")])
+
+    elements = [
+        Paragraph(entete, gauche),
+        Spacer(1, 1 * cm),
+        Paragraph(destinataire, droite),
+        Spacer(1, 1 * cm),
+        Paragraph(f"<b>Objet :</b> Candidature au poste de {_texte(analyse_annonce.get('poste', 'Poste'))}", corps),
+        Spacer(1, 0.5 * cm),
+        Paragraph("Madame, Monsieur,", corps),
+    ]
+    for cle in ('paragraphe_1', 'paragraphe_2', 'paragraphe_3', 'conclusion'):
+        elements += [Spacer(1, 0.3 * cm), Paragraph(_texte(contenu_lettre.get(cle, '')), corps)]
+    elements += [Spacer(1, 0.5 * cm), Paragraph("Cordialement,", droite), Spacer(1, 0.5 * cm),
+                 Paragraph(_texte(infos['nom']), droite)]
+
+    marge = longueur(LETTRE_MARGINS)
+    doc = SimpleDocTemplate(pdf_file, pagesize=A4, leftMargin=marge, rightMargin=marge, topMargin=marge,
+                            bottomMargin=marge, title=f"Lettre de motivation - {infos['nom']}", author=infos['nom'])
+    doc.build(elements)
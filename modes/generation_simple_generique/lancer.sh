@@ -40,7 +40,12 @@ echo ""
 
 # Copier le config local et les infos dans le root
 cp "$SCRIPT_DIR/config.py" "$CORE_DIR/config.py"
-cp "$SCRIPT_DIR/infos_statique.txt" "$ROOT_DIR/infos_statique.txt"
+# Profil : format texte et/ou structuré (.toml/.json, voir FICHIER_PROFIL)
+for profil in "$SCRIPT_DIR"/infos_statique.{txt,toml,json}; do
+    if [ -f "$profil" ]; then
+        cp "$profil" "$ROOT_DIR/"
+    fi
+done
 
 # Activer l'environnement virtuel
 source "$ROOT_DIR/venv/bin/activate"
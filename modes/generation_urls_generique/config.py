@@ -13,6 +13,12 @@ Modifiez ce fichier pour personnaliser le comportement du système
 #                Permet d'utiliser le système pour n'importe quel profil
 MODE_PROFIL = "generique"
 
+# Fichier du profil (relatif au répertoire de lancement)
+# "infos_statique.txt"  : format historique (voir infos_statique_exemple_generique.txt)
+# "infos_statique.toml" / "infos_statique.json" : format structuré, validé au chargement
+#                         Conversion : python3 core/profil_structure.py infos_statique.txt
+FICHIER_PROFIL = "infos_statique.txt"
+
 
 # ==================== MODÈLE IA ====================
 # Modèle Claude (Anthropic) à utiliser pour la génération
@@ -36,6 +42,71 @@ MAX_TOKENS_ANALYSE = 1024      # Analyse de l'annonce
 MAX_TOKENS_PROFIL = 800        # Génération du profil adapté (augmenté pour plus de qualité)
 MAX_TOKENS_LETTRE = 1500       # Génération de la lettre de motivation
 
+# Nombre maximum d'appels Claude simultanés pour une candidature
+# Après l'analyse de l'annonce, le profil, la lettre, le topo et les deux séries
+# de questions sont indépendants et générés en parallèle
+# 1 = génération séquentielle (comportement historique), 5 = tout en parallèle
+MAX_APPELS_IA_PARALLELES = 5
+
+# Streaming des générations longues (topo d'entretien, questions techniques) :
+# le texte est écrit dans son fichier du dossier de candidature au fil des tokens
+# reçus, avec une ligne de progression toutes les STREAMING_PROGRESSION_SECONDES
+STREAMING_GENERATIONS = True
+STREAMING_PROGRESSION_SECONDES = 3
+
+# Scoring de pertinence des offres (recherche_postes.py) : nombre d'offres par appel,
+# tokens de réponse par lot et nombre de tentatives pour un lot dont le JSON est invalide
+TAILLE_LOT_SCORING = 20
+MAX_TOKENS_SCORING = 2000
+SCORING_TENTATIVES = 3
+
+
+# ==================== LIMITES DE L'API ====================
+
+# Débit maximal autorisé par votre compte Anthropic (voir console.anthropic.com > Limits)
+# Tous les appels Claude d'un même processus partagent ces limites (seau à jetons) :
+# les requêtes attendent qu'il y ait de la capacité au lieu de pauses fixes
+API_REQUETES_PAR_MINUTE = 50     # Requêtes par minute
+API_TOKENS_PAR_MINUTE = 40000    # Tokens (entrée + sortie) par minute
+
+# Nombre d'offres traitées simultanément en mode batch (surchargé par --workers N)
+BATCH_WORKERS = 1
+
+# Mode --batch-api (Message Batches API) : intervalle initial et maximal (secondes)
+# entre deux interrogations de l'état d'un lot
+BATCH_API_INTERVALLE_SECONDES = 15
+BATCH_API_INTERVALLE_MAX_SECONDES = 120
+
+# Journal SQLite des étapes de chaque URL (relatif à la racine du projet) :
+# batch_depuis_urls.py --resume reprend un batch interrompu à partir de ce journal
+JOURNAL_BATCH_FICHIER = ".cache/journal_batch.sqlite"
+
+# Instrumentation : durée, tokens, reprises et octets de chaque étape (scraping, appels
+# Claude, écriture LaTeX, compilation PDF), rapport JSON + CSV écrit à chaque exécution
+# dans RAPPORTS_DOSSIER (relatif à la racine du projet) avec p50/p95 par étape.
+# Désactivée par défaut (les benchmarks l'activent pour leurs propres mesures)
+INSTRUMENTATION_ACTIVE = False
+RAPPORTS_DOSSIER = "rapports"
+
+
+# ==================== CACHE DES RÉPONSES IA ====================
+
+# Réutiliser les réponses de Claude quand le modèle, les prompts, la température et
+# max_tokens sont identiques (ex : régénération après correction d'un template LaTeX)
+# Options en ligne de commande : --no-cache (désactive) / --refresh (ignore et remplace)
+CACHE_LLM_ACTIF = True
+
+# Fichier SQLite du cache (relatif à la racine du projet)
+CACHE_LLM_FICHIER = ".cache/reponses_llm.sqlite"
+
+# Éviction : taille maximale du cache (Mo) et âge maximal d'une réponse (jours)
+CACHE_LLM_TAILLE_MAX_MO = 200
+CACHE_LLM_AGE_MAX_JOURS = 30
+
+# Profil parsé (infos_statique.txt) sérialisé à côté du fichier source et réutilisé
+# tant que le fichier (taille, date, empreinte du contenu) et MODE_PROFIL sont inchangés
+CACHE_PROFIL_ACTIF = True
+
 
 # ==================== PROMPTS SYSTÈME ====================
 
@@ -64,6 +135,32 @@ Tu n'inventes pas de compétences ou d'expériences."""
 
 # ==================== TEMPLATES DE PROMPTS ====================
 
+# Profil complet du candidat, placé en tête du prompt système de tous les appels de génération
+# Identique d'un appel et d'une offre à l'autre : il porte le point de cache (prompt caching)
+# et n'est facturé au tarif plein qu'une fois ; les templates ci-dessous n'en contiennent
+# que la partie propre à chaque offre
+PROMPT_TEMPLATE_CANDIDAT = """PROFIL DU CANDIDAT
+Les demandes qui suivent concernent ce candidat. N'invente jamais de compétences ou d'expériences absentes de ce profil.
+
+Nom: {nom}
+Titre: {titre}
+Profil actuel: {profil}
+
+Expériences:
+{experiences}
+
+Compétences techniques:
+{competences}
+
+Formations:
+{formations}
+
+Projets:
+{projets}
+
+Langues:
+{langues}"""
+
 # Template pour l'analyse d'annonce
 PROMPT_TEMPLATE_ANALYSE = """Analyse cette annonce de poste et extrait les informations suivantes au format JSON:
 - poste: titre du poste
@@ -99,12 +196,7 @@ PROMPT_TEMPLATE_PROFIL = """Rédige un profil professionnel percutant pour un CV
 
 CONTEXTE DU CANDIDAT:
 Profil actuel: {profil_base}
-
-Expériences clés:
-{experiences_resume}
-
-Compétences techniques:
-{competences_techniques}
+(expériences et compétences : voir le profil du candidat)
 
 POSTE VISÉ:
 - Titre: {poste}
@@ -134,12 +226,7 @@ PROMPT_TEMPLATE_PROFIL_SPONTANEE = """Rédige un profil professionnel percutant
 
 CONTEXTE DU CANDIDAT:
 Profil actuel: {profil_base}
-
-Expériences clés:
-{experiences_resume}
-
-Compétences techniques:
-{competences_techniques}
+(expériences et compétences : voir le profil du candidat)
 
 ENTREPRISE VISÉE:
 - Nom: {entreprise}
@@ -167,10 +254,7 @@ Réponds UNIQUEMENT avec le profil rédigé, sans titre, sans introduction, sans
 # Template pour la lettre de motivation
 PROMPT_TEMPLATE_LETTRE = """Tu es un expert en rédaction de lettres de motivation.
 
-Candidat:
-- Nom: {nom}
-- Profil: {profil}
-- Expérience principale: {experience}
+Candidat: voir le profil du candidat (expérience principale : la plus récente)
 
 Poste visé:
 - Poste: {poste}
@@ -191,10 +275,7 @@ Style: professionnel, engagé, concret."""
 # Template pour la lettre de motivation (candidature spontanée)
 PROMPT_TEMPLATE_LETTRE_SPONTANEE = """Tu es un expert en rédaction de lettres de motivation pour candidatures spontanées.
 
-Candidat:
-- Nom: {nom}
-- Profil: {profil}
-- Expérience principale: {experience}
+Candidat: voir le profil du candidat (expérience principale : la plus récente)
 
 Entreprise visée:
 - Entreprise: {entreprise}
@@ -342,10 +423,7 @@ POSTE VISÉ:
 ANNONCE COMPLÈTE:
 {annonce_text}
 
-PROFIL DU CANDIDAT:
-{profil_candidat}
-
-Structure ton topo en 5 sections:
+Appuie-toi sur le profil du candidat. Structure ton topo en 5 sections:
 
 1. CONTEXTE DU POSTE (2-3 paragraphes)
    - Enjeux stratégiques du poste
@@ -385,10 +463,6 @@ POSTE VISÉ:
 ANNONCE COMPLÈTE:
 {annonce_text}
 
-PROFIL DU CANDIDAT:
-Expériences: {experiences_resume}
-Compétences: {competences_techniques}
-
 CONSIGNES:
 1. Génère exactement {nb_questions} questions progressives (du fondamental à l'avancé)
 2. Les questions doivent être réalistes et en lien direct avec l'annonce
@@ -422,10 +496,6 @@ POSTE: {poste}
 ANNONCE COMPLÈTE:
 {annonce_text}
 
-PROFIL DU CANDIDAT:
-Nom: {nom}
-Expériences: {experiences_resume}
-
 CONSIGNES:
 1. Génère exactement {nb_questions} questions comportementales/personnalité
 2. Base-toi sur les valeurs implicites ou explicites de l'entreprise dans l'annonce
@@ -465,9 +535,60 @@ MAX_ANNONCE_LENGTH = 5000
 # User Agent pour les requêtes HTTP
 USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
 
+# Adresse de base de chaque plateforme de recherche (recherche_postes.py) ;
+# modifiable pour viser un serveur local (benchmarks/serveur_fixtures.py)
+URLS_PLATEFORMES = {
+    "linkedin": "https://www.linkedin.com",
+    "indeed": "https://fr.indeed.com",
+    "wttj": "https://www.welcometothejungle.com",
+    "apec": "https://www.apec.fr",
+}
+
 # Timeout des requêtes HTTP (en secondes)
 HTTP_TIMEOUT = 30
 
+# Timeouts spécifiques par hôte (en secondes), HTTP_TIMEOUT pour les autres
+HTTP_TIMEOUTS_PAR_HOTE = {
+    "www.linkedin.com": 20,
+    "fr.indeed.com": 20,
+    "www.welcometothejungle.com": 20,
+    "www.apec.fr": 30,
+}
+
+# Pools de connexions de la session HTTP partagée (keep-alive)
+HTTP_POOL_HOTES = 10             # Nombre d'hôtes gardant un pool ouvert
+HTTP_POOL_TAILLE = 10            # Connexions simultanées max par hôte
+HTTP_POOL_TAILLE_PAR_HOTE = {    # Surcharges par hôte
+    "www.linkedin.com": 4,
+    "fr.indeed.com": 2,
+}
+
+# Pagination de la recherche de postes : pages téléchargées en parallèle par plateforme
+# et nombre maximal de pages parcourues (plafond si des doublons réduisent les pages)
+RECHERCHE_PAGES_PARALLELES = 3
+RECHERCHE_PAGES_MAX = 10
+
+# Délai minimal entre deux requêtes vers un même hôte (politesse envers les sites)
+# Appliqué par hôte : les plateformes sont interrogées en parallèle sans s'attendre
+DELAI_POLITESSE_DEFAUT = 0.0
+DELAI_POLITESSE_PAR_HOTE = {
+    "www.linkedin.com": 1.0,
+    "fr.indeed.com": 1.0,
+    "www.apec.fr": 1.0,
+}
+
+# Reprises automatiques sur 429/5xx avec backoff exponentiel
+# (attente = HTTP_RETRY_BACKOFF * 2^(tentative-1) secondes, ou l'en-tête Retry-After)
+HTTP_RETRY_TOTAL = 3
+HTTP_RETRY_BACKOFF = 1.0
+
+# Cache disque des pages d'annonces (contenu + en-têtes ETag/Last-Modified)
+# Pendant CACHE_HTTP_TTL_SECONDES la copie locale est servie sans requête réseau,
+# ensuite elle est revalidée par une requête conditionnelle (304 = pas de retéléchargement)
+CACHE_HTTP_ACTIF = True
+CACHE_HTTP_DOSSIER = ".cache/pages"   # Relatif à la racine du projet
+CACHE_HTTP_TTL_SECONDES = 3600
+
 
 # ==================== FICHIERS ET DOSSIERS ====================
 
@@ -480,6 +601,8 @@ FILENAME_CV = "cv.tex"
 FILENAME_LETTRE = "lettre_motivation.tex"
 FILENAME_ANNONCE = "annonce_originale.txt"
 FILENAME_ANALYSE = "analyse_poste.txt"
+# Résultats de chaque étape de l'IA, sauvegardés au fil de la génération (reprise après échec)
+FILENAME_ETAPES = "etapes_generation.json"
 
 
 # ==================== COMPILATION LATEX ====================
@@ -487,8 +610,26 @@ FILENAME_ANALYSE = "analyse_poste.txt"
 # Compiler automatiquement en PDF
 AUTO_COMPILE_PDF = True
 
-# Nombre de passes de compilation LaTeX (2-3 recommandé pour les références)
-LATEX_COMPILE_PASSES = 2
+# Moteur de rendu PDF
+# "pdflatex"  : compilation des templates LaTeX (installation TeX requise)
+# "reportlab" : rendu Python pur depuis le profil et les textes générés, sans TeX
+#               (pip install reportlab), pour les hôtes sans LaTeX ou les gros volumes
+MOTEUR_PDF = "pdflatex"
+
+# Chemin de pdflatex ("" = recherche dans le PATH, puis emplacement MacTeX)
+PDFLATEX_CHEMIN = ""
+
+# Nombre maximal de passes de compilation LaTeX : une passe supplémentaire n'est lancée
+# que si LaTeX la demande (« Rerun ») ou si le .aux a changé (références à stabiliser)
+LATEX_COMPILE_PASSES = 3
+
+# Processus de compilation en parallèle en mode batch (0 = un par cœur)
+LATEX_COMPILATION_WORKERS = 0
+
+# Précompiler le préambule de chaque template en format pdflatex (package mylatexformat) :
+# les packages ne sont chargés qu'une fois, chaque document part du format mis en cache
+LATEX_FORMAT_PRECOMPILE = True
+LATEX_FORMAT_DOSSIER = ".cache/latex_fmt"
 
 # Mode debug (affiche les erreurs de compilation)
 DEBUG_MODE = False
@@ -100,7 +100,12 @@ fi
 
 # Copier le config local et les infos dans le root
 cp "$SCRIPT_DIR/config.py" "$CORE_DIR/config.py"
-cp "$SCRIPT_DIR/infos_statique.txt" "$ROOT_DIR/infos_statique.txt"
+# Profil : format texte et/ou structuré (.toml/.json, voir FICHIER_PROFIL)
+for profil in "$SCRIPT_DIR"/infos_statique.{txt,toml,json}; do
+    if [ -f "$profil" ]; then
+        cp "$profil" "$ROOT_DIR/"
+    fi
+done
 cp "$URL_FILE" "$ROOT_DIR/urls_a_traiter.txt"
 
 # Activer l'environnement virtuel
@@ -14,7 +14,12 @@ CORE_DIR="$ROOT_DIR/core"
 
 # Copier le config local dans le core pour cette exécution
 cp "$SCRIPT_DIR/config.py" "$CORE_DIR/config.py"
-cp "$SCRIPT_DIR/infos_statique.txt" "$ROOT_DIR/infos_statique.txt"
+# Profil : format texte et/ou structuré (.toml/.json, voir FICHIER_PROFIL)
+for profil in "$SCRIPT_DIR"/infos_statique.{txt,toml,json}; do
+    if [ -f "$profil" ]; then
+        cp "$profil" "$ROOT_DIR/"
+    fi
+done
 
 # Activer l'environnement virtuel
 source "$ROOT_DIR/venv/bin/activate"